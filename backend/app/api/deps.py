@@ -1,12 +1,15 @@
-from typing import Generator, Annotated
+from typing import AsyncGenerator, Generator, Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.core import config, database
 from app.crud import crud_user
 from app.models import models
 from app.schemas import schemas
+from app.services.principal_cache import principal_cache
 
 # Esto le dice a FastAPI que el token viene en el Header "Authorization: Bearer <token>"
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
@@ -18,42 +21,90 @@ def get_db() -> Generator:
     finally:
         db.close()
 
+# Versión async para las rutas calientes (logs, creditors, workspace, updates, /auth/me)
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with database.AsyncSessionLocal() as db:
+        yield db
+
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 TokenDep = Annotated[str, Depends(oauth2_scheme)]
 
-def get_current_user(db: SessionDep, token: TokenDep) -> models.User:
-    credentials_exception = HTTPException(
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudieron validar las credenciales",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def get_token_username(token: str) -> str:
+    """Valida el JWT y devuelve el username (claim 'sub'). Memoizado hasta el 'exp'."""
+    username = principal_cache.get_token_subject(token)
+    if username is not None:
+        return username
     try:
         payload = jwt.decode(token, config.settings.SECRET_KEY, algorithms=[config.settings.ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
-            raise credentials_exception
+            raise credentials_exception()
     except JWTError:
-        raise credentials_exception
-    
-    user = crud_user.get_user_by_username(db, username=username)
+        raise credentials_exception()
+    principal_cache.remember_token(token, username, payload.get("exp"))
+    return username
+
+def get_current_user(db: SessionDep, token: TokenDep) -> models.User:
+    username = get_token_username(token)
+    version = principal_cache.version
+    user = principal_cache.get_user(username)
     if user is None:
-        raise credentials_exception
+        user = crud_user.get_user_by_username(db, username=username)
+        if user is None:
+            raise credentials_exception()
+        principal_cache.put_user(user, version)
     return user
 
-def get_current_active_user(
-    current_user: models.User = Depends(get_current_user)
-) -> models.User:
+async def get_current_user_async(db: AsyncSessionDep, token: TokenDep) -> models.User:
+    username = get_token_username(token)
+    version = principal_cache.version
+    user = principal_cache.get_user(username)
+    if user is None:
+        result = await db.execute(select(models.User).where(models.User.username == username))
+        user = result.scalars().first()
+        if user is None:
+            raise credentials_exception()
+        principal_cache.put_user(user, version)
+    return user
+
+def check_active(current_user: models.User) -> models.User:
     if not current_user.active:
         raise HTTPException(status_code=400, detail="El usuario está inactivo")
     return current_user
 
-# Dependencia extra para validar si es Admin
-def get_current_active_admin(
-    current_user: models.User = Depends(get_current_active_user) # <--- Mejor depender de active_user
+def get_current_active_user(
+    current_user: models.User = Depends(get_current_user)
 ) -> models.User:
+    return check_active(current_user)
+
+async def get_current_active_user_async(
+    current_user: models.User = Depends(get_current_user_async)
+) -> models.User:
+    return check_active(current_user)
+
+def check_admin(current_user: models.User) -> models.User:
     if current_user.role != "Admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, 
             detail="El usuario no tiene privilegios suficientes"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+# Dependencia extra para validar si es Admin
+def get_current_active_admin(
+    current_user: models.User = Depends(get_current_active_user) # <--- Mejor depender de active_user
+) -> models.User:
+    return check_admin(current_user)
+
+async def get_current_active_admin_async(
+    current_user: models.User = Depends(get_current_active_user_async)
+) -> models.User:
+    return check_admin(current_user)
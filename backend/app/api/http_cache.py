@@ -0,0 +1,46 @@
+# --- app/api/http_cache.py ---
+"""
+GET condicionales (ETag / If-None-Match) para los endpoints de solo lectura.
+
+Cada ruta arma su ETag con un sello barato de la versión del recurso
+(catálogo de acreedores, noticias activas, datos del usuario) ANTES de
+consultar la BD; si el cliente ya tiene esa versión responde 304 sin cuerpo.
+Los sellos salen del contenido, no de contadores locales: todos los workers
+calculan el mismo ETag para los mismos datos.
+"""
+import hashlib
+import json
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Cache-Control
+PUBLIC_SHORT = "public, max-age=60"     # Igual para todos: el navegador y nginx lo reusan 1 minuto
+PRIVATE_REVALIDATE = "private, no-cache"  # Por usuario: se guarda, pero se revalida siempre (304)
+
+def make_etag(*parts) -> str:
+    raw = json.dumps(parts, default=str, separators=(",", ":"), ensure_ascii=False)
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Comparación débil (RFC 9110): nginx marca W/ los ETag de respuestas comprimidas
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+def not_modified(request: Request, response: Response, etag: str, cache_control: str) -> Optional[Response]:
+    """
+    Pone ETag y Cache-Control en la respuesta. Si el If-None-Match del
+    cliente coincide devuelve el 304 que la ruta debe retornar; si no, None.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if cache_control.startswith("private"):
+        headers["Vary"] = "Authorization"
+    if _matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -1,16 +1,26 @@
+import asyncio
 import io
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
-from sqlalchemy import func
+import json
+import os
+from typing import Annotated, List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from app.core import security
+from app.core import pool_metrics, security
+from app.core.config import settings
 
 from app.api import deps
 from app.models import models
 from app.schemas import schemas
-from app.crud import crud_user, crud_creditor, crud_log
-from app.utils import excel_generator
+from app.crud import crud_log, crud_user, crud_creditor
+from app.services import live_feed, log_export, metrics, report_jobs, reports
+from app.services.dashboard_cache import dashboard_cache
+from app.services.log_writer import log_writer
+from app.services.password_hasher import password_hasher
+from app.services.principal_cache import principal_cache
+from app.services.report_cache import report_cache
+from app.services.updates_cache import updates_cache
 
 router = APIRouter()
 
@@ -22,28 +32,104 @@ def get_admin_stats(
     current_admin: models.User = Depends(deps.get_current_active_admin)
 ):
     """Estadísticas globales para los KPIs del Dashboard."""
-    total_logs = db.query(models.Log).count()
-    total_bancos = db.query(models.Creditor).count()
-    
-    # Ventas hoy (Filtro por fecha actual)
-    sales_today = db.query(models.Log).filter(
-        models.Log.result.contains("Completed"),
-        func.date(models.Log.created_at) == func.current_date()
-    ).count()
-    
+    # Totales y ventas de hoy (día ET) en una sola consulta
+    return metrics.get_global_stats(db)
+
+@router.get("/live-feed", response_model=List[schemas.AdminLiveFeedItem])
+async def get_live_feed(
+    current_admin: models.User = Depends(deps.get_current_active_admin_async)
+):
+    """Últimas 10 acciones (desde la memoria del worker, sin consultar Logs)."""
+    return await live_feed.broadcaster.snapshot()
+
+@router.get("/live-feed/stream")
+async def stream_live_feed(
+    db: deps.AsyncSessionDep,
+    current_admin: models.User = Depends(deps.get_current_active_admin_async)
+):
+    """
+    Server-Sent Events: primero un evento `snapshot` con las últimas 10 acciones,
+    después un `data:` (AdminLiveFeedItem) por cada nota nueva y un comentario
+    de keep-alive cada 15 s. Reemplaza el polling de /admin/live-feed.
+    """
+    # La sesión de la autenticación no debe quedar tomada mientras dura el stream
+    await db.close()
+    snapshot = await live_feed.broadcaster.snapshot()
+    queue = live_feed.broadcaster.subscribe()
+
+    async def events():
+        try:
+            yield f"event: snapshot\ndata: {json.dumps(snapshot, ensure_ascii=False)}\n\n"
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), live_feed.HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {json.dumps(item, ensure_ascii=False)}\n\n"
+        finally:
+            live_feed.broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/logs", response_model=schemas.LogPage)
+def browse_logs(
+    filters: Annotated[schemas.LogBrowseFilters, Query()],
+    db: deps.SessionDep,
+    current_admin: models.User = Depends(deps.get_current_active_admin)
+):
+    """Navega todos los logs por agente, resultado, afiliado o cordoba_id (paginación keyset)."""
+    try:
+        return crud_log.browse_logs(db, filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/cache-stats")
+def get_cache_stats(
+    current_admin: models.User = Depends(deps.get_current_active_admin)
+):
+    """Aciertos/fallos de las cachés de usuarios, noticias y dashboards (este worker) y de reportes."""
     return {
-        "total_calls": total_logs,
-        "total_banks": total_bancos,
-        "sales_today": sales_today
+        **principal_cache.stats(),
+        "updates": updates_cache.stats(),
+        "dashboards": dashboard_cache.stats(),
+        "reports": report_cache.stats(),
     }
 
-@router.get("/live-feed")
-def get_live_feed(
-    db: deps.SessionDep,
+@router.get("/hasher-stats")
+def get_hasher_stats(
+    current_admin: models.User = Depends(deps.get_current_active_admin)
+):
+    """Profundidad de cola, rechazos y latencia del pool de bcrypt de este worker."""
+    return password_hasher.stats()
+
+@router.get("/writer-stats")
+def get_writer_stats(
     current_admin: models.User = Depends(deps.get_current_active_admin)
 ):
-    """Últimas 10 acciones en tiempo real para el feed del administrador."""
-    return db.query(models.Log).order_by(models.Log.created_at.desc()).limit(10).all()
+    """Tamaño de lote y latencias del group commit de POST /logs/ en este worker."""
+    return log_writer.stats()
+
+@router.get("/db-stats")
+def get_db_stats(
+    current_admin: models.User = Depends(deps.get_current_active_admin)
+):
+    """Ocupación y espera por conexión de los pools sync y async de este worker."""
+    return {
+        "pools": pool_metrics.stats(),
+        "settings": {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout_seconds": settings.DB_POOL_TIMEOUT_SECONDS,
+            "pool_recycle_seconds": settings.DB_POOL_RECYCLE_SECONDS,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+            "statement_timeout_ms": settings.DB_STATEMENT_TIMEOUT_MS,
+        },
+    }
 
 # --- GESTIÓN DE USUARIOS ---
 
@@ -93,28 +179,107 @@ async def export_report(
     current_admin: models.User = Depends(deps.get_current_active_admin)
 ):
     """Generación y descarga de reportes estratégicos, operativos y de calidad."""
-    
-    # 1. Extracción de datos filtrados mediante el CRUD
-    df_export = crud_log.get_logs_for_report(
-        db, 
-        start_date=params.start_date, 
-        end_date=params.end_date, 
-        target_agent=params.target_agent
-    )
-    
-    # 2. Mapeo de usernames a nombres reales para el reporte
-    user_map = crud_user.get_user_map(db)
-    
-    # 3. Generación del binario Excel en memoria
-    output = excel_generator.generate_excel_file(df_export, user_map, params.report_type)
-    output.seek(0)
-    
-    filename = f"Reporte_{params.report_type}_{params.start_date}.xlsx"
+    # Consulta y escritura del Excel (bloqueantes) fuera del event loop;
+    # el archivo temporal se envía por bloques y se borra al terminar
+    output = await run_in_threadpool(reports.build_report_file, db, params)
+    filename = reports.report_filename(params)
     
     return StreamingResponse(
-        output, 
+        reports.iter_file(output), 
         headers={'Content-Disposition': f'attachment; filename="{filename}"'}, 
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        media_type=reports.XLSX_MEDIA_TYPE
+    )
+
+# --- EXPORTACIÓN CRUDA PARA BI ---
+
+def export_logs_response(request: Request, filters: schemas.LogExportFilters, fmt: str) -> StreamingResponse:
+    # gzip solo si el cliente lo acepta (curl --compressed, requests, httpx lo hacen solos)
+    use_gzip = "gzip" in request.headers.get("accept-encoding", "").lower()
+    headers = {
+        'Content-Disposition': f'attachment; filename="logs_{filters.start_date}_{filters.end_date}.{fmt}"',
+        'Vary': 'Accept-Encoding',
+    }
+    if use_gzip:
+        headers['Content-Encoding'] = 'gzip'
+    return StreamingResponse(
+        log_export.stream_export(filters, fmt, gzip=use_gzip),
+        headers=headers,
+        media_type=log_export.MEDIA_TYPES[fmt]
+    )
+
+@router.get("/export/logs.csv")
+def export_logs_csv(
+    request: Request,
+    filters: Annotated[schemas.LogExportFilters, Query()],
+    current_admin: models.User = Depends(deps.get_current_active_admin)
+):
+    """Logs crudos en CSV, leídos y enviados por bloques (sin DataFrame)."""
+    return export_logs_response(request, filters, log_export.FORMAT_CSV)
+
+@router.get("/export/logs.ndjson")
+def export_logs_ndjson(
+    request: Request,
+    filters: Annotated[schemas.LogExportFilters, Query()],
+    current_admin: models.User = Depends(deps.get_current_active_admin)
+):
+    """Logs crudos en NDJSON (un objeto JSON por línea)."""
+    return export_logs_response(request, filters, log_export.FORMAT_NDJSON)
+
+# --- REPORTES EN SEGUNDO PLANO ---
+
+@router.post("/reports", response_model=schemas.ReportJobOut, status_code=status.HTTP_202_ACCEPTED)
+def create_report_job(
+    params: schemas.ReportRequest,
+    db: deps.SessionDep,
+    current_admin: models.User = Depends(deps.get_current_active_admin)
+):
+    """Encola un reporte y devuelve el trabajo para consultar su avance."""
+    report_jobs.reclaim_stale(db)
+    report_jobs.purge_expired(db)
+    if report_jobs.count_pending(db) >= settings.REPORT_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Hay demasiados reportes en cola, intente más tarde"
+        )
+    return report_jobs.enqueue(db, params, requested_by=current_admin.id)
+
+@router.get("/reports", response_model=List[schemas.ReportJobOut])
+def list_report_jobs(
+    db: deps.SessionDep,
+    current_admin: models.User = Depends(deps.get_current_active_admin)
+):
+    """Trabajos recientes: en cola, en ejecución y terminados."""
+    return report_jobs.list_jobs(db)
+
+def get_job_or_404(db: Session, job_id: int) -> models.ReportJob:
+    job = db.get(models.ReportJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Reporte no encontrado")
+    return job
+
+@router.get("/reports/{job_id}", response_model=schemas.ReportJobOut)
+def get_report_job(
+    job_id: int,
+    db: deps.SessionDep,
+    current_admin: models.User = Depends(deps.get_current_active_admin)
+):
+    return get_job_or_404(db, job_id)
+
+@router.get("/reports/{job_id}/download")
+def download_report(
+    job_id: int,
+    db: deps.SessionDep,
+    current_admin: models.User = Depends(deps.get_current_active_admin)
+):
+    job = get_job_or_404(db, job_id)
+    if job.status != report_jobs.JOB_FINISHED:
+        raise HTTPException(status_code=409, detail=f"El reporte aún no está listo ({job.status})")
+    if not job.file_path or not os.path.exists(job.file_path):
+        raise HTTPException(status_code=410, detail="El archivo del reporte ya no existe")
+    return FileResponse(
+        job.file_path,
+        filename=reports.report_filename(report_jobs.job_params(job)),
+        media_type=reports.XLSX_MEDIA_TYPE
     )
 
 @router.post("/users", response_model=schemas.UserOut)
@@ -140,6 +305,7 @@ def create_new_user(
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
+    principal_cache.invalidate(new_user.username)
     return new_user
 
 # --- GESTIÓN DE NOTICIAS (Faltaba todo el CRUD Admin) ---
@@ -159,8 +325,10 @@ def publish_update(
         active=True
     )
     db.add(new_update)
+    updates_cache.notify(db)
     db.commit()
     db.refresh(new_update)
+    updates_cache.invalidate()
     return new_update
 
 @router.patch("/updates/{update_id}/archive")
@@ -175,5 +343,7 @@ def archive_update(
         raise HTTPException(status_code=404, detail="Noticia no encontrada")
     
     update.active = False
+    updates_cache.notify(db)
     db.commit()
+    updates_cache.invalidate()
     return {"status": "archived"}
\ No newline at end of file
@@ -1,6 +1,6 @@
 from datetime import timedelta
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app.models import models
@@ -8,17 +8,18 @@ from app.models import models
 from app.core import security, config
 from app.crud import crud_user
 from app.schemas import schemas
-from app.api import deps
+from app.api import deps, http_cache
+from app.services.principal_cache import principal_cache
 
 router = APIRouter()
 
 @router.post("/login", response_model=schemas.Token)
-def login_access_token(
-    db: deps.SessionDep, 
+async def login_access_token(
+    db: deps.AsyncSessionDep, 
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
 ):
-    # 1. Validar usuario y contraseña contra la DB
-    user = crud_user.authenticate(db, username=form_data.username, password=form_data.password)
+    # 1. Validar usuario y contraseña contra la DB (bcrypt corre en el pool de procesos)
+    user = await crud_user.authenticate_async(db, username=form_data.username, password=form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -43,38 +44,50 @@ def login_access_token(
 from app.models import models # Asegúrate de importar tus modelos si no están
 
 @router.get("/me", response_model=schemas.UserOut) # O schemas.UserPublic si quieres ocultar el password
-def read_users_me(
-    current_user: Annotated[models.User, Depends(deps.get_current_active_user)]
+async def read_users_me(
+    request: Request,
+    response: Response,
+    current_user: Annotated[models.User, Depends(deps.get_current_active_user_async)]
 ):
     """
     Endpoint para persistencia de sesión.
     Recibe el token, valida quién es el usuario y devuelve sus datos.
+    El usuario suele venir de principal_cache: el 304 no toca la BD.
     """
-    return current_user
+    user = schemas.UserOut.model_validate(current_user)
+    etag = http_cache.make_etag("me", user.model_dump())
+    cached = http_cache.not_modified(request, response, etag, http_cache.PRIVATE_REVALIDATE)
+    if cached:
+        return cached
+    return user
 
 @router.put("/me/password")
-def update_password(
+async def update_password(
     password_in: schemas.UserPasswordUpdate,
-    db: deps.SessionDep,
-    current_user: models.User = Depends(deps.get_current_active_user)
+    db: deps.AsyncSessionDep,
+    current_user: models.User = Depends(deps.get_current_active_user_async)
 ):
     """
     Permite al usuario cambiar su propia contraseña.
     Valida la contraseña actual antes de aplicar el cambio.
     """
+    # El usuario puede venir de la caché (sin hash ni sesión): lo leemos de la BD
+    db_user = await db.get(models.User, current_user.id)
+
     # 1. Verificar que la contraseña actual sea correcta
-    if not security.verify_password(password_in.current_password, current_user.password):
+    if not await security.verify_password_async(password_in.current_password, db_user.password):
         raise HTTPException(
             status_code=400, 
             detail="La contraseña actual es incorrecta"
         )
     
     # 2. Encriptar la nueva contraseña
-    hashed_password = security.get_password_hash(password_in.new_password)
+    hashed_password = await security.get_password_hash_async(password_in.new_password)
     
     # 3. Guardar en BD
-    current_user.password = hashed_password
-    db.add(current_user)
-    db.commit()
+    db_user.password = hashed_password
+    await db.run_sync(principal_cache.notify, db_user.username)
+    await db.commit()
+    principal_cache.invalidate(db_user.username)
     
     return {"message": "Contraseña actualizada correctamente"}
\ No newline at end of file
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Optional
 from pydantic import BaseModel
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.models.models import Creditor, SearchMiss
 import re
-from app.api import deps
+from app.api import deps, http_cache
 from app.schemas import schemas
+from app.services.creditor_index import creditor_index
 
 router = APIRouter()
 
@@ -38,40 +41,54 @@ class BatchResultItem(BaseModel):
     code: str      # El código oficial en BD (Ej: "CHASE")
     name: str      # El nombre oficial (Ej: "JPMORGAN CHASE BANK")
 
+class BatchSuggestion(BaseModel):
+    code: str      # Código oficial sugerido
+    name: str      # Nombre oficial sugerido
+    score: float   # Confianza 0..1 (similitud por trigramas)
+
+class BatchFuzzyItem(BaseModel):
+    input: str                         # Código desconocido tal como se limpió
+    suggestions: List[BatchSuggestion] # Ordenadas de mayor a menor confianza
+
 class BatchResponse(BaseModel):
     found: List[BatchResultItem]
     unknown: List[str]
+    suggestions: List[BatchFuzzyItem] = []
 
 # --- 3. ENDPOINTS ---
 
 @router.get("/", response_model=List[schemas.CreditorOut])
-def read_creditors(
-    db: deps.SessionDep,
+async def read_creditors(
+    request: Request,
+    response: Response,
+    db: deps.AsyncSessionDep,
     q: str = Query(None, min_length=2),
 ):
     """
     Búsqueda Manual en Tiempo Real (Autocompletado).
-    Busca por coincidencia parcial en Abreviación o Nombre.
+    Busca por coincidencia parcial en Abreviación o Nombre usando el índice
+    en memoria (sin consultar la BD). Prioriza coincidencias por prefijo.
+    Responde 304 si el catálogo no cambió desde la última vez que el cliente buscó `q`.
     """
     if not q:
         return []
     
-    query_str = f"%{q}%"
-    results = db.query(Creditor).filter(
-        (Creditor.abreviation.ilike(query_str)) | 
-        (Creditor.name.ilike(query_str))
-    ).limit(20).all()
-    
-    return results
+    if creditor_index.is_stale():
+        await db.run_sync(creditor_index.load)
+    etag = http_cache.make_etag("creditors", creditor_index.version, q)
+    cached = http_cache.not_modified(request, response, etag, http_cache.PUBLIC_SHORT)
+    if cached:
+        return cached
+    return creditor_index.search(q, limit=20)
 
 @router.post("/batch", response_model=BatchResponse)
-def process_batch(
-    db: deps.SessionDep,
+async def process_batch(
+    db: deps.AsyncSessionDep,
     payload: BatchRawRequest,
 ):
     """
     MOTOR INTELIGENTE: Procesa texto crudo, limpia, busca y clasifica.
-    Devuelve { found: [...], unknown: [...] }
+    Devuelve { found: [...], unknown: [...], suggestions: [...] }
     """
     lines = payload.raw_text.split('\n')
     valid_hits = []
@@ -90,11 +107,12 @@ def process_batch(
             input_map[cleaned] = line.strip() # Guardamos referencia original si quieres
     
     if not clean_inputs:
-        return {"found": [], "unknown": []}
+        return {"found": [], "unknown": [], "suggestions": []}
 
     # B. Búsqueda Optimizada (Una sola consulta SQL gigante con IN)
     # Buscamos coincidencias exactas en la abreviación
-    matches = db.query(Creditor).filter(Creditor.abreviation.in_(clean_inputs)).all()
+    result = await db.execute(select(Creditor).where(Creditor.abreviation.in_(clean_inputs)))
+    matches = result.scalars().all()
     
     # Crear mapa rápido {CODIGO_DB: OBJETO_DB}
     db_map = {c.abreviation: c for c in matches}
@@ -118,11 +136,23 @@ def process_batch(
         
         processed_codes.add(code)
 
-    return {"found": valid_hits, "unknown": unknowns}
+    # D. Resolución Aproximada (Fuzzy) de los desconocidos contra el índice en memoria
+    suggestions = []
+    if unknowns:
+        if creditor_index.is_stale():
+            await db.run_sync(creditor_index.load)
+        # El scoring es CPU puro: fuera del event loop para no frenar otras requests
+        fuzzy = await run_in_threadpool(creditor_index.suggest, unknowns)
+        suggestions = [
+            {"input": code, "suggestions": fuzzy[code]}
+            for code in unknowns if fuzzy.get(code)
+        ]
+
+    return {"found": valid_hits, "unknown": unknowns, "suggestions": suggestions}
 
 @router.post("/report-miss", response_model=schemas.SearchMissOut)
-def report_missing_code(
-    db: deps.SessionDep,
+async def report_missing_code(
+    db: deps.AsyncSessionDep,
     miss_in: schemas.SearchMissCreate,
 ):
     """
@@ -133,6 +163,5 @@ def report_missing_code(
         cordoba_id=miss_in.cordoba_id
     )
     db.add(new_miss)
-    db.commit()
-    db.refresh(new_miss)
+    await db.commit()
     return new_miss
\ No newline at end of file
@@ -1,45 +1,77 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from pydantic import ValidationError
+from typing import Annotated, Any, List
 from sqlalchemy.orm import Session
-from sqlalchemy import text
-from datetime import datetime
+from sqlalchemy import select, text
+from datetime import datetime, timedelta
 import pytz
-import re
 
 from app.api import deps
+from app.core.config import settings
+from app.crud import crud_log, crud_stats
 from app.models.models import Log, User
 from app.schemas import schemas
+from app.services import live_feed
+from app.services.dashboard_cache import dashboard_cache
+from app.services.log_writer import log_writer
 
 router = APIRouter()
 
+# Ventana de /history: con Logs particionada por mes, una cota sobre created_at
+# evita planificar todas las particiones del histórico
+HISTORY_WINDOW_DAYS = 31
+
 # --- 1. OBTENER HISTORIAL DEL AGENTE ---
 @router.get("/history", response_model=List[schemas.LogOut])
-def get_agent_history(
-    db: deps.SessionDep,
-    current_user: User = Depends(deps.get_current_user),
+async def get_agent_history(
+    db: deps.AsyncSessionDep,
+    current_user: User = Depends(deps.get_current_user_async),
     limit: int = 15
 ):
     """Devuelve las últimas notas creadas por el agente actual."""
-    logs = db.query(Log)\
-        .filter(Log.agent == current_user.username)\
-        .order_by(Log.created_at.desc())\
-        .limit(limit)\
-        .all()
+    query = (
+        select(Log)
+        .where(Log.agent == current_user.username)
+        .order_by(Log.created_at.desc())
+        .limit(limit)
+    )
+    # Primero solo las particiones recientes; todo el histórico si no alcanza
+    since = datetime.now(pytz.utc) - timedelta(days=HISTORY_WINDOW_DAYS)
+    logs = (await db.execute(query.where(Log.created_at >= since))).scalars().all()
+    if len(logs) < limit:
+        logs = (await db.execute(query)).scalars().all()
     return logs
 
+# --- 1b. NAVEGAR NOTAS DEL AGENTE (PAGINACIÓN KEYSET) ---
+@router.get("/browse", response_model=schemas.LogPage)
+async def browse_agent_logs(
+    filters: Annotated[schemas.LogBrowseFilters, Query()],
+    db: deps.AsyncSessionDep,
+    current_user: User = Depends(deps.get_current_user_async)
+):
+    """Notas del agente actual, más nuevas primero; seguir con `cursor=next_cursor`."""
+    try:
+        return await db.run_sync(crud_log.browse_logs, filters, current_user.username)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 # --- 2. GUARDAR NUEVA NOTA ---
 @router.post("/", response_model=schemas.LogOut)
-def create_log(
+async def create_log(
     log_in: schemas.LogCreate,
-    db: deps.SessionDep,
-    current_user: User = Depends(deps.get_current_user)
+    db: deps.AsyncSessionDep,
+    current_user: User = Depends(deps.get_current_user_async)
 ):
     """Guarda el log operativo en la base de datos."""
-    
+    if settings.LOG_GROUP_COMMIT:
+        # Se escribe junto con otras notas; responde recién después del commit del lote
+        row = crud_log.build_log_row(log_in, current_user.username, current_user.id, datetime.now(pytz.utc))
+        row["id"], row["created_at"] = await log_writer.submit(row, agent_real_name=current_user.name)
+        dashboard_cache.invalidate(current_user.id)
+        return schemas.LogOut(**row)
+
     # Sanitización de seguridad (ocultar tarjetas/cuentas)
-    clean_comments = log_in.comments
-    if clean_comments:
-        clean_comments = re.sub(r'\b\d{4,}\b', '[####]', clean_comments)
+    clean_comments = crud_log.redact_comments(log_in.comments)
 
     new_log = Log(
         user_id=current_user.id,
@@ -56,7 +88,67 @@ def create_log(
     )
     
     db.add(new_log)
-    db.commit()
-    db.refresh(new_log)
+    await db.flush()  # Asigna el id para el feed
+    # Rollup diario en la misma transacción (KPIs, /admin/stats, reporte Estratégico)
+    await db.run_sync(crud_stats.record_log, new_log)
+    # Feed del admin: pg_notify se entrega con el commit, a todos los workers
+    await db.run_sync(live_feed.notify, [live_feed.log_message(new_log, current_user.name)])
+    await db.commit()
+    # Sus KPIs cambiaron (los demás workers se enteran por el NOTIFY del feed)
+    dashboard_cache.invalidate(current_user.id)
     
-    return new_log
\ No newline at end of file
+    return new_log
+
+# --- 3. CARGA MASIVA DE NOTAS ---
+@router.post("/batch", response_model=schemas.LogBatchResponse)
+async def create_logs_batch(
+    items: Annotated[List[Any], Body()],
+    db: deps.AsyncSessionDep,
+    current_user: User = Depends(deps.get_current_user_async)
+):
+    """
+    Guarda muchas notas de una vez (agentes offline, importación del sistema anterior).
+    Cada ítem se valida por separado: los inválidos se informan y el resto se guarda
+    con un INSERT multi-fila en una sola transacción.
+    """
+    if len(items) > settings.LOG_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Máximo {settings.LOG_BATCH_MAX_ITEMS} notas por lote"
+        )
+
+    results = [None] * len(items)
+    valid, positions = [], []
+    for index, raw in enumerate(items):
+        try:
+            valid.append(schemas.LogCreate.model_validate(raw))
+            positions.append(index)
+        except ValidationError as e:
+            errors = "; ".join(
+                f"{'.'.join(str(p) for p in err['loc']) or 'item'}: {err['msg']}" for err in e.errors()
+            )
+            results[index] = schemas.LogBatchItemResult(index=index, ok=False, error=errors)
+
+    inserted = await db.run_sync(
+        crud_log.create_audit_logs_bulk, valid, current_user.username, current_user.id
+    )
+    # Al feed solo le interesan las últimas FEED_SIZE del lote
+    recent = list(zip(valid, inserted))[-live_feed.FEED_SIZE:]
+    await db.run_sync(live_feed.notify, [
+        live_feed.feed_message(
+            log_id, created_at, current_user.name, log_in.cordoba_id, log_in.result, log_in.affiliate, current_user.id
+        )
+        for log_in, (log_id, created_at) in recent
+    ])
+    await db.commit()
+    if inserted:
+        dashboard_cache.invalidate(current_user.id)
+
+    for index, (log_id, created_at) in zip(positions, inserted):
+        results[index] = schemas.LogBatchItemResult(index=index, ok=True, id=log_id, created_at=created_at)
+
+    return schemas.LogBatchResponse(
+        inserted=len(inserted),
+        failed=len(items) - len(inserted),
+        results=results,
+    )
@@ -1,64 +1,75 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from typing import List
-from app.api import deps
+from app.api import deps, http_cache
+from app.crud import crud_update
 from app.models import models
 from app.schemas import schemas
+from app.services.updates_cache import updates_cache
 
 router = APIRouter()
 
 # --- 1. OBTENER NOTICIAS (CON ESTADO DE LECTURA) ---
 @router.get("/", response_model=List[schemas.UpdateOut])
-def read_active_updates(
-    db: deps.SessionDep,
-    current_user: models.User = Depends(deps.get_current_user)
+async def read_active_updates(
+    request: Request,
+    response: Response,
+    db: deps.AsyncSessionDep,
+    current_user: models.User = Depends(deps.get_current_user_async)
 ):
     """
     Obtiene las noticias activas y añade el campo 'read' (True/False)
     específico para el usuario actual.
+    Responde 304 si ni las noticias ni lo que leyó el usuario cambiaron.
     """
-    # 1. Traer todas las noticias activas
-    active_updates = db.query(models.Update).filter(models.Update.active == True).all()
-    
-    # 2. Traer los IDs que el usuario YA leyó
-    # Consultamos solo la tabla de relación 'UpdateRead'
-    read_records = db.query(models.UpdateRead.update_id)\
-        .filter(models.UpdateRead.username == current_user.username)\
-        .all()
-    
-    # Convertimos la lista de resultados a un Set para búsqueda rápida (O(1))
-    # read_records viene como lista de tuplas [(1,), (5,), ...], extraemos el ID
-    read_ids = {r.update_id for r in read_records}
+    # 1. Noticias activas desde la caché del worker (la BD solo si cambiaron)
+    active = await db.run_sync(updates_cache.active)
 
-    # 3. Inyectar el estado 'read' en cada objeto antes de enviarlo
-    for update in active_updates:
-        # Verificamos si el ID de la noticia está en el set de leídas
-        is_read = update.id in read_ids
-        
-        # Asignamos el atributo dinámicamente para que el Schema lo recoja
-        setattr(update, 'read', is_read)
+    # 2. Cuáles ya leyó: caché por usuario o una sola consulta por índice (user_id, update_id)
+    read_ids = await db.run_sync(updates_cache.read_ids, current_user.id, active)
 
-    return active_updates
+    etag = http_cache.make_etag("updates", active.digest, current_user.id, sorted(read_ids))
+    cached = http_cache.not_modified(request, response, etag, http_cache.PRIVATE_REVALIDATE)
+    if cached:
+        return cached
 
-# --- 2. MARCAR COMO LEÍDA ---
-@router.post("/{update_id}/read")
-def mark_as_read(
+    # 3. Los objetos cacheados se comparten entre requests: se copian, nunca se modifican
+    return [
+        update.model_copy(update={"read": True}) if update.id in read_ids else update
+        for update in active.updates
+    ]
+
+# --- 2. MARCAR COMO LEÍDAS ---
+async def _mark_read(db, current_user: models.User, update_ids=None) -> schemas.UpdateReadResult:
+    marked = await db.run_sync(crud_update.mark_read, current_user.id, update_ids)
+    if marked:
+        await db.run_sync(updates_cache.reads_changed, current_user.id)
+    await db.commit()
+    if marked:
+        updates_cache.invalidate_reads(str(current_user.id))
+    return schemas.UpdateReadResult(marked=marked)
+
+@router.post("/read", response_model=schemas.UpdateReadResult)
+async def mark_many_as_read(
+    body: schemas.UpdateReadRequest,
+    db: deps.AsyncSessionDep,
+    current_user: models.User = Depends(deps.get_current_user_async)
+):
+    """Registra la lectura de varias noticias en un solo INSERT (las ya leídas se ignoran)."""
+    return await _mark_read(db, current_user, body.update_ids)
+
+@router.post("/read-all", response_model=schemas.UpdateReadResult)
+async def mark_all_as_read(
+    db: deps.AsyncSessionDep,
+    current_user: models.User = Depends(deps.get_current_user_async)
+):
+    """Marca como leídas todas las noticias activas."""
+    return await _mark_read(db, current_user)
+
+@router.post("/{update_id}/read", response_model=schemas.UpdateReadResult)
+async def mark_as_read(
     update_id: int,
-    db: deps.SessionDep,
-    current_user: models.User = Depends(deps.get_current_user)
+    db: deps.AsyncSessionDep,
+    current_user: models.User = Depends(deps.get_current_user_async)
 ):
-    """Registra que el agente leyó la noticia."""
-    # Evitamos duplicados
-    already_read = db.query(models.UpdateRead).filter(
-        models.UpdateRead.update_id == update_id,
-        models.UpdateRead.username == current_user.username
-    ).first()
-    
-    if not already_read:
-        new_read = models.UpdateRead(
-            update_id=update_id,
-            username=current_user.username
-        )
-        db.add(new_read)
-        db.commit()
-    
-    return {"status": "success", "message": "Update marked as read"}
\ No newline at end of file
+    """Registra que el agente leyó la noticia (equivale a POST /updates/read con un id)."""
+    return await _mark_read(db, current_user, [update_id])
@@ -1,14 +1,91 @@
-from typing import List
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 #from pydantic import AnyHttpUrl
 
 class Settings(BaseSettings):
     # FastAPI leerá automáticamente estas variables del archivo .env
     DATABASE_URL: str
+    # URL para el engine async (asyncpg). Si no se define, se deriva de DATABASE_URL.
+    ASYNC_DATABASE_URL: Optional[str] = None
     SECRET_KEY: str
+
+    # Pools de conexiones (el engine sync y el async tienen uno cada uno, por worker).
+    # Máximo de conexiones = workers x 2 x (POOL_SIZE + MAX_OVERFLOW), más el LISTEN
+    # del feed y los procesos de reportes: con 4 workers, 160 de las 200 de Postgres.
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 10     # Espera máxima por una conexión libre (después, error)
+    DB_POOL_RECYCLE_SECONDS: int = 1800     # Reabre conexiones más viejas que esto
+    DB_POOL_PRE_PING: bool = True           # Descarta conexiones muertas (reinicio de Postgres) al prestarlas
+    # Límite por consulta en el servidor (0 = sin límite). Los comandos de
+    # manage.py y los procesos de reportes no lo aplican.
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    # /health/ready: cuánto esperar el SELECT 1 antes de declararse no listo
+    DB_READY_TIMEOUT_SECONDS: float = 2
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 480
 
+    # Índice de acreedores en memoria: segundos antes de recargarlo desde la BD
+    # (sincroniza altas/ediciones hechas en otros workers). 0 = nunca.
+    CREDITOR_INDEX_REFRESH_SECONDS: int = 300
+
+    # Caché de usuarios autenticados (evita consultar Users en cada request).
+    # El TTL acota cuánto tarda otro worker en ver una desactivación. 0 = sin caché.
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+
+    # Dashboard del agente (/workspace/information) en caché por usuario:
+    # fresco TTL segundos, después se sirve viejo STALE segundos más mientras se
+    # recalcula en segundo plano. MAX_REFRESHES = cálculos en paralelo por worker.
+    DASHBOARD_CACHE_TTL_SECONDS: int = 15
+    DASHBOARD_CACHE_STALE_SECONDS: int = 120
+    DASHBOARD_CACHE_MAX_REFRESHES: int = 8
+    DASHBOARD_CACHE_MAX_ENTRIES: int = 5000
+
+    # Pool de procesos para bcrypt (login, cambio y alta de contraseñas).
+    # Con más de MAX_PENDING tareas en cola se responde 503 + Retry-After.
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 2
+
+    # Máximo de notas por request en POST /logs/batch
+    LOG_BATCH_MAX_ITEMS: int = 10000
+
+    # Group commit de POST /logs/ (opcional): las notas se agrupan y se escriben
+    # en una sola transacción cada MAX_WAIT_MS o cada MAX_ROWS filas.
+    LOG_GROUP_COMMIT: bool = False
+    LOG_GROUP_COMMIT_MAX_ROWS: int = 100
+    LOG_GROUP_COMMIT_MAX_WAIT_MS: int = 10
+
+    # Logs particionada por mes: meses futuros que se crean por adelantado
+    # (python manage.py ensure-partitions, al iniciar la API y periódicamente)
+    LOG_PARTITION_MONTHS_AHEAD: int = 3
+    # Cada cuánto cada worker revisa y crea las que falten (0 = solo al iniciar)
+    LOG_PARTITION_CHECK_SECONDS: int = 6 * 3600
+
+    # Archivo frío: meses de Logs más viejos que esto pasan a Parquet en disco
+    # (python manage.py archive-logs). Volumen persistente con backup ("log_archive" en
+    # docker-compose), marcado con archive-logs --init-volume: sin la marca no se archiva.
+    LOG_ARCHIVE_DIR: str = "/var/lib/cordoba/archive/logs"
+    LOG_ARCHIVE_AFTER_MONTHS: int = 12
+
+    # Cola de reportes en segundo plano (POST /admin/reports).
+    # Pocos procesos y con prioridad baja (nice) para no competir con los agentes.
+    REPORT_DIR: str = "/tmp/cordoba_reports"
+    REPORT_WORKERS: int = 1
+    REPORT_WORKER_NICE: int = 10
+    REPORT_MAX_PENDING: int = 10   # Trabajos en cola/ejecución antes de rechazar (429)
+    # Un trabajo "running" más viejo que esto se da por muerto (reinicio, OOM) y pasa a "failed"
+    REPORT_JOB_TIMEOUT_SECONDS: int = 2 * 3600
+    # Retención: el archivo de un trabajo terminado se borra a las FILE_TTL horas
+    # (la descarga responde 410) y la fila del trabajo a los HISTORY_DAYS días
+    REPORT_JOB_FILE_TTL_HOURS: int = 24
+    REPORT_JOB_HISTORY_DAYS: int = 30
+
+    # Caché en disco de reportes ya generados (LRU por tamaño total)
+    REPORT_CACHE_DIR: str = "/tmp/cordoba_reports/cache"
+    REPORT_CACHE_MAX_BYTES: int = 500 * 1024 * 1024
+
     BACKEND_CORS_ORIGINS: List[str] = [
         "http://localhost:5173",    # Frontend Vite local
         "http://127.0.0.1:5173",    # Alternativa local
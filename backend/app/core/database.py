@@ -1,13 +1,65 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from . import pool_metrics
 from .config import settings
 
+# Mismas opciones para los dos pools (ver DB_POOL_* en config)
+POOL_OPTIONS = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+
+# statement_timeout de cada conexión nueva (ms, 0 = sin límite). Los procesos
+# batch (manage.py, reportes) lo quitan con set_statement_timeout(0) antes de conectarse
+_statement_timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
+
+def set_statement_timeout(ms: int) -> None:
+    """Cambia el límite de las conexiones que se abran desde ahora en este proceso."""
+    global _statement_timeout_ms
+    _statement_timeout_ms = ms
+
+def _apply_statement_timeout(dbapi_connection, connection_record):
+    if not _statement_timeout_ms:
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"SET statement_timeout = {int(_statement_timeout_ms)}")
+    cursor.close()
+    # Con la transacción abierta por el SET, el rollback al devolverla lo desharía
+    dbapi_connection.commit()
+
 # El "engine" gestiona el pool de conexiones de forma eficiente
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, poolclass=pool_metrics.TimedQueuePool, **POOL_OPTIONS)
+event.listen(engine, "connect", _apply_statement_timeout)
+pool_metrics.instrument(engine, "sync", settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def get_async_database_url() -> str:
+    """postgresql://... -> postgresql+asyncpg://... (salvo que se configure explícita)."""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+# Engine async para las rutas calientes: no ocupa un hilo del threadpool por request
+async_engine = create_async_engine(
+    get_async_database_url(), poolclass=pool_metrics.TimedAsyncQueuePool, **POOL_OPTIONS
+)
+event.listen(async_engine.sync_engine, "connect", _apply_statement_timeout)
+pool_metrics.instrument(async_engine.sync_engine, "async", settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 # Esta es una "Dependencia" de FastAPI. 
@@ -17,4 +69,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
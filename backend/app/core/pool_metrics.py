@@ -0,0 +1,164 @@
+# --- app/core/pool_metrics.py ---
+"""
+Métricas de los pools de conexiones de este worker (engine sync y async).
+
+La espera por una conexión se mide en el propio pool (TimedQueuePool): incluye
+la cola cuando están todas prestadas y la apertura de una de overflow. Los
+préstamos, devoluciones, conexiones nuevas e invalidaciones salen de los
+eventos del pool. /admin/db-stats lo muestra completo y /health/ready usa
+saturated() para dejar de recibir tráfico mientras haya requests haciendo cola.
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, Tuple
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Esperas recientes para los percentiles
+SAMPLES = 1024
+# Desde acá un préstamo cuenta como "lento" (hubo cola o se abrió una conexión)
+SLOW_CHECKOUT_SECONDS = 0.01
+
+
+class PoolMetrics:
+    def __init__(self, name: str, size: int, max_overflow: int):
+        self.name = name
+        self.capacity = size + max(max_overflow, 0)
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=SAMPLES)
+        self.waiting = 0          # Requests pidiendo conexión en este momento
+        self.max_wait = 0.0
+        self.slow_checkouts = 0
+        self.timeouts = 0         # DB_POOL_TIMEOUT_SECONDS vencido (el request falla)
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0    # Conexiones descartadas (pre-ping, errores de red)
+        self.peak_in_use = 0
+
+    def timed_get(self, get):
+        with self._lock:
+            self.waiting += 1
+        start = time.perf_counter()
+        try:
+            return get()
+        except exc.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._lock:
+                self.waiting -= 1
+                self._waits.append(waited)
+                self.max_wait = max(self.max_wait, waited)
+                if waited >= SLOW_CHECKOUT_SECONDS:
+                    self.slow_checkouts += 1
+
+    # --- Eventos del pool ---
+
+    def attach(self, engine: Engine) -> None:
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            in_use = engine.pool.checkedout()
+            with self._lock:
+                self.checkouts += 1
+                self.peak_in_use = max(self.peak_in_use, in_use)
+
+        def on_checkin(dbapi_connection, connection_record):
+            with self._lock:
+                self.checkins += 1
+
+        def on_connect(dbapi_connection, connection_record):
+            with self._lock:
+                self.connects += 1
+
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.invalidations += 1
+
+        # Sobre el engine: los eventos pasan al pool nuevo si se recrea (dispose)
+        event.listen(engine, "checkout", on_checkout)
+        event.listen(engine, "checkin", on_checkin)
+        event.listen(engine, "connect", on_connect)
+        event.listen(engine, "invalidate", on_invalidate)
+
+    # --- Lectura ---
+
+    def usage(self, pool: QueuePool) -> dict:
+        """Ocupación actual (barata: para la readiness probe)."""
+        in_use = pool.checkedout()
+        return {
+            "in_use": in_use,
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "capacity": self.capacity,
+            "waiting": self.waiting,
+            "saturation": round(in_use / self.capacity, 2) if self.capacity else 0.0,
+        }
+
+    def stats(self, pool: QueuePool) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+        p50 = waits[len(waits) // 2] if waits else 0.0
+        p95 = waits[max(0, int(len(waits) * 0.95) - 1)] if waits else 0.0
+        return {
+            **self.usage(pool),
+            "peak_in_use": self.peak_in_use,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "slow_checkouts": self.slow_checkouts,
+            "wait_p50_ms": round(p50 * 1000, 2),
+            "wait_p95_ms": round(p95 * 1000, 2),
+            "wait_max_ms": round(self.max_wait * 1000, 2),
+        }
+
+
+class _TimedPool:
+    """Mide cuánto tarda el pool en entregar una conexión."""
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        return self.metrics.timed_get(super()._do_get)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_TimedPool, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+# name -> (engine, métricas)
+_pools: Dict[str, Tuple[Engine, PoolMetrics]] = {}
+
+def instrument(engine: Engine, name: str, size: int, max_overflow: int) -> None:
+    """Engine creado con poolclass=Timed*Pool (para el async, su sync_engine)."""
+    metrics = PoolMetrics(name, size, max_overflow)
+    engine.pool.metrics = metrics
+    metrics.attach(engine)
+    _pools[name] = (engine, metrics)
+
+def usage() -> dict:
+    return {name: metrics.usage(engine.pool) for name, (engine, metrics) in _pools.items()}
+
+def stats() -> dict:
+    return {name: metrics.stats(engine.pool) for name, (engine, metrics) in _pools.items()}
+
+def saturated(current: dict) -> list:
+    """Pools sin conexiones libres y con requests haciendo cola."""
+    return [
+        name for name, pool in current.items()
+        if pool["in_use"] >= pool["capacity"] and pool["waiting"] > 0
+    ]
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import or_
 from app.models import models
 from app.schemas import schemas
+from app.services.creditor_index import creditor_index
 
 def get_creditors(db: Session, query: str = None, limit: int = 100):
     """Busca acreedores por nombre o abreviación."""
@@ -39,6 +40,7 @@ def create_creditor(db: Session, creditor_in: schemas.CreditorCreate):
     db.add(db_creditor)
     db.commit()
     db.refresh(db_creditor)
+    creditor_index.upsert(db_creditor)
     return db_creditor
 
 def update_creditor(db: Session, creditor_id: int, creditor_in: schemas.CreditorUpdate):
@@ -48,6 +50,7 @@ def update_creditor(db: Session, creditor_id: int, creditor_in: schemas.Creditor
             setattr(db_creditor, field, value)
         db.commit()
         db.refresh(db_creditor)
+        creditor_index.upsert(db_creditor)
     return db_creditor
 
 def delete_search_miss(db: Session, miss_id: int):
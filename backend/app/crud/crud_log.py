@@ -1,7 +1,18 @@
-import pandas as pd
+import base64
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List, Optional
+
+import pytz
+from sqlalchemy import bindparam, func, insert, select, text, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Session
 from app.models import models
 from app.schemas import schemas
+from app.crud import crud_stats
+from app.services import log_archive
 
 def create_audit_log(db: Session, log_in: schemas.LogCreate, agent_name: str, current_user_id: int):
     """Crea un nuevo registro de auditoría en la base de datos."""
@@ -18,50 +29,223 @@ def create_audit_log(db: Session, log_in: schemas.LogCreate, agent_name: str, cu
         transfer_status=log_in.transfer_status
     )
     db.add(db_log)
+    crud_stats.record_log(db, db_log)
     db.commit()
     db.refresh(db_log)
     return db_log
 
+# Sanitización de seguridad (ocultar tarjetas/cuentas)
+CARD_PATTERN = re.compile(r'\b\d{4,}\b')
+
+def redact_comments(comments):
+    if not comments:
+        return comments
+    return CARD_PATTERN.sub('[####]', comments)
+
+# Columnas que se cargan en bloque con insert_log_rows
+BULK_COLUMNS = (
+    "user_id", "agent", "customer", "cordoba_id", "result", "comments",
+    "affiliate", "info_until", "client_language", "transfer_status", "created_at",
+)
+LOG_ID_SEQUENCE = '"Logs_id_seq"'
+
+def build_log_row(log_in: schemas.LogCreate, agent_name: str, current_user_id: int, created_at: datetime) -> dict:
+    """Fila lista para insert_log_rows (con los comentarios ya sanitizados)."""
+    return {
+        "user_id": current_user_id,
+        "agent": agent_name,
+        "customer": log_in.customer,
+        "cordoba_id": log_in.cordoba_id,
+        "result": log_in.result,
+        "comments": redact_comments(log_in.comments),
+        "affiliate": log_in.affiliate,
+        "info_until": log_in.info_until,
+        "client_language": log_in.client_language,
+        "transfer_status": log_in.transfer_status,
+        "created_at": created_at,
+    }
+
+def insert_log_rows(db: Session, rows: List[dict]) -> list:
+    """
+    Inserta muchos logs en UNA sentencia: un arreglo por columna y
+    INSERT ... SELECT * FROM unnest(...) (un parámetro por columna sin importar
+    el tamaño del lote). Actualiza el rollup con un solo upsert.
+    No hace commit. Devuelve [(id, created_at)] en el orden de `rows`.
+    """
+    if not rows:
+        return []
+    # Los ids se piden antes y viajan como una columna más: Postgres no garantiza
+    # en qué orden evalúa nextval ni el orden de RETURNING, y cada id vuelve a
+    # un request (lote, group commit, feed) que no puede recibir el de otro
+    ids = db.execute(
+        text(f"SELECT nextval('{LOG_ID_SEQUENCE}') FROM generate_series(1, :n)"), {"n": len(rows)}
+    ).scalars().all()
+    columns = ("id",) + BULK_COLUMNS
+    values = {"id": ids, **{c: [r[c] for r in rows] for c in BULK_COLUMNS}}
+    table = models.Log.__table__
+    arrays = [
+        bindparam(f"bulk_{c}", values[c], type_=ARRAY(table.c[c].type))
+        for c in columns
+    ]
+    source = func.unnest(*arrays).table_valued(*columns).render_derived()
+    db.execute(insert(table).from_select(list(columns), select(*[source.c[c] for c in columns])))
+
+    crud_stats.record_logs(db, (SimpleNamespace(**row) for row in rows))
+    return [(log_id, row["created_at"]) for log_id, row in zip(ids, rows)]
+
+def create_audit_logs_bulk(db: Session, logs_in: List[schemas.LogCreate], agent_name: str, current_user_id: int) -> list:
+    """Carga en lote de un agente (POST /logs/batch). No hace commit."""
+    now = datetime.now(pytz.utc)
+    return insert_log_rows(db, [build_log_row(log_in, agent_name, current_user_id, now) for log_in in logs_in])
+
 def get_my_logs(db: Session, agent_name: str, limit: int = 10):
     """Recupera las últimas notas del agente actual para el historial en el frontend."""
     return db.query(models.Log).filter(
         models.Log.agent == agent_name
     ).order_by(models.Log.created_at.desc()).limit(limit).all()
 
-def get_logs_for_report(db: Session, start_date, end_date, target_agent: str):
+def encode_cursor(created_at: datetime, log_id: int) -> str:
+    """Cursor opaco para la paginación keyset: posición (created_at, id) del último log."""
+    raw = f"{created_at.isoformat()}|{log_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    """Inversa de encode_cursor. ValueError si el cursor no es válido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, log_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(log_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Cursor inválido") from e
+
+def browse_logs(db: Session, filters: schemas.LogBrowseFilters, agent_name: Optional[str] = None) -> schemas.LogPage:
+    """
+    Página de logs más nuevos primero, con paginación keyset sobre (created_at, id):
+    cada página arranca justo después del cursor usando el índice compuesto del
+    filtro, así la página 1.000 cuesta lo mismo que la primera (sin OFFSET).
+    `agent_name` fija el agente (vista del propio agente); si no, se usa filters.agent.
+    """
+    log = models.Log
+    conditions = []
+    agent = agent_name or filters.agent
+    if agent:
+        conditions.append(log.agent == agent)
+    if filters.result:
+        conditions.append(log.result == filters.result)
+    if filters.affiliate:
+        conditions.append(log.affiliate == filters.affiliate)
+    if filters.cordoba_id:
+        conditions.append(log.cordoba_id == filters.cordoba_id)
+    if filters.start_date:
+        conditions.append(log.created_at >= datetime.combine(filters.start_date, datetime.min.time(), pytz.utc))
+    if filters.end_date:
+        end = datetime.combine(filters.end_date + timedelta(days=1), datetime.min.time(), pytz.utc)
+        conditions.append(log.created_at < end)
+    if filters.cursor:
+        created_at, log_id = decode_cursor(filters.cursor)
+        conditions.append(tuple_(log.created_at, log.id) < tuple_(created_at, log_id))
+
+    rows = db.scalars(
+        select(log).where(*conditions)
+        .order_by(log.created_at.desc(), log.id.desc())
+        .limit(filters.limit + 1)  # Una de más para saber si hay otra página
+    ).all()
+    items = rows[:filters.limit]
+    next_cursor = encode_cursor(items[-1].created_at, items[-1].id) if len(rows) > filters.limit else None
+    return schemas.LogPage(items=items, next_cursor=next_cursor)
+
+def report_filters(start_date, end_date, target_agent: str) -> list:
     """
-    Extrae y filtra los logs para la generación de reportes Excel.
+    Condiciones WHERE comunes a todos los reportes.
     Replica la lógica de filtrado de admin_service.py.
     """
     # 1. Definimos el rango de fechas para cubrir el día completo
     start_str = f"{start_date} 00:00:00"
     end_str = f"{end_date} 23:59:59"
-    
-    query = db.query(models.Log).filter(
+    filters = [
         models.Log.created_at >= start_str,
         models.Log.created_at <= end_str
-    )
+    ]
     
     # 2. Aplicamos filtros de agente según la selección del administrador
     if "TODOS" not in target_agent:
         # Búsqueda insensible a mayúsculas para mayor flexibilidad
-        query = query.filter(models.Log.agent.ilike(target_agent))
+        filters.append(models.Log.agent.ilike(target_agent))
     else:
         # Excluimos registros de prueba por defecto
-        query = query.filter(models.Log.agent != 'test')
-    
-    # 3. Obtenemos los resultados y convertimos a DataFrame para el generador de Excel
-    results = query.order_by(models.Log.created_at.desc()).all()
-    
-    if not results:
-        return pd.DataFrame()
-        
-    # Convertimos los objetos SQLAlchemy a diccionarios planos
-    data = []
-    for r in results:
-        # El método __dict__ de SQLAlchemy incluye una clave interna '_sa_instance_state' que removemos
-        d = r.__dict__.copy()
-        d.pop('_sa_instance_state', None)
-        data.append(d)
-        
-    return pd.DataFrame(data)
\ No newline at end of file
+        filters.append(models.Log.agent != 'test')
+    return filters
+
+def get_report_agents(db: Session, start_date, end_date, target_agent: str) -> list:
+    """Agentes con logs en el rango, en el orden de las hojas del reporte Operativo."""
+    agents = db.scalars(
+        select(models.Log.agent).distinct().where(*report_filters(start_date, end_date, target_agent))
+    ).all()
+    archived = {
+        row[0] for rows in log_archive.iter_archived(start_date, end_date, target_agent, columns=("agent",))
+        for row in rows
+    }
+    return sorted(set(agents) | archived, key=lambda x: str(x).lower())
+
+def count_logs_for_report(db: Session, start_date, end_date, target_agent: str) -> int:
+    return db.scalar(
+        select(func.count()).select_from(models.Log).where(*report_filters(start_date, end_date, target_agent))
+    ) + log_archive.count_archived(start_date, end_date, target_agent)
+
+def iter_logs_for_report(db: Session, start_date, end_date, target_agent: str, chunk_size: int = 2000):
+    """
+    Recorre los logs del reporte con un cursor del lado del servidor (yield_per):
+    solo `chunk_size` filas en memoria a la vez, sin objetos ORM ni DataFrame.
+    Después de la BD siguen los meses archivados, que son todos más viejos.
+    """
+    log = models.Log
+    columns = ("agent", "created_at", "cordoba_id", "info_until", "result", "transfer_status", "comments")
+    query = (
+        select(*(getattr(log, c) for c in columns))
+        .where(*report_filters(start_date, end_date, target_agent))
+        .order_by(log.created_at.desc())
+        .execution_options(yield_per=chunk_size)
+    )
+    yield from db.execute(query)
+    for rows in log_archive.iter_archived(
+        start_date, end_date, target_agent, columns=columns, descending=True, chunk_size=chunk_size
+    ):
+        yield from rows
+
+def get_funnel_counts(db: Session, start_date, end_date, target_agent: str) -> list:
+    """Conteo por etapa (info_until) para el reporte de Calidad, agregado en SQL."""
+    count = func.count()
+    query = (
+        select(models.Log.info_until, count)
+        .where(*report_filters(start_date, end_date, target_agent), models.Log.info_until.isnot(None))
+        .group_by(models.Log.info_until)
+        .order_by(count.desc())
+    )
+    counts = Counter(dict(tuple(r) for r in db.execute(query)))
+    for rows in log_archive.iter_archived(start_date, end_date, target_agent, columns=("info_until",)):
+        counts.update(stage for (stage,) in rows if stage is not None)
+    return counts.most_common()
+
+# Columnas de la exportación cruda (CSV/NDJSON), en orden
+EXPORT_COLUMNS = (
+    "id", "created_at", "user_id", "agent", "customer", "cordoba_id", "result",
+    "comments", "affiliate", "info_until", "client_language", "transfer_status",
+)
+
+def iter_log_chunks(db: Session, start_date, end_date, target_agent: str, chunk_size: int = 5000):
+    """
+    Bloques de filas crudas (tuplas en el orden de EXPORT_COLUMNS) leídos con un
+    cursor del lado del servidor. Orden cronológico para las cargas de BI:
+    primero los meses archivados, después la BD.
+    """
+    yield from log_archive.iter_archived(
+        start_date, end_date, target_agent, columns=EXPORT_COLUMNS, chunk_size=chunk_size
+    )
+    columns = [getattr(models.Log, c) for c in EXPORT_COLUMNS]
+    query = (
+        select(*columns)
+        .where(*report_filters(start_date, end_date, target_agent))
+        .order_by(models.Log.created_at, models.Log.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    yield from db.execute(query).partitions()
@@ -0,0 +1,100 @@
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Iterable, Optional
+
+import pytz
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models import models
+from app.services.metrics import TZ_ET, classify_result, result_class_sql
+
+def business_date(created_at: datetime) -> date:
+    """Fecha hábil (ET) a la que pertenece un log guardado en UTC."""
+    if created_at.tzinfo is None:
+        created_at = pytz.utc.localize(created_at)
+    return created_at.astimezone(TZ_ET).date()
+
+def record_log(db: Session, log: models.Log) -> None:
+    """
+    Suma el log al rollup dentro de la transacción actual (sin commit).
+    INSERT ... ON CONFLICT DO UPDATE es atómico en Postgres: varios workers
+    insertando a la vez sobre la misma fila nunca pierden incrementos.
+    """
+    if log.created_at is None:
+        db.flush()  # Aplica el default de created_at
+    record_logs(db, [log])
+
+def record_logs(db: Session, logs: Iterable) -> None:
+    """
+    Versión en lote de record_log: agrupa los logs por fila del rollup y hace
+    un único upsert que suma las llamadas de cada grupo.
+    `logs`: objetos con user_id, created_at, result, affiliate y client_language.
+    """
+    counts = Counter(
+        (log.user_id, business_date(log.created_at), classify_result(log.result),
+         log.affiliate or "", log.client_language or "")
+        for log in logs
+        if log.user_id is not None  # Igual que backfill: logs sin usuario no entran al rollup
+    )
+    if not counts:
+        return
+    stats = models.AgentDailyStat.__table__
+    stmt = pg_insert(stats).values([
+        {"user_id": user_id, "business_date": day, "result_class": result_class,
+         "affiliate": affiliate, "client_language": language, "calls": calls}
+        for (user_id, day, result_class, affiliate, language), calls in counts.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[stats.c.user_id, stats.c.business_date, stats.c.result_class,
+                        stats.c.affiliate, stats.c.client_language],
+        set_={"calls": stats.c.calls + stmt.excluded.calls},
+    )
+    db.execute(stmt)
+
+def et_midnight_utc(day: date) -> datetime:
+    """Medianoche ET de `day` en UTC (comienzo del día hábil para comparar contra created_at)."""
+    return TZ_ET.localize(datetime.combine(day, datetime.min.time())).astimezone(pytz.utc)
+
+def backfill(db: Session, start: Optional[date] = None, end: Optional[date] = None) -> int:
+    """
+    Reconstruye el rollup desde Logs para el rango [start, end] (fechas ET).
+    Bloquea las escrituras al rollup mientras corre, así los inserts concurrentes
+    esperan y se suman después del recálculo (sin contar doble ni perder filas).
+    """
+    stats = models.AgentDailyStat.__table__
+
+    db.execute(text('LOCK TABLE "Agent_Daily_Stats" IN SHARE ROW EXCLUSIVE MODE'))
+
+    clear = delete(stats)
+    conditions = [models.Log.user_id.isnot(None)]
+    # Límites sobre created_at (no sobre log_date) para que Postgres descarte particiones
+    if start:
+        clear = clear.where(stats.c.business_date >= start)
+        conditions.append(models.Log.created_at >= et_midnight_utc(start))
+    if end:
+        clear = clear.where(stats.c.business_date <= end)
+        conditions.append(models.Log.created_at < et_midnight_utc(end + timedelta(days=1)))
+    db.execute(clear)
+
+    result = db.execute(rollup_insert(conditions))
+    db.commit()
+    return result.rowcount
+
+def rollup_insert(conditions: list):
+    """INSERT ... SELECT que arma el rollup desde Logs (backfill y la migración 0003)."""
+    stats = models.AgentDailyStat.__table__
+    log_date = func.date(func.timezone("US/Eastern", models.Log.created_at))
+    rc = result_class_sql()
+    affiliate = func.coalesce(models.Log.affiliate, "")
+    language = func.coalesce(models.Log.client_language, "")
+    source = (
+        select(models.Log.user_id, log_date, rc, affiliate, language, func.count())
+        .where(*conditions)
+        .group_by(models.Log.user_id, log_date, rc, affiliate, language)
+    )
+    return insert(stats).from_select(
+        ["user_id", "business_date", "result_class", "affiliate", "client_language", "calls"],
+        source,
+    )
@@ -0,0 +1,30 @@
+# --- app/crud/crud_update.py ---
+from typing import Optional, Sequence
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models import models
+
+def mark_read(db: Session, user_id: int, update_ids: Optional[Sequence[int]] = None) -> int:
+    """
+    Registra la lectura de varias noticias en UN INSERT ... SELECT ... ON CONFLICT DO NOTHING
+    (sin consulta previa: el índice único (user_id, update_id) descarta las repetidas,
+    incluso con clics concurrentes). update_ids=None marca todas las activas.
+    Los ids que no existen se ignoran. No hace commit. Devuelve cuántos recibos se crearon.
+    """
+    update = models.Update
+    # read_at es UTC naive (como get_utc_now_naive)
+    source = select(update.id, literal(user_id), func.timezone("UTC", func.now()))
+    if update_ids is None:
+        source = source.where(update.active == True)
+    else:
+        source = source.where(update.id.in_(set(update_ids)))
+    reads = models.UpdateRead.__table__
+    stmt = (
+        pg_insert(reads)
+        .from_select(["update_id", "user_id", "read_at"], source)
+        .on_conflict_do_nothing(index_elements=[reads.c.user_id, reads.c.update_id])
+    )
+    return db.execute(stmt).rowcount
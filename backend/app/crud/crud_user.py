@@ -1,20 +1,23 @@
-from sqlalchemy.orm import Session
-from app.models import models
-from app.schemas import schemas
-from passlib.context import CryptContext
 from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.security import verify_password
-from app.models import models
 
-# Configuración para encriptar contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.security import get_password_hash, verify_password, verify_password_async
+from app.models import models
+from app.schemas import schemas
+from app.services.principal_cache import principal_cache
 
 def get_user_by_username(db: Session, username: str):
     return db.query(models.User).filter(models.User.username == username).first()
 
+def get_user_map(db: Session) -> dict:
+    """Mapa {username: nombre real} para los reportes."""
+    return {u: n for u, n in db.query(models.User.username, models.User.name).all()}
+
 def create_user(db: Session, user: schemas.UserCreate):
-    hashed_password = pwd_context.hash(user.password)
+    hashed_password = get_password_hash(user.password)
     db_user = models.User(
         username=user.username,
         name=user.name,
@@ -24,6 +27,7 @@ def create_user(db: Session, user: schemas.UserCreate):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    principal_cache.invalidate(db_user.username)
     return db_user
 
 def authenticate(db: Session, username: str, password: str) -> Optional[models.User]:
@@ -34,16 +38,25 @@ def authenticate(db: Session, username: str, password: str) -> Optional[models.U
         return None
     return user
 
+async def authenticate_async(db: AsyncSession, username: str, password: str) -> Optional[models.User]:
+    result = await db.execute(select(models.User).where(models.User.username == username))
+    user = result.scalars().first()
+    if not user:
+        return None
+    if not await verify_password_async(password, user.password):
+        return None
+    return user
+
 # --- app/crud/crud_user.py ---
 def update_user_admin(db: Session, user_id: int, user_in: schemas.UserUpdateAdmin):
     db_user = db.query(models.User).filter(models.User.id == user_id).first()
     if not db_user:
         return None
+    old_username = db_user.username
     
     update_data = user_in.model_dump(exclude_unset=True)
     if "password" in update_data and update_data["password"]:
         # Usamos la lógica de security para el hash
-        from app.core.security import get_password_hash
         db_user.password = get_password_hash(update_data["password"])
         del update_data["password"]
 
@@ -51,6 +64,10 @@ def update_user_admin(db: Session, user_id: int, user_in: schemas.UserUpdateAdmi
         setattr(db_user, field, value)
 
     db.add(db_user)
+    # Desactivación o cambio de rol: los demás workers la aplican con el commit
+    principal_cache.notify(db, *{old_username, db_user.username})
     db.commit()
     db.refresh(db_user)
+    principal_cache.invalidate(old_username)
+    principal_cache.invalidate(db_user.username)
     return db_user
\ No newline at end of file
@@ -1,16 +1,81 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core import pool_metrics
+from app.core.database import SessionLocal, async_engine
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routers import auth, creditors, logs, updates, admin, workspace
 
-Base.metadata.create_all(bind=engine)
+from app.services.creditor_index import creditor_index
+from app.services.dashboard_cache import dashboard_cache
+from app.services.log_writer import log_writer
+from app.services.password_hasher import HasherBusyError, password_hasher
+from app.services.principal_cache import principal_cache
+from app.services.updates_cache import updates_cache
+from app.services import live_feed, log_partitions, report_jobs
+
+# El esquema se gestiona con migraciones (alembic upgrade head), no al importar la app
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Precargamos el índice de acreedores para que el autocompletado no toque la BD
+    db = SessionLocal()
+    try:
+        creditor_index.load(db)
+        # Particiones de Logs de los próximos meses (por si el cron no corrió)
+        log_partitions.ensure_partitions(db, settings.LOG_PARTITION_MONTHS_AHEAD)
+        db.commit()
+        # Reportes que quedaron en cola antes de un reinicio
+        report_jobs.runner.resume_queued(db)
+    finally:
+        db.close()
+    # LISTEN del feed en tiempo real del admin (una conexión por worker);
+    # la misma conexión invalida las noticias cacheadas cuando otro worker las cambia
+    live_feed.broadcaster.listen(updates_cache.channel, updates_cache.invalidate)
+    live_feed.broadcaster.listen(updates_cache.reads_channel, updates_cache.invalidate_reads)
+    # ... y los dashboards de los agentes que cargaron notas
+    live_feed.broadcaster.listen(live_feed.CHANNEL, dashboard_cache.on_log_notify)
+    # ... y los usuarios en caché que otro worker desactivó o cambió de rol
+    live_feed.broadcaster.listen(principal_cache.channel, principal_cache.on_notify)
+    live_feed.broadcaster.start()
+    # ... y las sigue creando mientras el worker corra
+    log_partitions.keeper.start()
+    yield
+    await log_partitions.keeper.stop()
+    # Notas encoladas en el group commit: se escriben antes de cerrar
+    await log_writer.stop()
+    await live_feed.broadcaster.stop()
+    password_hasher.shutdown()
+    report_jobs.runner.shutdown()
+
 app = FastAPI(
     title="Cordoba API Professional",
     description="Backend de alta disponibilidad para gestión de auditoría",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Cola de bcrypt llena (login masivo): rechazo rápido para que el cliente reintente
+@app.exception_handler(HasherBusyError)
+async def hasher_busy_handler(request: Request, exc: HasherBusyError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Servidor ocupado, intente de nuevo en unos segundos"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+# Pool de conexiones agotado durante DB_POOL_TIMEOUT_SECONDS: mismo trato que la cola de bcrypt
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Servidor ocupado, intente de nuevo en unos segundos"},
+        headers={"Retry-After": "1"},
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -30,6 +95,39 @@ app.include_router(admin.router, prefix="/admin", tags=["Admin Panel"])
 async def health_check():
     return {"status": "online", "system": "Cordoba Pro"}
 
+async def _check_database() -> list:
+    """SELECT 1 y particiones de Logs del mes actual y el siguiente (las que falten)."""
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        return await conn.run_sync(log_partitions.missing_partitions)
+
+@app.get("/health/ready")
+async def readiness_check():
+    """
+    Readiness de este worker: 503 si la BD no responde, si algún pool está
+    saturado (todas las conexiones prestadas y requests esperando) o si falta
+    la partición de Logs del mes actual o del siguiente (los inserts fallarían).
+    "/" sigue siendo el liveness: no toca la BD.
+    """
+    pools = pool_metrics.usage()
+    saturated = pool_metrics.saturated(pools)
+    database = "ok"
+    missing = []
+    # Con el pool async saturado el SELECT 1 solo se sumaría a la cola
+    if "async" in saturated:
+        database = "skipped"
+    else:
+        try:
+            missing = await asyncio.wait_for(_check_database(), timeout=settings.DB_READY_TIMEOUT_SECONDS)
+        except Exception as e:
+            database = f"error: {type(e).__name__}"
+    ready = database == "ok" and not saturated and not missing
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "database": database,
+                 "saturated": saturated, "missing_partitions": missing, "pools": pools},
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,99 @@
+# --- app/models/hot_queries.py ---
+"""
+Registro de las consultas calientes de la API y del índice que las soporta.
+Uso:  python manage.py check-indexes        (valida contra los modelos)
+      python manage.py check-indexes --db   (valida contra la BD real)
+Sale con código 1 si alguna consulta no tiene índice.
+"""
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import inspect
+
+from app.core.database import Base, engine
+from app.models import models  # noqa: F401  (registra las tablas en Base.metadata)
+
+@dataclass(frozen=True)
+class HotQuery:
+    name: str                  # Dónde vive la consulta
+    table: str                 # Tabla filtrada
+    columns: Tuple[str, ...]   # Columnas del filtro/orden, en el orden del índice
+    using: Optional[str] = None  # Tipo de índice requerido (ej: "gin" para trigramas)
+
+HOT_QUERIES = (
+    HotQuery("logs por usuario y rango de fechas", "Logs", ("user_id", "created_at")),
+    HotQuery("logs.get_agent_history", "Logs", ("agent", "created_at")),
+    HotQuery("crud_log.iter_logs_for_report", "Logs", ("created_at",)),
+    HotQuery("live_feed.broadcaster.load (snapshot al iniciar/reconectar)", "Logs", ("created_at", "id")),
+    HotQuery("crud_log.browse_logs", "Logs", ("created_at", "id")),
+    HotQuery("crud_log.browse_logs (agente)", "Logs", ("agent", "created_at", "id")),
+    HotQuery("crud_log.browse_logs (resultado)", "Logs", ("result", "created_at", "id")),
+    HotQuery("crud_log.browse_logs (afiliado)", "Logs", ("affiliate", "created_at", "id")),
+    HotQuery("crud_log.browse_logs (cordoba_id)", "Logs", ("cordoba_id",)),
+    HotQuery("deps.get_current_user", "Users", ("username",)),
+    HotQuery("updates_cache.read_ids", "Updates_Reads", ("user_id", "update_id")),
+    HotQuery("crud_update.mark_read (ON CONFLICT)", "Updates_Reads", ("user_id", "update_id")),
+    HotQuery("creditors.process_batch", "Creditors", ("abreviation",)),
+    HotQuery("creditors.read_creditors (nombre)", "Creditors", ("name",), using="gin"),
+    HotQuery("creditors.read_creditors (abreviación)", "Creditors", ("abreviation",), using="gin"),
+    HotQuery("metrics.get_performance", "Agent_Daily_Stats", ("user_id", "business_date")),
+    HotQuery("metrics.get_agent_summary", "Agent_Daily_Stats", ("business_date",)),
+    HotQuery("report_cache.data_version (hoy)", "Agent_Daily_Stats", ("business_date",)),
+    HotQuery("admin.list_report_jobs", "Report_Jobs", ("created_at",)),
+)
+
+def _indexes_from_metadata() -> Dict[str, List[Tuple[Tuple[str, ...], Optional[str]]]]:
+    found = {}
+    for table in Base.metadata.sorted_tables:
+        entries = [(tuple(c.name for c in table.primary_key.columns), None)]
+        for idx in table.indexes:
+            cols = tuple(c.name for c in idx.columns)
+            entries.append((cols, idx.dialect_options["postgresql"].get("using")))
+        for con in table.constraints:
+            # Los UNIQUE también crean índice en Postgres
+            if con.__class__.__name__ == "UniqueConstraint":
+                entries.append((tuple(c.name for c in con.columns), None))
+        found[table.name] = entries
+    return found
+
+def _indexes_from_database() -> Dict[str, List[Tuple[Tuple[str, ...], Optional[str]]]]:
+    inspector = inspect(engine)
+    found = {}
+    for table_name in inspector.get_table_names():
+        pk = inspector.get_pk_constraint(table_name)
+        entries = [(tuple(pk.get("constrained_columns") or ()), None)]
+        for idx in inspector.get_indexes(table_name):
+            using = idx.get("dialect_options", {}).get("postgresql_using")
+            entries.append((tuple(idx["column_names"]), using))
+        for con in inspector.get_unique_constraints(table_name):
+            entries.append((tuple(con["column_names"]), None))
+        found[table_name] = entries
+    return found
+
+def find_unsupported(use_database: bool = False) -> List[HotQuery]:
+    """Devuelve las consultas calientes cuyo filtro no es prefijo de ningún índice."""
+    indexes = _indexes_from_database() if use_database else _indexes_from_metadata()
+    missing = []
+    for hq in HOT_QUERIES:
+        supported = any(
+            cols[:len(hq.columns)] == hq.columns
+            and (hq.using is None or (using or "btree").lower() == hq.using)
+            for cols, using in indexes.get(hq.table, [])
+        )
+        if not supported:
+            missing.append(hq)
+    return missing
+
+def main(use_database: bool = False) -> int:
+    missing = find_unsupported(use_database)
+    for hq in missing:
+        print(f"❌ {hq.name}: falta índice en {hq.table}({', '.join(hq.columns)})"
+              + (f" USING {hq.using}" if hq.using else ""))
+    if missing:
+        return 1
+    print(f"✅ {len(HOT_QUERIES)} consultas calientes con índice de soporte.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(use_database="--db" in sys.argv))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, BigInteger, Integer, String, Boolean, Date, DateTime, ForeignKey, Text, Index, text
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from datetime import datetime
@@ -8,6 +8,10 @@ import pytz
 def get_utc_now():
     return datetime.now(pytz.utc)
 
+# Para columnas DateTime sin zona (asyncpg no acepta datetimes con tzinfo en ellas)
+def get_utc_now_naive():
+    return datetime.now(pytz.utc).replace(tzinfo=None)
+
 class User(Base):
     __tablename__ = "Users"
 
@@ -19,10 +23,15 @@ class User(Base):
     active = Column(Boolean, default=True)
 
 class Log(Base):
+    """
+    Particionada por mes sobre created_at (migración 0005, app/services/log_partitions.py).
+    La PK de la tabla es (id, created_at) porque debe incluir la clave de partición;
+    para el ORM la identidad sigue siendo solo id (único por la secuencia).
+    """
     __tablename__ = "Logs"
 
-    id = Column(Integer, primary_key=True, index=True)
-    created_at = Column(DateTime(timezone=True), default=get_utc_now) # [cite: 25]
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    created_at = Column(DateTime(timezone=True), primary_key=True, default=get_utc_now) # [cite: 25]
     user_id = Column(Integer, ForeignKey("Users.id"))
     agent = Column(String) # Username del agente 
     customer = Column(String)
@@ -34,6 +43,27 @@ class Log(Base):
     client_language = Column(String)
     transfer_status = Column(String) # [cite: 25]
 
+    # Índices de las consultas calientes (ver app/models/hot_queries.py).
+    # Se crean mediante migraciones (alembic), no al importar la app.
+    __table_args__ = (
+        # KPIs del dashboard: calculate_metrics (user_id + ventana de fechas)
+        Index("ix_logs_user_created", "user_id", "created_at"),
+        # Solo ventas completadas: el COUNT de ventas se resuelve sin tocar el resto
+        Index(
+            "ix_logs_user_created_completed", "user_id", "created_at",
+            postgresql_where=text("result ILIKE '%Completed%' AND result NOT ILIKE '%Not%'"),
+        ),
+        # Historial y paginación keyset del agente: /logs/history, /logs/browse
+        Index("ix_logs_agent_created_id", "agent", "created_at", "id"),
+        # Reportes globales, feed del admin y /admin/logs sin filtros
+        Index("ix_logs_created_id", "created_at", "id"),
+        # /admin/logs filtrando por resultado o afiliado (keyset sobre created_at, id)
+        Index("ix_logs_result_created_id", "result", "created_at", "id"),
+        Index("ix_logs_affiliate_created_id", "affiliate", "created_at", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    __mapper_args__ = {"primary_key": [id]}
+
 class Creditor(Base):
     __tablename__ = "Creditors"
 
@@ -41,13 +71,21 @@ class Creditor(Base):
     name = Column(String, nullable=False)
     abreviation = Column(String, index=True) # 
 
+    # Búsqueda por subcadena (ILIKE '%q%') con pg_trgm
+    __table_args__ = (
+        Index("ix_creditors_name_trgm", "name",
+              postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_creditors_abreviation_trgm", "abreviation",
+              postgresql_using="gin", postgresql_ops={"abreviation": "gin_trgm_ops"}),
+    )
+
 class SearchMiss(Base):
     __tablename__ = "Search_Misses"
 
     id = Column(Integer, primary_key=True, index=True)
     abreviation = Column(String)
     cordoba_id = Column(String)
-    created_at = Column(DateTime, default=get_utc_now) # 
+    created_at = Column(DateTime, default=get_utc_now_naive) # 
 
 class Update(Base):
     __tablename__ = "Updates"
@@ -63,6 +101,58 @@ class UpdateRead(Base):
     __tablename__ = "Updates_Reads"
 
     id = Column(Integer, primary_key=True, index=True)
-    update_id = Column(Integer, ForeignKey("Updates.id"))
-    username = Column(String)
-    read_at = Column(DateTime, default=get_utc_now) 
\ No newline at end of file
+    update_id = Column(Integer, ForeignKey("Updates.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("Users.id"), nullable=False)
+    read_at = Column(DateTime, default=get_utc_now_naive)
+
+    __table_args__ = (
+        # Un recibo por (usuario, noticia): respalda el ON CONFLICT DO NOTHING de
+        # crud_update.mark_read y el estado de lectura de /updates/ en una búsqueda
+        Index("ix_updates_reads_user_update", "user_id", "update_id", unique=True),
+    )
+
+class AgentDailyStat(Base):
+    """
+    Rollup diario por agente (día hábil en ET). Se actualiza en la misma
+    transacción que cada insert en Logs y se reconstruye con `python manage.py backfill-stats`.
+    """
+    __tablename__ = "Agent_Daily_Stats"
+
+    user_id = Column(Integer, ForeignKey("Users.id"), primary_key=True)
+    business_date = Column(Date, primary_key=True)           # Fecha ET del log
+    result_class = Column(String, primary_key=True)          # completed / not_completed / other
+    affiliate = Column(String, primary_key=True, default="")
+    client_language = Column(String, primary_key=True, default="")
+    calls = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Reportes globales por rango de fechas (sin agente)
+        Index("ix_agent_daily_stats_date", "business_date"),
+    )
+
+class ReportJob(Base):
+    """
+    Reporte Excel generado en segundo plano (POST /admin/reports).
+    Estados: queued -> running -> finished | failed.
+    """
+    __tablename__ = "Report_Jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    requested_by = Column(Integer, ForeignKey("Users.id"))
+    report_type = Column(String, nullable=False)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    target_agent = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="queued")
+    progress = Column(Integer, nullable=False, default=0)  # 0-100
+    error = Column(Text)
+    file_path = Column(String)                              # Archivo en REPORT_DIR
+    file_size = Column(BigInteger)
+    created_at = Column(DateTime(timezone=True), default=get_utc_now)
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # Listado del panel (últimos trabajos primero)
+        Index("ix_report_jobs_created_at", "created_at"),
+    )
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, ConfigDict
+from pydantic import BaseModel, EmailStr, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime, date
 
@@ -43,6 +43,33 @@ class LogOut(LogBase):
     agent: str
     model_config = ConfigDict(from_attributes=True)
 
+class LogBrowseFilters(BaseModel):
+    """Filtros de /logs/browse y /admin/logs (todos opcionales). `agent` solo aplica al admin."""
+    agent: Optional[str] = None
+    result: Optional[str] = None
+    affiliate: Optional[str] = None
+    cordoba_id: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    cursor: Optional[str] = None    # next_cursor de la página anterior
+    limit: int = Field(50, ge=1, le=200)
+
+class LogPage(BaseModel):
+    items: List[LogOut]
+    next_cursor: Optional[str] = None  # None en la última página
+
+class LogBatchItemResult(BaseModel):
+    index: int                      # Posición en la lista enviada
+    ok: bool
+    id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+class LogBatchResponse(BaseModel):
+    inserted: int
+    failed: int
+    results: List[LogBatchItemResult]
+
 # --- ESQUEMAS DE SEGURIDAD (TOKEN) ---
 class Token(BaseModel):
     access_token: str
@@ -91,6 +118,13 @@ class UpdateOut(UpdateBase):
     read: bool = False
     model_config = ConfigDict(from_attributes=True)
 
+class UpdateReadRequest(BaseModel):
+    update_ids: List[int] = Field(..., min_length=1, max_length=500)
+
+class UpdateReadResult(BaseModel):
+    status: str = "success"
+    marked: int  # Recibos nuevos (las ya leídas no cuentan)
+
 class UserUpdateAdmin(BaseModel):
     name: Optional[str] = None
     role: Optional[str] = None
@@ -114,6 +148,27 @@ class ReportRequest(BaseModel):
     target_agent: str = "TODOS (Global)"
     report_type: str # Estratégico, Operativo o Calidad
 
+class LogExportFilters(BaseModel):
+    """Mismos filtros que ReportRequest, para /admin/export/logs.csv y .ndjson"""
+    start_date: date
+    end_date: date
+    target_agent: str = "TODOS (Global)"
+
+class ReportJobOut(BaseModel):
+    id: int
+    report_type: str
+    start_date: date
+    end_date: date
+    target_agent: str
+    status: str  # queued, running, finished, failed
+    progress: int
+    error: Optional[str] = None
+    file_size: Optional[int] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True)
+
 # --- ESQUEMAS DEL WORKSPACE (DASHBOARD) ---
 
 class PaymentDates(BaseModel):
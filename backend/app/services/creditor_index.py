@@ -0,0 +1,304 @@
+# --- app/services/creditor_index.py ---
+import hashlib
+import heapq
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import models
+from app.schemas import schemas
+
+# Tamaño de los n-gramas del índice. Los bigramas cubren las búsquedas de 2 letras
+# (mínimo permitido por el endpoint) y los trigramas el resto.
+GRAM_SIZES = (2, 3)
+
+# Parámetros del motor fuzzy (bloqueo por n-gramas)
+FUZZY_CANDIDATE_POOL = 50    # Candidatos que se puntúan por cada código desconocido
+FUZZY_MAX_DF_RATIO = 0.05    # n-gramas presentes en más del 5% del catálogo se ignoran...
+FUZZY_MIN_DF_CUTOFF = 200    # ...salvo en catálogos chicos
+
+def normalize(text: Optional[str]) -> str:
+    """Normaliza el texto para indexar/buscar: mayúsculas y espacios simples."""
+    if not text:
+        return ""
+    return " ".join(text.upper().split())
+
+def ngrams(text: str, n: int) -> Set[str]:
+    """Devuelve el conjunto de n-gramas (sin relleno) de un texto ya normalizado."""
+    if len(text) < n:
+        return set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+def _entry_digest(entry: schemas.CreditorOut) -> int:
+    raw = f"{entry.id}\x1f{entry.name}\x1f{entry.abreviation}".encode()
+    return int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "big")
+
+
+class CreditorIndex:
+    """
+    Índice invertido de n-gramas sobre el catálogo de acreedores.
+    Responde búsquedas por subcadena en nombre y abreviación sin tocar la BD.
+    Las lecturas no bloquean: cada modificación publica un nuevo snapshot.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Snapshot inmutable (entries, keys, postings):
+        #   entries:  id -> CreditorOut
+        #   keys:     id -> (abreviación, nombre) normalizados
+        #   postings: n-grama -> ids
+        self._snapshot = ({}, {}, {})
+        # XOR de los hashes de cada entrada: no depende del orden de carga, así que
+        # dos workers con el mismo catálogo tienen la misma versión (ETag de /creditors/)
+        self._digest = 0
+        self._loaded_at: Optional[float] = None
+
+    # --- CARGA Y MANTENIMIENTO ---
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def __len__(self) -> int:
+        return len(self._snapshot[0])
+
+    def load(self, db: Session) -> None:
+        """Reconstruye el índice completo desde la tabla Creditors."""
+        creditors = db.query(models.Creditor).all()
+        entries, keys, postings = {}, {}, {}
+        for c in creditors:
+            self._add(entries, keys, postings, c)
+
+        digest = 0
+        for entry in entries.values():
+            digest ^= _entry_digest(entry)
+
+        # Publicamos los tres mapas de una sola vez
+        with self._lock:
+            self._snapshot = (entries, keys, postings)
+            self._digest = digest
+            self._loaded_at = time.monotonic()
+
+    def is_stale(self) -> bool:
+        """
+        True si el índice aún no existe o superó el tiempo de refresco.
+        El refresco periódico sincroniza los cambios hechos por otros workers.
+        """
+        max_age = settings.CREDITOR_INDEX_REFRESH_SECONDS
+        return not self.loaded or (max_age > 0 and time.monotonic() - self._loaded_at > max_age)
+
+    @property
+    def version(self) -> str:
+        """Sello del contenido del catálogo (cambia con cada alta, edición o baja)."""
+        return f"{self._digest:016x}"
+
+    def ensure_fresh(self, db: Session) -> None:
+        """Carga el índice si está vencido (ver is_stale)."""
+        if self.is_stale():
+            self.load(db)
+
+    def upsert(self, creditor: models.Creditor) -> None:
+        """Agrega o actualiza un acreedor sin reconstruir todo el índice."""
+        if not self.loaded:
+            return  # Se indexará completo en la primera búsqueda
+        with self._lock:
+            old_entries, old_keys, postings = self._snapshot
+            entries, keys = dict(old_entries), dict(old_keys)
+            if creditor.id in keys:
+                postings = self._remove(keys, postings, creditor.id)
+            else:
+                postings = {g: ids for g, ids in postings.items()}
+            self._add(entries, keys, postings, creditor, cow=True)
+            digest = self._digest ^ _entry_digest(entries[creditor.id])
+            if creditor.id in old_entries:
+                digest ^= _entry_digest(old_entries[creditor.id])
+            self._snapshot = (entries, keys, postings)
+            self._digest = digest
+
+    def remove(self, creditor_id: int) -> None:
+        if not self.loaded or creditor_id not in self._snapshot[1]:
+            return
+        with self._lock:
+            old_entries, old_keys, old_postings = self._snapshot
+            entries, keys = dict(old_entries), dict(old_keys)
+            postings = self._remove(keys, old_postings, creditor_id)
+            removed = entries.pop(creditor_id, None)
+            self._snapshot = (entries, keys, postings)
+            if removed is not None:
+                self._digest ^= _entry_digest(removed)
+
+    @staticmethod
+    def _grams_for(keys: Iterable[str]) -> Set[str]:
+        grams = set()
+        for key in keys:
+            for n in GRAM_SIZES:
+                grams |= ngrams(key, n)
+        return grams
+
+    def _add(self, entries, keys, postings, creditor, cow: bool = False) -> None:
+        abrev, name = normalize(creditor.abreviation), normalize(creditor.name)
+        entries[creditor.id] = schemas.CreditorOut(
+            id=creditor.id, name=creditor.name, abreviation=creditor.abreviation or ""
+        )
+        keys[creditor.id] = (abrev, name)
+        for g in self._grams_for((abrev, name)):
+            ids = postings.get(g)
+            if ids is None:
+                postings[g] = {creditor.id}
+            elif cow:
+                # Copy-on-write: nunca mutamos un set que un lector pueda estar usando
+                postings[g] = ids | {creditor.id}
+            else:
+                ids.add(creditor.id)
+
+    def _remove(self, keys, postings, creditor_id) -> Dict[str, Set[int]]:
+        old_grams = self._grams_for(keys.pop(creditor_id))
+        new_postings = {}
+        for g, ids in postings.items():
+            if g in old_grams:
+                ids = ids - {creditor_id}
+                if not ids:
+                    continue
+            new_postings[g] = ids
+        return new_postings
+
+    # --- BÚSQUEDA ---
+
+    def _candidates(self, query: str, postings: Dict[str, Set[int]]) -> Optional[Set[int]]:
+        """Intersección de postings de los n-gramas de la consulta (None = sin filtro)."""
+        n = 3 if len(query) >= 3 else 2
+        grams = ngrams(query, n)
+        if not grams:
+            return None
+        lists = []
+        for g in grams:
+            ids = postings.get(g)
+            if not ids:
+                return set()
+            lists.append(ids)
+        lists.sort(key=len)
+        result = set(lists[0])
+        for ids in lists[1:]:
+            result &= ids
+            if not result:
+                break
+        return result
+
+    def search(self, query: str, limit: int = 20) -> List[schemas.CreditorOut]:
+        """
+        Búsqueda por subcadena en abreviación o nombre.
+        Orden: prefijo de abreviación, prefijo de nombre, resto de coincidencias.
+        """
+        q = normalize(query)
+        if not q:
+            return []
+
+        # Tomamos referencias al snapshot actual (consistentes entre sí)
+        entries, keys, postings = self._snapshot
+
+        candidates = self._candidates(q, postings)
+        if candidates is None:
+            candidates = keys.keys()
+
+        ranked = []
+        for cid in candidates:
+            key = keys.get(cid)
+            if key is None:
+                continue
+            abrev, name = key
+            # Los n-gramas solo filtran: confirmamos la subcadena real
+            if q not in abrev and q not in name:
+                continue
+            if abrev.startswith(q):
+                tier = 0
+            elif name.startswith(q):
+                tier = 1
+            else:
+                tier = 2
+            ranked.append((tier, len(abrev), abrev, cid))
+
+        return [entries[cid] for _, _, _, cid in heapq.nsmallest(limit, ranked)]
+
+    # --- COINCIDENCIA APROXIMADA (FUZZY) ---
+
+    def _fuzzy_candidates(self, grams: Set[str], postings, total: int) -> List[int]:
+        """
+        Bloqueo por n-gramas: solo puntuamos acreedores que comparten n-gramas con
+        el código. Los n-gramas muy comunes ("BAN", "ANK") se ignoran si hay otros
+        más selectivos, para no recorrer medio catálogo por cada línea.
+        """
+        max_df = max(FUZZY_MIN_DF_CUTOFF, int(total * FUZZY_MAX_DF_RATIO))
+        lists = sorted((postings[g] for g in grams if g in postings), key=len)
+        if not lists:
+            return []
+        selective = [ids for ids in lists if len(ids) <= max_df] or lists[:1]
+
+        shared = {}
+        for ids in selective:
+            for cid in ids:
+                shared[cid] = shared.get(cid, 0) + 1
+        best = sorted(shared.items(), key=lambda kv: kv[1], reverse=True)
+        return [cid for cid, _ in best[:FUZZY_CANDIDATE_POOL]]
+
+    @staticmethod
+    def _similarity(q_grams: Set[str], key: str, n: int) -> float:
+        """
+        Promedio entre el coeficiente de Dice y la cobertura de la clave del catálogo.
+        La cobertura premia variantes que agregan ruido ("CHASE BK" -> "CHASE").
+        """
+        k_grams = ngrams(key, n)
+        if not k_grams:
+            return 0.0
+        common = len(q_grams & k_grams)
+        if not common:
+            return 0.0
+        dice = 2 * common / (len(q_grams) + len(k_grams))
+        coverage = common / len(k_grams)
+        return (dice + coverage) / 2
+
+    def suggest(
+        self,
+        codes: Iterable[str],
+        limit: int = 3,
+        min_score: float = 0.4,
+    ) -> Dict[str, List[dict]]:
+        """
+        Resuelve en lote códigos desconocidos contra todo el catálogo.
+        Devuelve {código: [{code, name, score}, ...]} ordenado por confianza.
+        """
+        entries, keys, postings = self._snapshot
+        total = len(keys)
+        results = {}
+
+        for code in codes:
+            q = normalize(code)
+            if q in results:
+                continue
+            n = 3 if len(q) >= 3 else 2
+            q_grams = ngrams(q, n)
+            scored = []
+            for cid in self._fuzzy_candidates(q_grams, postings, total):
+                key = keys.get(cid)
+                if key is None:
+                    continue
+                score = max(self._similarity(q_grams, k, n) for k in key)
+                if score >= min_score:
+                    scored.append((score, cid))
+
+            scored.sort(key=lambda sc: (-sc[0], keys[sc[1]][0]))
+            results[q] = [
+                {
+                    "code": entries[cid].abreviation,
+                    "name": entries[cid].name,
+                    "score": round(score, 3),
+                }
+                for score, cid in scored[:limit]
+            ]
+        return results
+
+
+# Instancia única por proceso (cada worker de uvicorn mantiene la suya)
+creditor_index = CreditorIndex()
@@ -0,0 +1,192 @@
+# --- app/services/dashboard_cache.py ---
+"""
+Caché por usuario del dashboard del agente (GET /workspace/information),
+con stale-while-revalidate:
+
+  - edad <= DASHBOARD_CACHE_TTL_SECONDS:          se sirve tal cual
+  - hasta DASHBOARD_CACHE_STALE_SECONDS más:       se sirve y se recalcula en segundo plano
+  - más vieja, invalidada o sin entrada:           se calcula y se espera
+
+Un solo cálculo a la vez por usuario (los requests simultáneos comparten el
+resultado) y a lo sumo DASHBOARD_CACHE_MAX_REFRESHES cálculos en paralelo
+en el worker: al inicio del turno, 200 dashboards no abren 200 consultas.
+
+Se invalida:
+  - por usuario, cuando se confirma una nota suya (create_log y /logs/batch en
+    este worker; el NOTIFY del feed en los demás, que trae el user_id)
+  - si cambian las noticias (el digest de updates_cache no coincide)
+  - al cambiar el día ET (fechas de pago) o el nombre/rol del usuario
+Igual que updates_cache, sin el LISTEN del feed no se confía en la caché.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import models
+from app.schemas import schemas
+from app.services import live_feed, metrics
+from app.services.updates_cache import updates_cache
+from app.utils import date_utils
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class Entry:
+    dashboard: schemas.WorkspaceDashboard
+    built_at: float       # time.monotonic()
+    today_et: date        # Día de las fechas de pago
+    news_digest: str      # updates_cache.ActiveUpdates.digest
+    user_key: tuple       # (nombre, rol) con los que se armó
+
+def build_dashboard(db: Session, user_id: int, name: str, role: str) -> tuple:
+    """Arma el WorkspaceDashboard (una consulta: los KPIs). Devuelve (dashboard, día ET, digest de noticias)."""
+    today = datetime.now(date_utils.TZ_ET).date()
+
+    # A. Fechas de Pago (memoizadas por día ET en date_utils)
+    bus_dates = date_utils.workspace_dates_for(today)
+    payment_dates = schemas.PaymentDates(
+        standard=bus_dates["standard"].strftime("%m/%d/%Y"),
+        california=bus_dates["california"].strftime("%m/%d/%Y"),
+        max_date=bus_dates["max_date"].strftime("%m/%d/%Y")
+    )
+
+    # B. Métricas de Rendimiento (KPIs)
+    # Los 3 periodos (Hoy/Semana/Mes) salen de una sola consulta agregada
+    performance = metrics.get_performance(db, user_id)
+
+    # C. Noticias Activas (caché del worker, ordenada por fecha descendente)
+    active = updates_cache.active(db)
+
+    dashboard = schemas.WorkspaceDashboard(
+        agent_name=name,
+        role=role,
+        payment_dates=payment_dates,
+        performance=performance,
+        news=list(active.news)
+    )
+    return dashboard, today, active.digest
+
+
+class DashboardCache:
+    def __init__(self):
+        self._entries: "OrderedDict[int, Entry]" = OrderedDict()
+        self._inflight: Dict[int, asyncio.Task] = {}
+        # Se incrementan al invalidar: un cálculo que empezó antes no se guarda
+        self._epoch = 0                          # clear()
+        self._generations: Dict[int, int] = {}   # invalidate(user_id)
+        self._limit: Optional[asyncio.Semaphore] = None
+        self._loop = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.builds = 0
+        self.errors = 0
+
+    def _stamp(self, user_id: int) -> tuple:
+        return self._epoch, self._generations.get(user_id, 0)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Semáforo y tareas quedan atados al loop que los creó (tests / reinicios)
+            self._loop = loop
+            self._limit = asyncio.Semaphore(settings.DASHBOARD_CACHE_MAX_REFRESHES)
+            self._inflight.clear()
+        return self._limit
+
+    def _usable(self, entry: Entry, user: models.User) -> bool:
+        return (
+            live_feed.broadcaster.connected
+            and entry.today_et == datetime.now(date_utils.TZ_ET).date()
+            and entry.news_digest == updates_cache.digest()
+            and entry.user_key == (user.name, user.role)
+        )
+
+    async def get(self, user: models.User) -> schemas.WorkspaceDashboard:
+        entry = self._entries.get(user.id)
+        if entry is not None and self._usable(entry, user):
+            age = time.monotonic() - entry.built_at
+            if age <= settings.DASHBOARD_CACHE_TTL_SECONDS:
+                self.hits += 1
+                return entry.dashboard
+            if age <= settings.DASHBOARD_CACHE_TTL_SECONDS + settings.DASHBOARD_CACHE_STALE_SECONDS:
+                self.stale_hits += 1
+                self._refresh(user)
+                return entry.dashboard
+        self.misses += 1
+        # shield: si el cliente corta, el cálculo compartido sigue para los demás
+        return await asyncio.shield(self._refresh(user))
+
+    def _refresh(self, user: models.User) -> asyncio.Task:
+        self._semaphore()  # Ata el estado al loop actual
+        task = self._inflight.get(user.id)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._build(user.id, user.name, user.role))
+            self._inflight[user.id] = task
+            task.add_done_callback(lambda t, user_id=user.id: self._finished(user_id, t))
+        return task
+
+    def _finished(self, user_id: int, task: asyncio.Task) -> None:
+        if self._inflight.get(user_id) is task:
+            del self._inflight[user_id]
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+            logger.warning("No se pudo recalcular el dashboard de %s: %r", user_id, task.exception())
+
+    async def _build(self, user_id: int, name: str, role: str) -> schemas.WorkspaceDashboard:
+        stamp = self._stamp(user_id)
+        async with self._semaphore():
+            async with AsyncSessionLocal() as db:
+                dashboard, today, digest = await db.run_sync(build_dashboard, user_id, name, role)
+        self.builds += 1
+        if self._stamp(user_id) == stamp:
+            self._entries[user_id] = Entry(dashboard, time.monotonic(), today, digest, (name, role))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > settings.DASHBOARD_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+        return dashboard
+
+    # --- Invalidación ---
+
+    def invalidate(self, user_id: int) -> None:
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        self._entries.pop(user_id, None)
+        # Un cálculo en curso pudo leer datos previos al commit: los próximos requests no se le suman
+        self._inflight.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._entries.clear()
+        self._inflight.clear()
+
+    def on_log_notify(self, payload: Optional[str]) -> None:
+        """Oyente del canal del feed: cada nota confirmada trae su user_id (None = reconexión)."""
+        if payload is None:
+            self.clear()
+            return
+        try:
+            user_id = json.loads(payload).get("user_id")
+        except ValueError:
+            return
+        if user_id is not None:
+            self.invalidate(user_id)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries), "hits": self.hits, "stale_hits": self.stale_hits,
+            "misses": self.misses, "builds": self.builds, "errors": self.errors,
+            "refreshing": len(self._inflight),
+        }
+
+
+# Instancia única por proceso
+dashboard_cache = DashboardCache()
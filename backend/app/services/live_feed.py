@@ -0,0 +1,205 @@
+# --- app/services/live_feed.py ---
+"""
+Feed en tiempo real del dashboard del admin (GET /admin/live-feed/stream, SSE).
+
+create_log publica cada nota con pg_notify en la MISMA transacción del insert:
+Postgres la entrega recién con el commit, y a todos los workers de uvicorn.
+Cada worker mantiene una conexión LISTEN (asyncpg), guarda las últimas
+FEED_SIZE notas en memoria y las reparte a sus suscriptores locales.
+Ni el stream ni GET /admin/live-feed consultan Logs por cada admin conectado.
+"""
+import asyncio
+import json
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import asyncpg
+import pytz
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.database import AsyncSessionLocal, get_async_database_url
+from app.models import models
+from app.schemas import schemas
+from app.services.metrics import TZ_ET
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "live_feed"
+FEED_SIZE = 10
+SUBSCRIBER_QUEUE_SIZE = 100
+HEARTBEAT_SECONDS = 15
+RECONNECT_SECONDS = 5
+
+def feed_message(log_id: int, created_at: datetime, agent_name: str, cordoba_id, result, affiliate, user_id=None) -> dict:
+    """
+    Mensaje interno: id para ordenar/deduplicar, user_id (dashboard_cache) y el
+    AdminLiveFeedItem que ve el admin (lo único que sale por el stream).
+    """
+    if created_at.tzinfo is None:
+        created_at = pytz.utc.localize(created_at)
+    item = schemas.AdminLiveFeedItem(
+        time=created_at.astimezone(TZ_ET).strftime("%H:%M:%S"),
+        agent_real_name=agent_name or "",
+        cordoba_id=cordoba_id or "",
+        result=result or "",
+        affiliate=affiliate or "",
+    )
+    return {"id": log_id, "user_id": user_id, "item": item.model_dump()}
+
+def log_message(log, agent_real_name: str) -> dict:
+    """feed_message desde un models.Log (o cualquier objeto con esos atributos)."""
+    return feed_message(log.id, log.created_at, agent_real_name, log.cordoba_id, log.result, log.affiliate, log.user_id)
+
+def notify(db: Session, messages: List[dict]) -> None:
+    """Encola los mensajes en la transacción de `db` (se envían con el commit)."""
+    if messages:
+        db.execute(
+            text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+            {"channel": CHANNEL, "payloads": [json.dumps(m, ensure_ascii=False) for m in messages]},
+        )
+
+class LiveFeedBroadcaster:
+    def __init__(self, size: int = FEED_SIZE):
+        self._recent = deque(maxlen=size)
+        self._subscribers = set()
+        self._loaded = False
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+        # Otros oyentes en la misma conexión (ej: updates_cache, dashboard_cache)
+        self._channels: Dict[str, List[Callable]] = {}
+        self.connected = False
+        self.delivered = 0
+        self.dropped = 0
+
+    # --- Estado local ---
+
+    def recent(self) -> List[dict]:
+        """Últimas notas, más nuevas primero (formato AdminLiveFeedItem)."""
+        return [m["item"] for m in self._recent]
+
+    def _add(self, message: dict) -> bool:
+        """Agrega manteniendo el orden por id (los commits concurrentes pueden llegar desordenados)."""
+        if any(m["id"] == message["id"] for m in self._recent):
+            return False
+        ordered = sorted([*self._recent, message], key=lambda m: m["id"], reverse=True)
+        kept = ordered[:self._recent.maxlen]
+        self._recent.clear()
+        self._recent.extend(kept)
+        return message in kept
+
+    async def load(self, db: AsyncSession) -> None:
+        """Carga inicial desde la BD (una vez por worker, o al reconectar el LISTEN)."""
+        log, user = models.Log, models.User
+        rows = (await db.execute(
+            select(log.id, log.created_at, func.coalesce(user.name, log.agent), log.cordoba_id, log.result, log.affiliate,
+                   log.user_id)
+            .outerjoin(user, user.id == log.user_id)
+            .order_by(log.created_at.desc(), log.id.desc())
+            .limit(self._recent.maxlen)
+        )).all()
+        for row in reversed(rows):
+            # deliver: si es una reconexión, los suscriptores reciben lo que se perdieron
+            self.deliver(feed_message(*row))
+        self._loaded = True
+
+    async def snapshot(self) -> List[dict]:
+        if not self._loaded:
+            async with AsyncSessionLocal() as db:
+                await self.load(db)
+        return self.recent()
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def deliver(self, message: dict) -> None:
+        if not self._add(message):
+            return
+        for queue in list(self._subscribers):
+            if queue.full():
+                # Cliente lento: se descarta su mensaje más viejo, nunca se bloquea al resto
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(message["item"])
+            self.delivered += 1
+
+    # --- LISTEN en Postgres ---
+
+    def listen(self, channel: str, callback: Callable[[Optional[str]], None]) -> None:
+        """
+        Registra un oyente en la conexión LISTEN (antes de start()); puede ser
+        otro canal o este mismo (CHANNEL).
+        callback(payload) se llama por cada NOTIFY, y con None al (re)conectar
+        porque lo publicado mientras no escuchábamos se perdió.
+        """
+        self._channels.setdefault(channel, []).append(callback)
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            self.deliver(json.loads(payload))
+        except (ValueError, KeyError):
+            logger.warning("Mensaje inválido en %s: %r", channel, payload)
+
+    async def _listen(self) -> None:
+        url = make_url(get_async_database_url()).set(drivername="postgresql")
+        dsn = url.render_as_string(hide_password=False)
+        while not self._stopping.is_set():
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                await connection.add_listener(CHANNEL, self._on_notify)
+                for channel, callbacks in self._channels.items():
+                    for callback in callbacks:
+                        await connection.add_listener(channel, lambda c, p, ch, payload, cb=callback: cb(payload))
+                        callback(None)
+                self.connected = True
+                # Lo publicado mientras no escuchábamos se recupera desde la BD
+                async with AsyncSessionLocal() as db:
+                    await self.load(db)
+                while not self._stopping.is_set():
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), HEARTBEAT_SECONDS)
+                    except asyncio.TimeoutError:
+                        await connection.execute("SELECT 1")  # Detecta conexiones caídas
+            except Exception:
+                logger.exception("LISTEN %s desconectado, reintentando en %ss", CHANNEL, RECONNECT_SECONDS)
+            finally:
+                self.connected = False
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            if not self._stopping.is_set():
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), RECONNECT_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self) -> None:
+        """Arranca el LISTEN de este worker (lifespan de la app)."""
+        if self._task is None or self._task.done():
+            self._stopping = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._stopping.set()
+            await self._task
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "subscribers": len(self._subscribers),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+broadcaster = LiveFeedBroadcaster()
@@ -0,0 +1,319 @@
+# --- app/services/log_archive.py ---
+"""
+Archivo frío de Logs: los meses cerrados (más viejos que LOG_ARCHIVE_AFTER_MONTHS)
+pasan de su partición a un archivo Parquet comprimido (zstd) en LOG_ARCHIVE_DIR,
+y la partición se borra. manifest.json indica qué meses viven en disco.
+
+    python manage.py archive-logs --init-volume   (una vez, con el volumen montado)
+    python manage.py archive-logs [--dry-run]
+
+LOG_ARCHIVE_DIR tiene que ser un volumen persistente (docker-compose monta
+"log_archive" en el servicio backend; `docker compose run --rm backend ...`
+lo monta igual). El archivado borra la partición: si el directorio se pierde,
+esos meses se pierden. Por eso no se borra nada sin la marca VOLUME_MARKER,
+que --init-volume crea sobre el volumen ya montado.
+
+Los reportes y la exportación (crud_log) leen los meses archivados sin que el
+llamador lo note. El rollup (Agent_Daily_Stats) no se toca: KPIs, /admin/stats
+y el resumen Estratégico siguen completos.
+
+Orden de un archivado (se puede reintentar si se corta a la mitad):
+  0. se exige la marca del volumen persistente
+  1. se escribe el Parquet (temporal + rename), se relee entero y se verifica
+     contra la partición
+  2. manifest: estado "pending"      (los lectores lo ignoran: sigue en la BD)
+  3. DETACH + DROP de la partición, commit
+  4. manifest: estado "archived"     (desde acá los lectores usan el archivo)
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import date, datetime, timedelta
+from typing import Iterator, List, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import pytz
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services import log_partitions
+from app.services.metrics import TZ_ET
+
+STATUS_PENDING = "pending"
+STATUS_ARCHIVED = "archived"
+
+SCHEMA = pa.schema([
+    ("id", pa.int32()),
+    ("created_at", pa.timestamp("us", tz="UTC")),
+    ("user_id", pa.int32()),
+    ("agent", pa.string()),
+    ("customer", pa.string()),
+    ("cordoba_id", pa.string()),
+    ("result", pa.string()),
+    ("comments", pa.string()),
+    ("affiliate", pa.string()),
+    ("info_until", pa.string()),
+    ("client_language", pa.string()),
+    ("transfer_status", pa.string()),
+])
+COLUMNS = tuple(SCHEMA.names)
+READ_CHUNK_SIZE = 20000
+ROW_GROUP_SIZE = 100_000
+COMPRESSION = "zstd"
+VOLUME_MARKER = ".cordoba-archive-volume"
+
+class ArchiveError(Exception):
+    pass
+
+def month_key(month: date) -> str:
+    return f"{month.year:04d}-{month.month:02d}"
+
+def _parse_month(key: str) -> date:
+    return date(int(key[:4]), int(key[5:7]), 1)
+
+def _month_bounds(month: date):
+    start = pytz.utc.localize(datetime.combine(month, datetime.min.time()))
+    end = pytz.utc.localize(datetime.combine(log_partitions.add_months(month, 1), datetime.min.time()))
+    return start, end
+
+# --- 1. MANIFEST ---
+
+class Manifest:
+    """manifest.json del directorio de archivo, releído solo cuando cambia en disco."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, "manifest.json")
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._months = {}
+
+    def months(self) -> dict:
+        with self._lock:
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except FileNotFoundError:
+                self._mtime, self._months = None, {}
+                return {}
+            if mtime != self._mtime:
+                with open(self.path, encoding="utf-8") as f:
+                    self._months = json.load(f).get("months", {})
+                self._mtime = mtime
+            return dict(self._months)
+
+    def set(self, key: str, entry: dict) -> None:
+        months = self.months()
+        months[key] = entry
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "months": dict(sorted(months.items()))}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def archived_months(self) -> List[date]:
+        return sorted(
+            _parse_month(key) for key, entry in self.months().items() if entry["status"] == STATUS_ARCHIVED
+        )
+
+    def file_path(self, month: date) -> str:
+        return os.path.join(self.directory, self.months()[month_key(month)]["file"])
+
+manifest = Manifest(settings.LOG_ARCHIVE_DIR)
+
+# --- 2. ARCHIVADO ---
+
+def init_volume(directory: Optional[str] = None) -> str:
+    """Marca el directorio (ya montado como volumen persistente) como apto para archivar."""
+    directory = directory or manifest.directory
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, VOLUME_MARKER)
+    if not os.path.exists(path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"created_at": datetime.now(pytz.utc).isoformat()}, f)
+            f.flush()
+            os.fsync(f.fileno())
+    return path
+
+def require_persistent_volume() -> None:
+    if not os.path.exists(os.path.join(manifest.directory, VOLUME_MARKER)):
+        raise ArchiveError(
+            f"{manifest.directory} no está marcado como volumen persistente: montarlo y correr "
+            "`python manage.py archive-logs --init-volume` (ver app/services/log_archive.py)"
+        )
+
+def archive_cutoff(now: Optional[datetime] = None) -> date:
+    """Primer mes que se queda en la BD: se archivan los anteriores."""
+    current = log_partitions.month_start(now or datetime.now(pytz.utc))
+    return log_partitions.add_months(current, -settings.LOG_ARCHIVE_AFTER_MONTHS)
+
+def archivable_months(db: Session, now: Optional[datetime] = None) -> List[date]:
+    cutoff = archive_cutoff(now)
+    months = []
+    for part in log_partitions.list_partitions(db):
+        match = re.fullmatch(r"Logs_(\d{4})_(\d{2})", part["name"])
+        if match:
+            month = date(int(match[1]), int(match[2]), 1)
+            if month < cutoff:
+                months.append(month)
+    # Archivados a medias en una corrida anterior (la partición ya no existe)
+    for key, entry in manifest.months().items():
+        if entry["status"] == STATUS_PENDING and _parse_month(key) < cutoff:
+            months.append(_parse_month(key))
+    return sorted(set(months))
+
+def _partition_volume(db: Session, table: str) -> tuple:
+    count, id_sum = db.execute(text(f'SELECT count(*), COALESCE(sum(id::bigint), 0) FROM "{table}"')).one()
+    return int(count), int(id_sum)
+
+def _file_volume(path: str) -> tuple:
+    """Relee el archivo completo (todas las columnas) y devuelve (filas, suma de ids)."""
+    count, id_sum = 0, 0
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=READ_CHUNK_SIZE):
+        count += batch.num_rows
+        id_sum += pc.sum(batch.column("id").cast(pa.int64())).as_py() or 0
+    return count, id_sum
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _write_parquet(db: Session, table: str, path: str) -> None:
+    """Vuelca la partición ordenada por (created_at, id) con un cursor del servidor."""
+    tmp = f"{path}.tmp"
+    result = db.execute(
+        text(f'SELECT {", ".join(COLUMNS)} FROM "{table}" ORDER BY created_at, id')
+        .execution_options(yield_per=READ_CHUNK_SIZE)
+    )
+    with pq.ParquetWriter(tmp, SCHEMA, compression=COMPRESSION) as writer:
+        for rows in result.partitions():
+            columns = list(zip(*rows))
+            writer.write_table(pa.table(columns, schema=SCHEMA), row_group_size=ROW_GROUP_SIZE)
+    with open(tmp, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def archive_month(db: Session, month: date) -> dict:
+    """Archiva un mes cerrado (ver el orden en el docstring del módulo). Hace commit."""
+    if month >= archive_cutoff():
+        raise ArchiveError(f"{month_key(month)} todavía no se puede archivar")
+    require_persistent_volume()
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext('archive:Logs'))"))
+
+    key = month_key(month)
+    table = log_partitions.partition_name(month)
+    filename = f"{table}.parquet"
+    path = os.path.join(manifest.directory, filename)
+    entry = manifest.months().get(key)
+    exists = db.execute(text("SELECT to_regclass(:t)"), {"t": f'"{table}"'}).scalar()
+
+    if exists:
+        os.makedirs(manifest.directory, exist_ok=True)
+        # Nadie debería escribir en un mes cerrado, pero por las dudas se bloquean las escrituras
+        db.execute(text(f'LOCK TABLE "{table}" IN SHARE MODE'))
+        volume = _partition_volume(db, table)
+        if not (entry and os.path.exists(path) and _file_volume(path) == volume):
+            _write_parquet(db, table, path)
+            if _file_volume(path) != volume:
+                raise ArchiveError(f"{filename}: el archivo no coincide con {table}")
+        entry = {
+            "file": filename, "rows": volume[0], "id_sum": volume[1],
+            "bytes": os.path.getsize(path), "sha256": _sha256(path),
+            "status": STATUS_PENDING, "archived_at": None,
+        }
+        manifest.set(key, entry)
+        db.execute(text(f'ALTER TABLE "{log_partitions.PARENT}" DETACH PARTITION "{table}"'))
+        db.execute(text(f'DROP TABLE "{table}"'))
+    elif not entry:
+        raise ArchiveError(f"No existe la partición {table} ni un archivo para {key}")
+    elif _sha256(path) != entry["sha256"]:
+        raise ArchiveError(f"{filename}: el checksum no coincide con el manifest")
+    db.commit()
+
+    entry = {**entry, "status": STATUS_ARCHIVED, "archived_at": datetime.now(pytz.utc).isoformat()}
+    manifest.set(key, entry)
+    return entry
+
+def first_hot_date() -> Optional[date]:
+    """
+    Primer día ET completo que sigue en la BD (None si no hay nada archivado).
+    Los días anteriores ya no se pueden reconstruir desde Logs (backfill-stats).
+    """
+    months = manifest.archived_months()
+    if not months:
+        return None
+    _, end = _month_bounds(months[-1])
+    return end.astimezone(TZ_ET).date() + timedelta(days=1)
+
+# --- 3. LECTURA TRANSPARENTE (crud_log) ---
+
+def _report_bounds(start_date, end_date):
+    # Mismo rango que crud_log.report_filters (día completo, en UTC)
+    start = pytz.utc.localize(datetime.fromisoformat(f"{start_date} 00:00:00"))
+    end = pytz.utc.localize(datetime.fromisoformat(f"{end_date} 23:59:59"))
+    return start, end
+
+def months_in_range(start_date, end_date) -> List[date]:
+    """Meses archivados que se superponen con el rango del reporte."""
+    start, end = _report_bounds(start_date, end_date)
+    return [
+        m for m in manifest.archived_months()
+        if _month_bounds(m)[0] <= end and _month_bounds(m)[1] > start
+    ]
+
+def _ilike_regex(pattern: str) -> str:
+    # ILIKE → regex anclada: % = cualquier cosa, _ = un carácter
+    parts = [".*" if ch == "%" else "." if ch == "_" else re.escape(ch) for ch in pattern]
+    return "^" + "".join(parts) + "$"
+
+def _mask(table: pa.Table, start, end, target_agent: str):
+    created = table.column("created_at")
+    mask = pc.and_(pc.greater_equal(created, pa.scalar(start, SCHEMA.field("created_at").type)),
+                   pc.less_equal(created, pa.scalar(end, SCHEMA.field("created_at").type)))
+    agent = table.column("agent")
+    if "TODOS" not in target_agent:
+        agent_mask = pc.match_substring_regex(agent, _ilike_regex(target_agent), ignore_case=True)
+    else:
+        agent_mask = pc.not_equal(agent, "test")
+    return pc.and_(mask, agent_mask)
+
+def iter_archived(
+    start_date,
+    end_date,
+    target_agent: str,
+    columns: Sequence[str] = COLUMNS,
+    descending: bool = False,
+    chunk_size: int = READ_CHUNK_SIZE,
+) -> Iterator[list]:
+    """
+    Bloques de tuplas (en el orden de `columns`) de los meses archivados que
+    cumplen los mismos filtros que crud_log.report_filters. Con descending=True
+    salen por created_at descendente (como los reportes); si no, ascendente.
+    Memoria acotada: se lee un row group (ROW_GROUP_SIZE filas) a la vez.
+    """
+    start, end = _report_bounds(start_date, end_date)
+    needed = list(dict.fromkeys([*columns, "created_at", "agent"]))
+    months = months_in_range(start_date, end_date)
+    for month in (reversed(months) if descending else months):
+        parquet = pq.ParquetFile(manifest.file_path(month))
+        groups = range(parquet.num_row_groups)
+        for group in (reversed(groups) if descending else groups):
+            table = parquet.read_row_group(group, columns=needed)
+            table = table.filter(_mask(table, start, end, target_agent)).select(list(columns))
+            if descending:
+                # El archivo está ordenado por (created_at, id) ascendente
+                table = table.take(pa.array(range(table.num_rows - 1, -1, -1)))
+            for batch in table.to_batches(max_chunksize=chunk_size):
+                yield list(zip(*(col.to_pylist() for col in batch.columns)))
+
+def count_archived(start_date, end_date, target_agent: str) -> int:
+    return sum(len(rows) for rows in iter_archived(start_date, end_date, target_agent, columns=("id",)))
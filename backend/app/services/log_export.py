@@ -0,0 +1,95 @@
+# --- app/services/log_export.py ---
+"""
+Exportación cruda de Logs para BI (CSV y NDJSON), sin pandas ni Excel.
+Cada bloque del cursor del servidor se serializa y se envía enseguida,
+opcionalmente comprimido con gzip: la memoria no depende del rango pedido.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.crud import crud_log
+from app.schemas import schemas
+
+EXPORT_CHUNK_SIZE = 5000
+GZIP_LEVEL = 6
+
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+MEDIA_TYPES = {
+    FORMAT_CSV: "text/csv; charset=utf-8",
+    FORMAT_NDJSON: "application/x-ndjson",
+}
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+def _csv_chunks(chunks) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(crud_log.EXPORT_COLUMNS)
+    ts = crud_log.EXPORT_COLUMNS.index("created_at")
+    for rows in chunks:
+        for row in rows:
+            row = list(row)
+            row[ts] = _iso(row[ts])
+            writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Solo queda el encabezado si no hubo filas
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def _ndjson_chunks(chunks) -> Iterator[str]:
+    columns = crud_log.EXPORT_COLUMNS
+    ts = columns.index("created_at")
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    for rows in chunks:
+        lines = []
+        for row in rows:
+            row = list(row)
+            row[ts] = _iso(row[ts])
+            lines.append(dumps(dict(zip(columns, row))))
+        lines.append("")
+        yield "\n".join(lines)
+
+def _gzip(parts: Iterator[bytes]) -> Iterator[bytes]:
+    # wbits=31: formato gzip (encabezado + CRC), compatible con Content-Encoding
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    for part in parts:
+        data = compressor.compress(part)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def iter_export(
+    db: Session,
+    filters: schemas.LogExportFilters,
+    fmt: str,
+    gzip: bool = False,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    chunks = crud_log.iter_log_chunks(
+        db, filters.start_date, filters.end_date, filters.target_agent, chunk_size=chunk_size
+    )
+    text_parts = _csv_chunks(chunks) if fmt == FORMAT_CSV else _ndjson_chunks(chunks)
+    parts = (p.encode("utf-8") for p in text_parts)
+    return _gzip(parts) if gzip else parts
+
+def stream_export(filters: schemas.LogExportFilters, fmt: str, gzip: bool = False) -> Iterator[bytes]:
+    """
+    Igual que iter_export pero con sesión propia: la respuesta sigue leyendo
+    del cursor después de que la ruta terminó.
+    """
+    db = SessionLocal()
+    try:
+        yield from iter_export(db, filters, fmt, gzip)
+    finally:
+        db.close()
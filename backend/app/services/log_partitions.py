@@ -0,0 +1,271 @@
+# --- app/services/log_partitions.py ---
+"""
+Particiones mensuales de Logs (PARTITION BY RANGE (created_at), límites en UTC).
+Cada mes vive en "Logs_AAAA_MM". No hay partición default (solo si la migración
+encontró filas sin fecha) sin partición falla, por eso
+`python manage.py ensure-partitions` (cron), el arranque de la API y el
+PartitionKeeper de cada worker (cada LOG_PARTITION_CHECK_SECONDS) las crean
+con LOG_PARTITION_MONTHS_AHEAD meses de anticipación. /health/ready falla si
+falta la del mes actual o la del siguiente. Sin default, Postgres
+recorre las particiones en orden para ORDER BY created_at ... LIMIT.
+Las consultas filtran por created_at sin funciones encima para que Postgres
+descarte las particiones fuera del rango.
+"""
+import asyncio
+import logging
+from datetime import date, datetime
+from typing import List, Optional
+
+import pytz
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+PARENT = "Logs"
+DEFAULT_PARTITION = "Logs_default"
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: date, parent: str = PARENT) -> str:
+    return f"{parent}_{month.year:04d}_{month.month:02d}"
+
+def _bound(month: date) -> str:
+    return f"{month.isoformat()} 00:00:00+00"
+
+def is_partitioned(db: Session, parent: str = PARENT) -> bool:
+    return bool(db.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:t)"),
+        {"t": f'"{parent}"'},
+    ).scalar())
+
+def list_partitions(db: Session, parent: str = PARENT) -> List[dict]:
+    """Particiones con sus límites y filas estimadas (pg_class.reltuples, sin contar)."""
+    rows = db.execute(text("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), GREATEST(c.reltuples, 0)::bigint,
+               pg_total_relation_size(c.oid)
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(:t)
+        ORDER BY c.relname
+    """), {"t": f'"{parent}"'}).all()
+    return [
+        {"name": name, "bounds": bounds, "estimated_rows": est, "size_bytes": size}
+        for name, bounds, est, size in rows
+    ]
+
+def create_partition(db: Session, month: date, parent: str = PARENT) -> bool:
+    """
+    Crea la partición del mes si no existe. Si "Logs_default" ya tiene filas de
+    ese mes, las mueve a la nueva tabla antes de adjuntarla (ATTACH falla si
+    quedan filas del rango en la default). No hace commit.
+    """
+    name = partition_name(month, parent)
+    if db.execute(text("SELECT to_regclass(:t)"), {"t": f'"{name}"'}).scalar():
+        return False
+
+    start, end = _bound(month), _bound(add_months(month, 1))
+    default = f"{parent}_default"
+    has_default = db.execute(text("SELECT to_regclass(:t)"), {"t": f'"{default}"'}).scalar()
+    if has_default:
+        db.execute(text(f'CREATE TABLE "{name}" (LIKE "{parent}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+        db.execute(text(f"""
+            WITH moved AS (
+                DELETE FROM "{default}" WHERE created_at >= :start AND created_at < :end RETURNING *
+            )
+            INSERT INTO "{name}" SELECT * FROM moved
+        """), {"start": start, "end": end})
+        db.execute(text(
+            f"""ALTER TABLE "{parent}" ATTACH PARTITION "{name}" FOR VALUES FROM ('{start}') TO ('{end}')"""
+        ))
+    else:
+        db.execute(text(
+            f"""CREATE TABLE "{name}" PARTITION OF "{parent}" FOR VALUES FROM ('{start}') TO ('{end}')"""
+        ))
+    return True
+
+def ensure_partitions(
+    db: Session,
+    months_ahead: int,
+    start: Optional[date] = None,
+    parent: str = PARENT,
+) -> List[str]:
+    """
+    Asegura las particiones desde `start` (por defecto, el mes actual en UTC)
+    hasta `months_ahead` meses después. Devuelve las creadas. No hace commit.
+    """
+    if not is_partitioned(db, parent):
+        return []
+    # Serializa workers de la API y el cron que corran esto al mismo tiempo
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:k))"), {"k": f"partitions:{parent}"})
+    first = month_start(start or datetime.now(pytz.utc))
+    created = []
+    for n in range(months_ahead + 1):
+        month = add_months(first, n)
+        if create_partition(db, month, parent):
+            created.append(partition_name(month, parent))
+    return created
+
+# Columnas de Logs, en el orden de la tabla
+LOG_COLUMNS = ("id, created_at, user_id, agent, customer, cordoba_id, result, comments, "
+               "affiliate, info_until, client_language, transfer_status")
+# Filas sin fecha (no debería haber): van a la partición default con esta fecha
+NULL_CREATED_AT = "1970-01-01 00:00:00+00"
+
+def _volume(db, table: str) -> tuple:
+    return tuple(db.execute(text(
+        f'SELECT count(*), COALESCE(sum(id::bigint), 0), max(id) FROM "{table}"'
+    )).one())
+
+def partition_existing(db, months_ahead: int, parent: str = PARENT) -> int:
+    """
+    Reconstruye Logs (sin particionar) como tabla particionada por mes y copia
+    el histórico. Tiene Logs en ACCESS EXCLUSIVE mientras dura: con datos, solo
+    en una ventana de mantenimiento (`python manage.py partition-logs`).
+    Recrea los índices que la tabla tenga en ese momento y la FK a Users.
+    Verifica filas, suma y máximo de ids antes de borrar la tabla anterior
+    (si no coinciden, RuntimeError). Devuelve las filas copiadas. No hace commit.
+    """
+    legacy = f"{parent}_legacy"
+    db.execute(text(f'LOCK TABLE "{parent}" IN ACCESS EXCLUSIVE MODE'))
+    before = _volume(db, parent)
+    # Definiciones actuales (las de 0002 y, si ya corrió, las de 0006), salvo la PK
+    indexdefs = db.execute(text("""
+        SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i
+        WHERE i.indrelid = to_regclass(:t) AND NOT i.indisprimary
+    """), {"t": f'"{parent}"'}).scalars().all()
+
+    db.execute(text(f'ALTER TABLE "{parent}" RENAME TO "{legacy}"'))
+    names = db.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :t"
+    ), {"t": legacy}).scalars().all()
+    for name in names:
+        db.execute(text(f'ALTER INDEX "{name}" RENAME TO "{name}_legacy"'))
+
+    db.execute(text(f"""
+        CREATE TABLE "{parent}" (
+            id integer NOT NULL DEFAULT nextval('"{parent}_id_seq"'),
+            created_at timestamp with time zone NOT NULL,
+            user_id integer,
+            agent varchar,
+            customer varchar,
+            cordoba_id varchar,
+            result varchar,
+            comments text,
+            affiliate varchar,
+            info_until varchar,
+            client_language varchar,
+            transfer_status varchar,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """))
+    # Sin partición default: así Postgres recorre las particiones en orden para
+    # ORDER BY created_at DESC LIMIT n y no toca los meses viejos. Solo se crea
+    # si hay filas sin fecha, que no entrarían en ningún mes.
+    if db.execute(text(f'SELECT count(*) FROM "{legacy}" WHERE created_at IS NULL')).scalar():
+        db.execute(text(f'CREATE TABLE "{DEFAULT_PARTITION}" PARTITION OF "{parent}" DEFAULT'))
+
+    # Un mes por partición desde el log más viejo hasta months_ahead meses adelante
+    oldest = db.execute(text(f'SELECT min(created_at) FROM "{legacy}"')).scalar()
+    now = datetime.now(pytz.utc)
+    first = month_start(oldest.astimezone(pytz.utc) if oldest else now)
+    ahead = (now.year - first.year) * 12 + now.month - first.month + months_ahead
+    ensure_partitions(db, ahead, start=first, parent=parent)
+
+    db.execute(text(f"""
+        INSERT INTO "{parent}" ({LOG_COLUMNS})
+        SELECT id, COALESCE(created_at, '{NULL_CREATED_AT}'), user_id, agent, customer, cordoba_id,
+               result, comments, affiliate, info_until, client_language, transfer_status
+        FROM "{legacy}"
+    """))
+    after = _volume(db, parent)
+    if before != after:
+        raise RuntimeError(
+            f"{parent}: el volumen no coincide (antes filas/suma/max id={before}, después={after})"
+        )
+
+    db.execute(text(f'ALTER SEQUENCE "{parent}_id_seq" OWNED BY "{parent}".id'))
+    db.execute(text(f'DROP TABLE "{legacy}"'))
+    for indexdef in indexdefs:
+        db.execute(text(indexdef))
+    db.execute(text(
+        f'ALTER TABLE "{parent}" ADD CONSTRAINT "{parent}_user_id_fkey" '
+        f'FOREIGN KEY (user_id) REFERENCES "Users" (id)'
+    ))
+    db.execute(text(f'ANALYZE "{parent}"'))
+    return before[0]
+
+def missing_partitions(db, months: int = 2, parent: str = PARENT) -> List[str]:
+    """
+    Particiones que faltan para los próximos `months` meses (desde el actual).
+    Vacío si Logs no está particionada o si hay default (nada falla al insertar).
+    Acepta Session o Connection (la readiness probe la usa con run_sync).
+    """
+    if not is_partitioned(db, parent):
+        return []
+    if db.execute(text("SELECT to_regclass(:t)"), {"t": f'"{parent}_default"'}).scalar():
+        return []
+    first = month_start(datetime.now(pytz.utc))
+    names = [partition_name(add_months(first, n), parent) for n in range(months)]
+    return [
+        name for name in names
+        if not db.execute(text("SELECT to_regclass(:t)"), {"t": f'"{name}"'}).scalar()
+    ]
+
+
+class PartitionKeeper:
+    """
+    Crea las particiones faltantes cada LOG_PARTITION_CHECK_SECONDS: un worker
+    que corre meses sin reiniciarse (y sin el cron) no se queda sin la del mes
+    siguiente. El advisory lock de ensure_partitions serializa a los workers.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    @staticmethod
+    def run_once() -> List[str]:
+        db = SessionLocal()
+        try:
+            created = ensure_partitions(db, settings.LOG_PARTITION_MONTHS_AHEAD)
+            db.commit()
+        finally:
+            db.close()
+        if created:
+            logger.info("Particiones de Logs creadas: %s", ", ".join(created))
+        return created
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=settings.LOG_PARTITION_CHECK_SECONDS)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception:
+                logger.exception("No se pudieron crear las particiones de Logs")
+
+    def start(self) -> None:
+        """Arranca el chequeo periódico (lifespan de la app)."""
+        if settings.LOG_PARTITION_CHECK_SECONDS and (self._task is None or self._task.done()):
+            self._stopping = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._stopping.set()
+            await self._task
+
+
+# Instancia única por proceso
+keeper = PartitionKeeper()
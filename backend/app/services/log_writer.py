@@ -0,0 +1,158 @@
+# --- app/services/log_writer.py ---
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Optional
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.crud import crud_log
+from app.services import live_feed
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+def _write_batch(db, rows: list, names: list) -> list:
+    """Inserta el lote y avisa al feed del admin en la misma transacción."""
+    results = crud_log.insert_log_rows(db, rows)
+    live_feed.notify(db, [
+        live_feed.feed_message(
+            log_id, created_at, name, row["cordoba_id"], row["result"], row["affiliate"], row["user_id"]
+        )
+        for row, name, (log_id, created_at) in zip(rows, names, results)
+    ])
+    return results
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, int(len(ordered) * pct) - 1)]
+
+
+class GroupCommitWriter:
+    """
+    Group commit para POST /logs/ (opcional, LOG_GROUP_COMMIT=true).
+    Las notas entrantes se encolan y una tarea las escribe juntas en UNA
+    transacción cada LOG_GROUP_COMMIT_MAX_WAIT_MS o cada LOG_GROUP_COMMIT_MAX_ROWS
+    filas. Cada request espera el commit de su lote antes de responder: un 200
+    siempre significa que la fila ya es durable. Si el lote falla, fallan
+    todas sus requests (nada queda a medias).
+    """
+
+    def __init__(self, max_rows: int, max_wait_ms: int):
+        self.max_rows = max_rows
+        self.max_wait = max_wait_ms / 1000
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Métricas (últimos 1000 lotes / requests)
+        self.flushes = 0
+        self.rows = 0
+        self.errors = 0
+        self._sizes = deque(maxlen=1000)
+        self._commit_ms = deque(maxlen=1000)
+        self._wait_ms = deque(maxlen=1000)
+
+    def _ensure_started(self) -> None:
+        # Cola y tarea ligadas al event loop actual (uno por worker de uvicorn)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+
+    async def submit(self, row: dict, agent_real_name: str = "") -> tuple:
+        """Encola una fila (crud_log.build_log_row) y espera su commit. Devuelve (id, created_at)."""
+        self._ensure_started()
+        future = self._loop.create_future()
+        self._queue.put_nowait((row, agent_real_name, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self, first) -> list:
+        batch = [first]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_rows:
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            if item is _STOP:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            first = await self._queue.get()
+            batch = [first] if first is _STOP else await self._collect(first)
+            stop = batch[-1] is _STOP
+            if stop:
+                batch.pop()
+            if batch:
+                await self._flush(batch)
+            if stop:
+                return
+
+    async def _flush(self, batch: list) -> None:
+        started = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                results = await db.run_sync(
+                    _write_batch, [row for row, _, _, _ in batch], [name for _, name, _, _ in batch]
+                )
+                await db.commit()
+        except Exception as e:
+            logger.exception("Falló el group commit de %s logs", len(batch))
+            self.errors += 1
+            for _, _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        done = time.perf_counter()
+        self.flushes += 1
+        self.rows += len(batch)
+        self._sizes.append(len(batch))
+        self._commit_ms.append((done - started) * 1000)
+        for (_, _, future, queued_at), result in zip(batch, results):
+            self._wait_ms.append((done - queued_at) * 1000)
+            # Si el cliente se desconectó el futuro ya está cancelado: la fila igual quedó guardada
+            if not future.done():
+                future.set_result(result)
+
+    async def stop(self) -> None:
+        """Escribe lo pendiente y detiene la tarea (shutdown de la app)."""
+        if self._task is None or self._task.done() or self._loop is not asyncio.get_running_loop():
+            return
+        self._queue.put_nowait(_STOP)
+        await self._task
+
+    def stats(self) -> dict:
+        sizes, commit_ms, wait_ms = list(self._sizes), list(self._commit_ms), list(self._wait_ms)
+        return {
+            "enabled": settings.LOG_GROUP_COMMIT,
+            "max_rows": self.max_rows,
+            "max_wait_ms": self.max_wait * 1000,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "flushes": self.flushes,
+            "rows": self.rows,
+            "errors": self.errors,
+            "flush_size_avg": round(sum(sizes) / len(sizes), 1) if sizes else 0.0,
+            "flush_size_max": max(sizes, default=0),
+            "commit_p50_ms": round(_percentile(commit_ms, 0.50), 1),
+            "commit_p95_ms": round(_percentile(commit_ms, 0.95), 1),
+            "request_wait_p50_ms": round(_percentile(wait_ms, 0.50), 1),
+            "request_wait_p95_ms": round(_percentile(wait_ms, 0.95), 1),
+        }
+
+
+log_writer = GroupCommitWriter(
+    max_rows=settings.LOG_GROUP_COMMIT_MAX_ROWS,
+    max_wait_ms=settings.LOG_GROUP_COMMIT_MAX_WAIT_MS,
+)
@@ -0,0 +1,139 @@
+# --- app/services/metrics.py ---
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pytz
+from sqlalchemy import and_, case, func, not_, select
+from sqlalchemy.orm import Session
+
+from app.models import models
+from app.schemas import schemas
+
+# Los agentes trabajan en hora de New York (ET), pero la BD guarda en UTC
+TZ_ET = pytz.timezone('US/Eastern')
+
+def completed_clause(column=models.Log.result):
+    """Venta completada: contiene 'Completed' y NO contiene 'Not' (lógica del MVP)."""
+    return and_(column.ilike("%Completed%"), not_(column.ilike("%Not%")))
+
+RESULT_COMPLETED = "completed"
+RESULT_NOT_COMPLETED = "not_completed"
+RESULT_OTHER = "other"
+
+def classify_result(result: Optional[str]) -> str:
+    """Clase de resultado para el rollup diario. Debe coincidir con result_class_sql()."""
+    value = (result or "").lower()
+    if "completed" in value:
+        return RESULT_NOT_COMPLETED if "not" in value else RESULT_COMPLETED
+    return RESULT_OTHER
+
+def result_class_sql(column=models.Log.result):
+    return case(
+        (completed_clause(column), RESULT_COMPLETED),
+        (column.ilike("%Completed%"), RESULT_NOT_COMPLETED),
+        else_=RESULT_OTHER,
+    )
+
+def get_period_starts_utc(now: Optional[datetime] = None) -> dict:
+    """
+    Inicio de hoy, de la semana (lunes) y del mes en ET, convertidos a UTC
+    para comparar directamente contra Logs.created_at.
+    """
+    now_et = (now or datetime.now(pytz.utc)).astimezone(TZ_ET)
+    midnight = now_et.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+
+    starts = {
+        "today": midnight,
+        "week": midnight - timedelta(days=now_et.weekday()),
+        "month": midnight.replace(day=1),
+    }
+    # localize() resuelve bien los cambios de horario (DST) de cada frontera
+    return {k: TZ_ET.localize(v).astimezone(pytz.utc) for k, v in starts.items()}
+
+def build_metrics_set(total: int, completed: int) -> schemas.MetricsSet:
+    rate = (completed / total * 100) if total > 0 else 0.0
+    return schemas.MetricsSet(
+        total_calls=total,
+        completed_sales=completed,
+        conversion_rate=round(rate, 1)
+    )
+
+def get_period_start_dates(now: Optional[datetime] = None) -> dict:
+    """Inicio de hoy, de la semana (lunes) y del mes como fechas ET (claves del rollup)."""
+    today = (now or datetime.now(pytz.utc)).astimezone(TZ_ET).date()
+    return {
+        "today": today,
+        "week": today - timedelta(days=today.weekday()),
+        "month": today.replace(day=1),
+    }
+
+def get_performance(db: Session, user_id: int, now: Optional[datetime] = None) -> schemas.PerformanceData:
+    """
+    KPIs de hoy/semana/mes del agente en UNA sola consulta sobre el rollup
+    diario (Agent_Daily_Stats): SUM(calls) FILTER (...) por periodo sobre la
+    ventana más amplia (la semana puede empezar en el mes anterior).
+    """
+    stats = models.AgentDailyStat
+    starts = get_period_start_dates(now)
+    is_completed = stats.result_class == RESULT_COMPLETED
+
+    columns = []
+    for period in ("today", "week", "month"):
+        in_period = stats.business_date >= starts[period]
+        columns.append(func.coalesce(func.sum(stats.calls).filter(in_period), 0))
+        columns.append(func.coalesce(func.sum(stats.calls).filter(and_(in_period, is_completed)), 0))
+
+    row = db.execute(
+        select(*columns).where(
+            stats.user_id == user_id,
+            stats.business_date >= min(starts["week"], starts["month"]),
+        )
+    ).one()
+
+    return schemas.PerformanceData(
+        today=build_metrics_set(row[0], row[1]),
+        this_week=build_metrics_set(row[2], row[3]),
+        this_month=build_metrics_set(row[4], row[5]),
+    )
+
+def get_global_stats(db: Session, now: Optional[datetime] = None) -> dict:
+    """Totales globales para /admin/stats en una sola ida a la BD (desde el rollup)."""
+    stats = models.AgentDailyStat
+    today = get_period_start_dates(now)["today"]
+    sales_today = and_(stats.business_date == today, stats.result_class == RESULT_COMPLETED)
+
+    total_banks = select(func.count()).select_from(models.Creditor).scalar_subquery()
+    row = db.execute(
+        select(
+            func.coalesce(func.sum(stats.calls), 0),
+            func.coalesce(func.sum(stats.calls).filter(sales_today), 0),
+            total_banks,
+        ).select_from(stats)
+    ).one()
+
+    return {"total_calls": row[0], "sales_today": row[1], "total_banks": row[2]}
+
+def get_agent_summary(db: Session, start_date, end_date, target_agent: str) -> list:
+    """
+    Total de llamadas y ventas por agente (resumen del reporte Estratégico),
+    sumando el rollup de los días ET [start_date, end_date].
+    Mismo filtro de agente que crud_log.report_filters.
+    """
+    stats = models.AgentDailyStat
+    query = (
+        select(
+            models.User.username,
+            func.sum(stats.calls),
+            func.coalesce(func.sum(stats.calls).filter(stats.result_class == RESULT_COMPLETED), 0),
+        )
+        .join(models.User, models.User.id == stats.user_id)
+        .where(stats.business_date >= start_date, stats.business_date <= end_date)
+        .group_by(models.User.username)
+    )
+    if "TODOS" not in target_agent:
+        query = query.where(models.User.username.ilike(target_agent))
+    else:
+        query = query.where(models.User.username != 'test')
+
+    rows = db.execute(query).all()
+    return [{"agent": agent, "total": total, "completed": comp} for agent, total, comp in rows]
@@ -0,0 +1,129 @@
+# --- app/services/password_hasher.py ---
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Optional
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+# Cada proceso del pool crea su propio contexto al importar el módulo
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+class HasherBusyError(Exception):
+    """La cola de hashing está llena: el cliente debe reintentar (503 + Retry-After)."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Cola de hashing de contraseñas llena")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """
+    Ejecuta bcrypt en un pool de procesos dedicado con cola acotada.
+    Un verify de bcrypt dura cientos de ms de CPU: en el threadpool de FastAPI
+    retiene el GIL y frena al resto de requests (ej: POST /logs/) durante el
+    login masivo de inicio de turno. Si hay más de PASSWORD_HASH_MAX_PENDING
+    tareas en curso o en espera, se rechaza al instante en vez de encolar.
+    """
+
+    def __init__(self, workers: int, max_pending: int, retry_after: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._latencies = deque(maxlen=1000)  # Segundos desde el envío hasta el resultado
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn: no heredamos hilos ni conexiones abiertas del proceso web
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._executor
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HasherBusyError(self.retry_after)
+            self._pending += 1
+        started = time.perf_counter()
+
+        def _done(_):
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+                self._latencies.append(time.perf_counter() - started)
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(_done)
+        return future
+
+    # --- API ---
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Versión bloqueante (rutas síncronas y scripts)."""
+        return self._submit(_verify, plain_password, hashed_password).result()
+
+    def hash(self, password: str) -> str:
+        return self._submit(_hash, password).result()
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(self._submit(_verify, plain_password, hashed_password))
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(_hash, password))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            pending = self._pending
+        p50 = latencies[len(latencies) // 2] if latencies else 0.0
+        p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)] if latencies else 0.0
+        return {
+            "workers": self.workers,
+            "queue_depth": pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "latency_p50_ms": round(p50 * 1000, 1),
+            "latency_p95_ms": round(p95 * 1000, 1),
+        }
+
+
+# Instancia única por proceso web (el pool se crea en el primer uso)
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS,
+)
@@ -0,0 +1,153 @@
+# --- app/services/principal_cache.py ---
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import models
+from app.services import live_feed
+
+CHANNEL = "principal_changed"
+
+# Columnas del usuario que se guardan en caché (nunca el hash de la contraseña)
+PRINCIPAL_FIELDS = ("id", "username", "name", "role", "active")
+
+
+class TTLCache:
+    """
+    Caché LRU con vencimiento por entrada, segura entre hilos
+    (las rutas síncronas corren en el threadpool de FastAPI).
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[1] <= now:
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key: Hashable, value: Any, expires_at: float) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+class PrincipalCache:
+    """
+    Evita la consulta a Users en cada request autenticado:
+      - tokens:     sha256(token) -> username, hasta el 'exp' del JWT
+      - principals: username -> columnas del usuario, durante PRINCIPAL_CACHE_TTL_SECONDS
+    Las rutas que modifican usuarios llaman a notify() en la transacción del
+    cambio y a invalidate() después del commit: una desactivación o un cambio
+    de rol aplica de inmediato en este worker y, con el NOTIFY en CHANNEL, en
+    los demás (el LISTEN de live_feed llama a on_notify). Si ese LISTEN está
+    caído no se confía en los usuarios en caché.
+    """
+    channel = CHANNEL
+
+    def __init__(self):
+        self.tokens = TTLCache(settings.PRINCIPAL_CACHE_MAX_ENTRIES)
+        self.principals = TTLCache(settings.PRINCIPAL_CACHE_MAX_ENTRIES)
+        # Sube con cada invalidación: un usuario leído de la BD antes no se guarda
+        self.version = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _token_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    # --- TOKENS ---
+
+    def get_token_subject(self, token: str) -> Optional[str]:
+        return self.tokens.get(self._token_key(token))
+
+    def remember_token(self, token: str, username: str, exp: Optional[float]) -> None:
+        if exp is None:
+            return  # Sin 'exp' no sabemos hasta cuándo es válido: no se memoiza
+        remaining = float(exp) - time.time()
+        if remaining > 0:
+            self.tokens.set(self._token_key(token), username, time.monotonic() + remaining)
+
+    # --- USUARIOS ---
+
+    def get_user(self, username: str) -> Optional[models.User]:
+        """Devuelve un User nuevo (no ligado a ninguna sesión) o None si no está en caché."""
+        if not live_feed.broadcaster.connected:
+            return None
+        fields = self.principals.get(username)
+        if fields is None:
+            return None
+        return models.User(**fields)
+
+    def put_user(self, user: models.User, version: int) -> None:
+        """`version`: la de antes de consultar la BD (si hubo una invalidación en el medio, no se guarda)."""
+        ttl = settings.PRINCIPAL_CACHE_TTL_SECONDS
+        if ttl <= 0:
+            return
+        fields = {f: getattr(user, f) for f in PRINCIPAL_FIELDS}
+        with self._lock:
+            if self.version == version:
+                self.principals.set(user.username, fields, time.monotonic() + ttl)
+
+    def invalidate(self, username: str) -> None:
+        with self._lock:
+            self.version += 1
+            self.principals.pop(username)
+
+    def notify(self, db: Session, *usernames: str) -> None:
+        """Avisa a los demás workers con el commit de `db` (payload = username)."""
+        for username in usernames:
+            db.execute(text("SELECT pg_notify(:channel, :username)"), {"channel": CHANNEL, "username": username})
+
+    def on_notify(self, payload: Optional[str] = None) -> None:
+        """payload = username del NOTIFY; None (reconexión del LISTEN) descarta todos."""
+        if payload is None:
+            with self._lock:
+                self.version += 1
+                self.principals.clear()
+        else:
+            self.invalidate(payload)
+
+    def clear(self) -> None:
+        self.tokens.clear()
+        self.principals.clear()
+
+    def stats(self) -> dict:
+        return {"principals": self.principals.stats(), "tokens": self.tokens.stats()}
+
+
+# Instancia única por proceso
+principal_cache = PrincipalCache()
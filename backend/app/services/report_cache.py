@@ -0,0 +1,153 @@
+# --- app/services/report_cache.py ---
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Callable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud import crud_user
+from app.models import models
+from app.schemas import schemas
+from app.services import metrics
+
+# Subir cuando cambie el formato de los Excel: invalida todo lo cacheado
+REPORT_FORMAT_VERSION = 1
+
+def data_version(db: Session, params: schemas.ReportRequest) -> str:
+    """
+    Versión de los datos que alimentan el reporte.
+    - Rango cerrado (termina antes de hoy ET): los días pasados no cambian.
+    - Rango que incluye hoy: MAX(Logs.id) más las llamadas de hoy en el rollup.
+      Solo MAX(id) no alcanza: los ids se asignan antes del commit y un lote del
+      group commit puede confirmar un id menor después de uno mayor. El rollup
+      se actualiza en la misma transacción que el insert, así que su suma cambia
+      cuando cada fila se confirma (ambas consultas van por índice).
+    Incluye los nombres de los agentes, que aparecen en el Excel.
+    """
+    today = metrics.get_period_start_dates()["today"]
+    if params.end_date < today:
+        logs_part = "closed"
+    else:
+        max_id = db.scalar(select(func.max(models.Log.id)))
+        calls_today = db.scalar(
+            select(func.coalesce(func.sum(models.AgentDailyStat.calls), 0))
+            .where(models.AgentDailyStat.business_date >= today)
+        )
+        logs_part = f"open:{max_id}:{calls_today}"
+    user_map = crud_user.get_user_map(db)
+    users_part = hashlib.sha1(json.dumps(sorted(user_map.items())).encode()).hexdigest()[:12]
+    return f"{REPORT_FORMAT_VERSION}:{logs_part}:{users_part}"
+
+def cache_key(params: schemas.ReportRequest, version: str) -> str:
+    raw = json.dumps([
+        params.start_date.isoformat(), params.end_date.isoformat(),
+        params.target_agent, params.report_type, version,
+    ])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ReportCache:
+    """
+    Caché de reportes en disco direccionada por contenido (sha256 de los parámetros
+    y la versión de datos). Expulsión LRU por tamaño total usando el mtime
+    (se actualiza en cada acierto). Seguro entre procesos: los archivos se
+    publican con os.replace y los borrados concurrentes se ignoran.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.xlsx")
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            os.utime(path)  # Marca de uso reciente para el LRU
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def put(self, key: str, write: Callable[[str], None]) -> str:
+        """Genera el archivo con write(ruta_temporal) y lo publica de forma atómica."""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, partial = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        os.close(fd)
+        try:
+            write(partial)
+            path = self._path(key)
+            os.replace(partial, path)
+        except Exception:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        self.evict()
+        return path
+
+    def get_or_create(self, key: str, write: Callable[[str], None]) -> str:
+        return self.get(key) or self.put(key, write)
+
+    def _entries(self) -> list:
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return entries
+        for name in names:
+            if not name.endswith(".xlsx"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+        return entries
+
+    def evict(self) -> int:
+        """Borra los archivos menos usados hasta quedar bajo max_bytes."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        return removed
+
+    def clear(self) -> None:
+        for _, _, name in self._entries():
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        return {
+            "files": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+report_cache = ReportCache(settings.REPORT_CACHE_DIR, settings.REPORT_CACHE_MAX_BYTES)
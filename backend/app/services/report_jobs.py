@@ -0,0 +1,220 @@
+# --- app/services/report_jobs.py ---
+import logging
+import multiprocessing
+import os
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pytz
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine, set_statement_timeout
+from app.models import models
+from app.schemas import schemas
+from app.services import reports
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_FINISHED = "finished"
+JOB_FAILED = "failed"
+PENDING_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+def job_params(job: models.ReportJob) -> schemas.ReportRequest:
+    return schemas.ReportRequest(
+        start_date=job.start_date,
+        end_date=job.end_date,
+        target_agent=job.target_agent,
+        report_type=job.report_type,
+    )
+
+def job_file_path(job_id: int) -> str:
+    return os.path.join(settings.REPORT_DIR, f"{job_id}.xlsx")
+
+# --- EJECUCIÓN (dentro de los procesos del pool) ---
+
+def _init_worker() -> None:
+    # Prioridad baja: ante falta de CPU gana el tráfico de los agentes
+    if settings.REPORT_WORKER_NICE:
+        os.nice(settings.REPORT_WORKER_NICE)
+    # Un reporte de meses puede pasar el statement_timeout pensado para la API
+    set_statement_timeout(0)
+
+def _set_job(job_id: int, **values) -> None:
+    # Conexión propia: la sesión del reporte tiene abierto el cursor del servidor
+    with engine.begin() as conn:
+        conn.execute(update(models.ReportJob).where(models.ReportJob.id == job_id).values(**values))
+
+def run_job(job_id: int) -> None:
+    """Genera el archivo de un trabajo. Solo un proceso lo ejecuta (claim atómico)."""
+    now = datetime.now(pytz.utc)
+    with engine.begin() as conn:
+        claimed = conn.execute(
+            update(models.ReportJob)
+            .where(models.ReportJob.id == job_id, models.ReportJob.status == JOB_QUEUED)
+            .values(status=JOB_RUNNING, started_at=now)
+        ).rowcount
+    if not claimed:
+        return
+
+    path = job_file_path(job_id)
+    partial = path + ".part"
+    db = SessionLocal()
+    try:
+        params = job_params(db.get(models.ReportJob, job_id))
+        os.makedirs(settings.REPORT_DIR, exist_ok=True)
+        cached = reports.get_report_path(db, params, progress=lambda pct: _set_job(job_id, progress=pct))
+        # Copia propia del trabajo: la caché puede expulsar su archivo en cualquier momento
+        try:
+            os.link(cached, partial)
+        except OSError:
+            shutil.copyfile(cached, partial)
+        os.replace(partial, path)
+        _set_job(job_id, status=JOB_FINISHED, progress=100, file_path=path,
+                 file_size=os.path.getsize(path), finished_at=datetime.now(pytz.utc))
+    except Exception as e:
+        logger.exception("Falló el reporte %s", job_id)
+        if os.path.exists(partial):
+            os.remove(partial)
+        _set_job(job_id, status=JOB_FAILED, error=str(e)[:500], finished_at=datetime.now(pytz.utc))
+    finally:
+        db.close()
+
+# --- COLA (en el proceso web) ---
+
+class ReportJobRunner:
+    """
+    Pool de procesos que ejecuta los reportes fuera de los workers web.
+    El estado vive en Report_Jobs, así cualquier worker puede responder el
+    polling y los trabajos en cola sobreviven a un reinicio (resume_queued).
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def submit(self, job_id: int) -> None:
+        self._get_executor().submit(run_job, job_id)
+
+    def resume_queued(self, db: Session) -> int:
+        """Reenvía al pool los trabajos que quedaron en cola (ej: tras un reinicio)."""
+        reclaim_stale(db)
+        purge_expired(db)
+        ids = db.scalars(
+            select(models.ReportJob.id)
+            .where(models.ReportJob.status == JOB_QUEUED)
+            .order_by(models.ReportJob.id)
+        ).all()
+        for job_id in ids:
+            self.submit(job_id)
+        return len(ids)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            # Los trabajos no iniciados siguen "queued" en la BD y se retoman al arrancar
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+runner = ReportJobRunner(workers=settings.REPORT_WORKERS)
+
+# --- API PARA LAS RUTAS ---
+
+def reclaim_stale(db: Session) -> int:
+    """
+    Marca "failed" los trabajos "running" que empezaron hace más de
+    REPORT_JOB_TIMEOUT_SECONDS: su proceso murió (reinicio, OOM) y nadie los
+    termina; sin esto ocupan lugar en count_pending para siempre. El mismo
+    UPDATE atómico que el claim: uno vivo y más nuevo no se toca. Hace commit.
+    """
+    now = datetime.now(pytz.utc)
+    reclaimed = db.execute(
+        update(models.ReportJob)
+        .where(
+            models.ReportJob.status == JOB_RUNNING,
+            models.ReportJob.started_at < now - timedelta(seconds=settings.REPORT_JOB_TIMEOUT_SECONDS),
+        )
+        .values(status=JOB_FAILED, error="Interrumpido (reinicio o falta de memoria): volver a pedirlo",
+                finished_at=now)
+    ).rowcount
+    db.commit()
+    if reclaimed:
+        logger.warning("%s reportes interrumpidos marcados como fallidos", reclaimed)
+    return reclaimed
+
+def purge_expired(db: Session) -> int:
+    """
+    Retención de REPORT_DIR: borra el archivo de los trabajos terminados hace más
+    de REPORT_JOB_FILE_TTL_HOURS (queda la fila; la descarga responde 410) y las
+    filas de más de REPORT_JOB_HISTORY_DAYS con su archivo, si queda. Hace commit.
+    """
+    now = datetime.now(pytz.utc)
+    file_cutoff = now - timedelta(hours=settings.REPORT_JOB_FILE_TTL_HOURS)
+    row_cutoff = now - timedelta(days=settings.REPORT_JOB_HISTORY_DAYS)
+    job = models.ReportJob
+    expired = db.scalars(
+        select(job).where(
+            job.status.notin_(PENDING_STATUSES),
+            or_(
+                (job.file_path.isnot(None)) & (job.finished_at < file_cutoff),
+                job.created_at < row_cutoff,
+            ),
+        )
+    ).all()
+    for old in expired:
+        if old.file_path:
+            try:
+                os.remove(old.file_path)
+            except FileNotFoundError:
+                pass
+            old.file_path = None
+    removed = db.execute(
+        delete(job).where(job.status.notin_(PENDING_STATUSES), job.created_at < row_cutoff)
+    ).rowcount
+    db.commit()
+    return removed
+
+def count_pending(db: Session) -> int:
+    return db.scalar(
+        select(func.count()).select_from(models.ReportJob)
+        .where(models.ReportJob.status.in_(PENDING_STATUSES))
+    )
+
+def enqueue(db: Session, params: schemas.ReportRequest, requested_by: int) -> models.ReportJob:
+    job = models.ReportJob(
+        requested_by=requested_by,
+        report_type=params.report_type,
+        start_date=params.start_date,
+        end_date=params.end_date,
+        target_agent=params.target_agent,
+        status=JOB_QUEUED,
+        progress=0,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    runner.submit(job.id)
+    return job
+
+def list_jobs(db: Session, limit: int = 50) -> list:
+    return db.scalars(
+        select(models.ReportJob).order_by(models.ReportJob.created_at.desc()).limit(limit)
+    ).all()
@@ -0,0 +1,84 @@
+# --- app/services/reports.py ---
+from typing import IO, Callable, Iterable, Iterator, Optional
+
+from sqlalchemy.orm import Session
+
+from app.crud import crud_log, crud_user
+from app.schemas import schemas
+from app.services import metrics, report_cache
+from app.utils import excel_generator
+
+# Filas que trae cada vuelta del cursor del servidor en el reporte Operativo
+REPORT_CHUNK_SIZE = 2000
+# Tamaño de cada bloque al enviar el archivo al cliente
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+XLSX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+def report_filename(params: schemas.ReportRequest) -> str:
+    return f"Reporte_{params.report_type}_{params.start_date}.xlsx"
+
+def _track(rows: Iterable, total: int, progress: Callable[[int], None]) -> Iterator:
+    """Reenvía las filas e informa el avance (0-100) al terminar cada bloque."""
+    for done, row in enumerate(rows, start=1):
+        yield row
+        if done % REPORT_CHUNK_SIZE == 0 and total:
+            progress(min(99, done * 100 // total))
+
+def write_report(
+    db: Session,
+    params: schemas.ReportRequest,
+    output,
+    progress: Optional[Callable[[int], None]] = None,
+) -> None:
+    """
+    Genera el Excel del reporte en `output` (ruta o archivo binario) con memoria
+    acotada: agregados en SQL y el detalle Operativo leído por bloques.
+    `progress(pct)` (opcional) recibe el avance del Operativo mientras se escribe.
+    Es bloqueante: desde rutas async debe llamarse fuera del event loop.
+    """
+    args = (params.start_date, params.end_date, params.target_agent)
+    user_map = crud_user.get_user_map(db)
+
+    if params.report_type == excel_generator.REPORT_STRATEGIC:
+        # El Estratégico solo necesita totales por agente: salen del rollup diario
+        excel_generator.stream_excel_file(
+            output, user_map, params.report_type, summary=metrics.get_agent_summary(db, *args)
+        )
+    elif params.report_type == excel_generator.REPORT_OPERATIONAL:
+        rows = crud_log.iter_logs_for_report(db, *args, chunk_size=REPORT_CHUNK_SIZE)
+        if progress is not None:
+            rows = _track(rows, crud_log.count_logs_for_report(db, *args), progress)
+        excel_generator.stream_excel_file(
+            output, user_map, params.report_type,
+            agents=crud_log.get_report_agents(db, *args),
+            rows=rows,
+        )
+    else:
+        funnel = None
+        if params.report_type == excel_generator.REPORT_QUALITY:
+            funnel = crud_log.get_funnel_counts(db, *args)
+        excel_generator.stream_excel_file(output, user_map, params.report_type, funnel=funnel)
+
+def get_report_path(
+    db: Session,
+    params: schemas.ReportRequest,
+    progress: Optional[Callable[[int], None]] = None,
+) -> str:
+    """Ruta del Excel en la caché de reportes; lo genera solo si no está cacheado."""
+    key = report_cache.cache_key(params, report_cache.data_version(db, params))
+    return report_cache.report_cache.get_or_create(
+        key, lambda path: write_report(db, params, path, progress=progress)
+    )
+
+def build_report_file(db: Session, params: schemas.ReportRequest) -> IO[bytes]:
+    """Abre el reporte listo para leer (sigue legible aunque la caché lo expulse)."""
+    return open(get_report_path(db, params), "rb")
+
+def iter_file(fileobj: IO[bytes], chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> Iterator[bytes]:
+    """Lee el archivo por bloques para StreamingResponse y lo cierra al terminar."""
+    try:
+        while chunk := fileobj.read(chunk_size):
+            yield chunk
+    finally:
+        fileobj.close()
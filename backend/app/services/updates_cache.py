@@ -0,0 +1,144 @@
+# --- app/services/updates_cache.py ---
+"""
+Noticias activas (Updates) en memoria del worker: /updates/ y el dashboard
+(/workspace/information) no vuelven a leer la tabla mientras nada cambie.
+
+publish_update y archive_update invalidan la caché local y publican un
+pg_notify en CHANNEL con el commit; el LISTEN de cada worker (live_feed)
+invalida la suya. Si ese LISTEN está caído no se confía en la caché: un
+cambio hecho en otro worker pasaría desapercibido.
+
+El estado de lectura de cada usuario sale de una sola consulta sobre
+ix_updates_reads_user_update y se guarda hasta que el usuario marca algo
+(READS_CHANNEL avisa a los demás workers). Con todo en caché, el ETag de
+/updates/ se calcula sin tocar la BD.
+"""
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import FrozenSet, Optional, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import models
+from app.schemas import schemas
+from app.services import live_feed
+from app.services.principal_cache import TTLCache
+
+CHANNEL = "updates_changed"
+READS_CHANNEL = "updates_read"
+READS_TTL_SECONDS = 3600
+
+@dataclass(frozen=True)
+class ActiveUpdates:
+    updates: Tuple[schemas.UpdateOut, ...]  # /updates/ (read=False)
+    news: Tuple[schemas.NewsItem, ...]      # /workspace/information
+    digest: str                             # Sello del contenido (ETag)
+
+    @property
+    def ids(self) -> list:
+        return [u.id for u in self.updates]
+
+
+class UpdatesCache:
+    channel = CHANNEL
+    reads_channel = READS_CHANNEL
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[ActiveUpdates] = None
+        self._version = 0
+        # user_id -> (digest de las noticias, ids leídos entre las activas)
+        self._reads = TTLCache(settings.PRINCIPAL_CACHE_MAX_ENTRIES)
+        self._reads_version = 0
+        self.hits = 0
+        self.loads = 0
+
+    def active(self, db: Session) -> ActiveUpdates:
+        """Noticias activas, más nuevas primero. Solo consulta la BD si no hay snapshot."""
+        snapshot = self._snapshot
+        if snapshot is not None and live_feed.broadcaster.connected:
+            self.hits += 1
+            return snapshot
+
+        version = self._version
+        rows = db.scalars(
+            select(models.Update)
+            .where(models.Update.active == True)
+            .order_by(models.Update.date.desc(), models.Update.id.desc())
+        ).all()
+        updates = tuple(schemas.UpdateOut.model_validate(u) for u in rows)
+        raw = json.dumps([u.model_dump(mode="json") for u in updates], separators=(",", ":"))
+        snapshot = ActiveUpdates(
+            updates=updates,
+            news=tuple(
+                schemas.NewsItem(id=u.id, title=u.title, message=u.message, category=u.category, date=str(u.date))
+                for u in rows
+            ),
+            digest=hashlib.sha256(raw.encode()).hexdigest()[:32],
+        )
+        # Sin lock durante la consulta (corre dentro de run_sync): si hubo una
+        # invalidación mientras tanto, este resultado puede ser viejo y no se guarda
+        with self._lock:
+            self.loads += 1
+            if self._version == version:
+                self._snapshot = snapshot
+        return snapshot
+
+    def digest(self) -> Optional[str]:
+        """Digest del snapshot actual sin consultar la BD (None si está invalidado)."""
+        snapshot = self._snapshot
+        return snapshot.digest if snapshot is not None else None
+
+    def invalidate(self, payload=None) -> None:
+        with self._lock:
+            self._version += 1
+            self._snapshot = None
+
+    def notify(self, db: Session) -> None:
+        """Avisa a los demás workers con el commit de `db`."""
+        db.execute(text("SELECT pg_notify(:channel, '')"), {"channel": CHANNEL})
+
+    def read_ids(self, db: Session, user_id: int, active: ActiveUpdates) -> FrozenSet[int]:
+        """Cuáles de las noticias activas ya leyó el usuario (una búsqueda por índice si no está en caché)."""
+        cached = self._reads.get(user_id)
+        if cached is not None and cached[0] == active.digest and live_feed.broadcaster.connected:
+            return cached[1]
+
+        version = self._reads_version
+        ids = active.ids
+        read = frozenset(db.scalars(
+            select(models.UpdateRead.update_id).where(
+                models.UpdateRead.user_id == user_id,
+                models.UpdateRead.update_id.in_(ids),
+            )
+        ).all()) if ids else frozenset()
+        with self._lock:
+            if self._reads_version == version:
+                self._reads.set(user_id, (active.digest, read), time.monotonic() + READS_TTL_SECONDS)
+        return read
+
+    def reads_changed(self, db: Session, user_id: int) -> None:
+        """El usuario marcó noticias: avisa a los demás workers con el commit de `db`."""
+        db.execute(text("SELECT pg_notify(:channel, :user_id)"), {"channel": READS_CHANNEL, "user_id": str(user_id)})
+
+    def invalidate_reads(self, payload: Optional[str] = None) -> None:
+        """payload = user_id del NOTIFY; None (reconexión del LISTEN) descarta todo."""
+        with self._lock:
+            self._reads_version += 1
+            if payload is None:
+                self._reads.clear()
+            else:
+                self._reads.pop(int(payload))
+
+    def stats(self) -> dict:
+        return {"cached": self._snapshot is not None, "hits": self.hits, "loads": self.loads,
+                "reads": self._reads.stats()}
+
+
+# Instancia única por proceso
+updates_cache = UpdatesCache()
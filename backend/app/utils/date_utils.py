@@ -1,101 +1,191 @@
 # --- app/utils/date_utils.py ---
-from datetime import datetime, timedelta
+"""
+Calendario de días hábiles para las fechas de pago del dashboard.
+
+Los feriados se calculan por regla para cualquier año (fijos y "n-ésimo día
+de la semana del mes"), con el corrimiento de los bancos (Federal Reserve):
+si caen domingo se observan el lunes; si caen sábado no se mueven (ese
+viernes se trabaja).
+
+Por año se precalcula un arreglo de ordinales de días hábiles, así
+"N días hábiles hacia adelante" y "último día hábil en o antes de D" son
+búsquedas O(1). Las fechas del dashboard se memoizan por fecha ET.
+"""
+from array import array
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Callable, FrozenSet, Tuple, Union
 import pytz
 
-# Feriados bancarios EE.UU. 2026 (Lista Ajustada a "Empresa Operativa")
+TZ_ET = pytz.timezone('US/Eastern')
+
+MON, TUE, WED, THU, FRI, SAT, SUN = range(7)
+
+DateLike = Union[date, datetime]
+
+# --- 1. REGLAS DE FERIADOS ---
+
+def fixed(month: int, day: int) -> Callable[[int], date]:
+    """Feriado de fecha fija (ej: 25 de diciembre)."""
+    return lambda year: date(year, month, day)
+
+def nth_weekday(month: int, weekday: int, n: int) -> Callable[[int], date]:
+    """n-ésimo `weekday` del mes (ej: 4º jueves de noviembre)."""
+    def rule(year: int) -> date:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    return rule
+
+def last_weekday(month: int, weekday: int) -> Callable[[int], date]:
+    """Último `weekday` del mes (ej: último lunes de mayo)."""
+    def rule(year: int) -> date:
+        last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+        return last - timedelta(days=(last.weekday() - weekday) % 7)
+    return rule
+
+# Feriados bancarios EE.UU. (Lista Ajustada a "Empresa Operativa")
 # Comentamos los feriados federales menores donde la empresa SÍ trabaja.
-US_HOLIDAYS_2026 = {
-    (1, 1),   # New Year's Day
-    # (1, 19),  # Martin Luther King Jr. Day (Empresa trabaja)
-    # (2, 16),  # Washington's Birthday (Presidents' Day) (Empresa trabaja)
-    (5, 25),  # Memorial Day
-    # (6, 19),  # Juneteenth (Empresa trabaja)
-    (7, 4),   # Independence Day (Observed)
-    (9, 7),   # Labor Day
-    # (10, 12), # Columbus Day (Empresa trabaja)
-    # (11, 11), # Veterans Day (Empresa trabaja)
-    (11, 26), # Thanksgiving
-    (12, 25)  # Christmas
-}
+HOLIDAY_RULES: Tuple[Tuple[str, Callable[[int], date]], ...] = (
+    ("New Year's Day", fixed(1, 1)),
+    # ("Martin Luther King Jr. Day", nth_weekday(1, MON, 3)),   # Empresa trabaja
+    # ("Washington's Birthday", nth_weekday(2, MON, 3)),        # Empresa trabaja
+    ("Memorial Day", last_weekday(5, MON)),
+    # ("Juneteenth", fixed(6, 19)),                             # Empresa trabaja
+    ("Independence Day", fixed(7, 4)),
+    ("Labor Day", nth_weekday(9, MON, 1)),
+    # ("Columbus Day", nth_weekday(10, MON, 2)),                # Empresa trabaja
+    # ("Veterans Day", fixed(11, 11)),                          # Empresa trabaja
+    ("Thanksgiving", nth_weekday(11, THU, 4)),
+    ("Christmas", fixed(12, 25)),
+)
 
-TZ_ET = pytz.timezone('US/Eastern')
+def observed(day: date) -> date:
+    """Corrimiento bancario: domingo -> lunes; el sábado no se mueve."""
+    return day + timedelta(days=1) if day.weekday() == SUN else day
+
+@lru_cache(maxsize=64)
+def holidays(year: int) -> FrozenSet[date]:
+    """Feriados de `year`, ya observados (ninguna regla cae el 31/12: nada se corre de año)."""
+    return frozenset(observed(rule(year)) for _, rule in HOLIDAY_RULES)
+
+# --- 2. ORDINALES DE DÍAS HÁBILES POR AÑO ---
+
+class BusinessYear:
+    """
+    Días hábiles de un año:
+      upto[i]  = cuántos días hábiles hay desde el 1/1 hasta el día i (inclusive)
+      days[k]  = índice (día del año, base 0) del k-ésimo día hábil (base 0)
+    """
+    __slots__ = ("year", "start", "upto", "days")
 
-def is_holiday(date_obj) -> bool:
+    def __init__(self, year: int):
+        self.year = year
+        self.start = date(year, 1, 1)
+        closed = holidays(year)
+        self.upto = array("H")
+        self.days = array("H")
+        count = 0
+        for i in range((date(year + 1, 1, 1) - self.start).days):
+            day = self.start + timedelta(days=i)
+            if day.weekday() < SAT and day not in closed:
+                count += 1
+                self.days.append(i)
+            self.upto.append(count)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def nth(self, k: int) -> date:
+        """k-ésimo día hábil del año (base 1)."""
+        return self.start + timedelta(days=self.days[k - 1])
+
+@lru_cache(maxsize=64)
+def business_year(year: int) -> BusinessYear:
+    return BusinessYear(year)
+
+def _as_date(value: DateLike) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+def is_holiday(date_obj: DateLike) -> bool:
     """Verifica si una fecha es un feriado mayor (No Laborable)."""
-    return (date_obj.month, date_obj.day) in US_HOLIDAYS_2026
+    day = _as_date(date_obj)
+    return day in holidays(day.year)
 
-def is_business_day(date_obj) -> bool:
+def is_business_day(date_obj: DateLike) -> bool:
     """
     Retorna True si es un día apto para contar como hábil.
     Regla: Lunes a Viernes y NO es feriado mayor.
     """
-    # 0=Lunes ... 4=Viernes, 5=Sábado, 6=Domingo
-    if date_obj.weekday() >= 5: 
-        return False
-    if is_holiday(date_obj):
-        return False
-    return True
-
-def get_valid_start_date(date_obj):
+    day = _as_date(date_obj)
+    return day.weekday() < SAT and not is_holiday(day)
+
+def business_on_or_after(date_obj: DateLike) -> date:
+    """Primer día hábil en o después de la fecha."""
+    day = _as_date(date_obj)
+    year = business_year(day.year)
+    k = year.upto[(day - year.start).days]
+    if not is_business_day(day):
+        k += 1  # upto cuenta hasta el hábil anterior: el siguiente es k + 1
+    if k > len(year):
+        return business_year(day.year + 1).nth(1)
+    return year.nth(k)
+
+def business_on_or_before(date_obj: DateLike) -> date:
+    """Último día hábil en o antes de la fecha."""
+    day = _as_date(date_obj)
+    year = business_year(day.year)
+    k = year.upto[(day - year.start).days]
+    if k == 0:
+        previous = business_year(day.year - 1)
+        return previous.nth(len(previous))
+    return year.nth(k)
+
+def add_business_days(date_obj: DateLike, count: int) -> date:
+    """El día hábil `count` posiciones después (count >= 0) del primer hábil en o después de la fecha."""
+    start = business_on_or_after(date_obj)
+    year = business_year(start.year)
+    k = year.upto[(start - year.start).days] + count
+    while k > len(year):
+        k -= len(year)
+        year = business_year(year.year + 1)
+    return year.nth(k)
+
+# --- 3. FECHAS DE PAGO ---
+
+def get_valid_start_date(date_obj: DateLike) -> date:
     """
     Si 'hoy' es Sábado, Domingo o Feriado, busca el siguiente día hábil
     para empezar a contar desde ahí como 'Día 1'.
     """
-    current = date_obj
-    # Mientras NO sea día hábil, avanza al siguiente
-    while not is_business_day(current):
-        current += timedelta(days=1)
-    return current
+    return business_on_or_after(date_obj)
 
-def calculate_forward_date(start_date_raw, target_count: int):
+def calculate_forward_date(start_date_raw: DateLike, target_count: int) -> date:
     """
     Calcula fecha futura contando días hábiles.
     Lógica: El 'start_date' validado cuenta como el Día #1.
     """
-    # 1. Validar el día de inicio (Si hoy es sábado, empezamos a contar el lunes)
-    current_date = get_valid_start_date(start_date_raw)
-    
-    # Ya estamos en el Día 1.
-    days_counted = 1
-    
-    # 2. Bucle hasta llegar al objetivo (3 o 5)
-    while days_counted < target_count:
-        current_date += timedelta(days=1)
-        
-        if is_business_day(current_date):
-            days_counted += 1
-            
-    return current_date
-
-def calculate_max_submission_date(start_date, days_calendar=35):
+    return add_business_days(start_date_raw, target_count - 1)
+
+def calculate_max_submission_date(start_date: DateLike, days_calendar: int = 35) -> date:
     """
     35 Días Calendario.
     Si cae en fin de semana/feriado, RETROCEDE al último día hábil
     para asegurar que esté DENTRO del límite de 35 días.
     """
-    target_date = start_date + timedelta(days=days_calendar)
-    
-    while not is_business_day(target_date):
-        target_date -= timedelta(days=1)
-        
-    return target_date
-
-def get_workspace_dates():
-    """Genera las tres fechas clave para el Dashboard."""
-    now_et = datetime.now(TZ_ET)
-    
-    # 1. Pago Estándar (3 Business Days)
-    # Lógica: Hoy(1) -> Mañana(2) -> Pasado(3)
-    standard_date = calculate_forward_date(now_et, 3)
-    
-    # 2. Pago California (5 Business Days)
-    california_date = calculate_forward_date(now_et, 5)
-    
-    # 3. Fecha Límite (35 Días Calendario - Ajuste hacia atrás)
-    max_date = calculate_max_submission_date(now_et, 35)
-    
+    return business_on_or_before(_as_date(start_date) + timedelta(days=days_calendar))
+
+@lru_cache(maxsize=8)
+def workspace_dates_for(today_et: date) -> dict:
+    """Las tres fechas clave para un día ET (memoizadas: cambian una vez por día)."""
     return {
-        "standard": standard_date,
-        "california": california_date,
-        "max_date": max_date
-    }
\ No newline at end of file
+        # 1. Pago Estándar (3 Business Days): Hoy(1) -> Mañana(2) -> Pasado(3)
+        "standard": calculate_forward_date(today_et, 3),
+        # 2. Pago California (5 Business Days)
+        "california": calculate_forward_date(today_et, 5),
+        # 3. Fecha Límite (35 Días Calendario - Ajuste hacia atrás)
+        "max_date": calculate_max_submission_date(today_et, 35),
+    }
+
+def get_workspace_dates() -> dict:
+    """Genera las tres fechas clave para el Dashboard."""
+    return workspace_dates_for(datetime.now(TZ_ET).date())
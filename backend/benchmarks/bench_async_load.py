@@ -0,0 +1,108 @@
+"""
+Benchmark: rutas síncronas (threadpool + SessionLocal) vs async (AsyncSession).
+Lanza N requests concurrentes contra dos rutas equivalentes que esperan I/O en
+Postgres (SELECT pg_sleep) y mide throughput y latencias de cada modo.
+
+Uso (desde backend/, con DATABASE_URL apuntando a un Postgres de pruebas):
+    pip install -r benchmarks/requirements.txt   # httpx (además de requirements.txt)
+    python -m benchmarks.bench_async_load --concurrency 200 --sleep 0.2
+Ambos engines usan el mismo tamaño de pool (--pool), así la diferencia medida
+es el tope de hilos del threadpool de FastAPI (~40 por worker), no el pool.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.database import get_async_database_url
+
+def build_app(pool: int, sleep: float):
+    sync_engine = create_engine(settings.DATABASE_URL, pool_size=pool, max_overflow=0)
+    async_engine = create_async_engine(get_async_database_url(), pool_size=pool, max_overflow=0)
+    SyncSession = sessionmaker(bind=sync_engine)
+    AsyncSessionBench = async_sessionmaker(async_engine, class_=AsyncSession)
+
+    def get_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSessionBench() as db:
+            yield db
+
+    app = FastAPI()
+    query = text("SELECT pg_sleep(:s)")
+
+    @app.get("/sync")
+    def sync_route(db: Session = Depends(get_db)):
+        db.execute(query, {"s": sleep})
+        return {"ok": True}
+
+    @app.get("/async")
+    async def async_route(db: AsyncSession = Depends(get_async_db)):
+        await db.execute(query, {"s": sleep})
+        return {"ok": True}
+
+    return app, sync_engine, async_engine
+
+async def run_mode(client: httpx.AsyncClient, path: str, concurrency: int, total: int) -> dict:
+    latencies = []
+    queue = iter(range(total))
+
+    async def worker():
+        for _ in queue:
+            t0 = time.perf_counter()
+            r = await client.get(path)
+            r.raise_for_status()
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    return {
+        "req/s": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+async def main_async(args):
+    app, sync_engine, async_engine = build_app(args.pool, args.sleep)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Calentamiento: abre las conexiones de ambos pools
+        await run_mode(client, "/sync", args.pool, args.pool)
+        await run_mode(client, "/async", args.pool, args.pool)
+
+        for path in ("/sync", "/async"):
+            res = await run_mode(client, path, args.concurrency, args.requests)
+            print(f"{path:<7} {res['req/s']:8.1f} req/s   p50 {res['p50_ms']:7.1f} ms   p95 {res['p95_ms']:7.1f} ms")
+
+    sync_engine.dispose()
+    await async_engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--sleep", type=float, default=0.2, help="Latencia simulada de la BD (segundos)")
+    parser.add_argument("--pool", type=int, default=150, help="Conexiones por engine (<= max_connections)")
+    args = parser.parse_args()
+
+    print(f"concurrency={args.concurrency} requests={args.requests} "
+          f"sleep={args.sleep * 1000:.0f}ms pool={args.pool}")
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
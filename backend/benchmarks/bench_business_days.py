@@ -0,0 +1,104 @@
+"""
+Benchmark: fechas de pago del dashboard (app/utils/date_utils.py).
+Compara el cálculo día por día (cómo se hacía antes) contra los ordinales
+por año del calendario y contra get_workspace_dates memoizado.
+
+Antes de medir valida el motor contra una tabla de feriados conocidos de
+varios años (incluye corrimientos de domingo a lunes) y contra el cálculo
+día por día en todas las fechas del rango; sale con código 1 si algo difiere.
+
+Uso (desde backend/, no necesita BD):
+    python -m benchmarks.bench_business_days --years 2026-2035
+"""
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+
+from app.utils import date_utils
+
+# Feriados observados publicados por la Federal Reserve (solo los que la empresa no trabaja)
+KNOWN_HOLIDAYS = {
+    2026: ["2026-01-01", "2026-05-25", "2026-07-04", "2026-09-07", "2026-11-26", "2026-12-25"],
+    2027: ["2027-01-01", "2027-05-31", "2027-07-05", "2027-09-06", "2027-11-25", "2027-12-25"],
+    2028: ["2028-01-01", "2028-05-29", "2028-07-04", "2028-09-04", "2028-11-23", "2028-12-25"],
+    2029: ["2029-01-01", "2029-05-28", "2029-07-04", "2029-09-03", "2029-11-22", "2029-12-25"],
+    2030: ["2030-01-01", "2030-05-27", "2030-07-04", "2030-09-02", "2030-11-28", "2030-12-25"],
+    2033: ["2033-01-01", "2033-05-30", "2033-07-04", "2033-09-05", "2033-11-24", "2033-12-26"],
+    2034: ["2034-01-02", "2034-05-29", "2034-07-04", "2034-09-04", "2034-11-23", "2034-12-25"],
+}
+
+def stepping_forward(start: date, target: int) -> date:
+    """Versión anterior: avanza de a un día."""
+    current = start
+    while not date_utils.is_business_day(current):
+        current += timedelta(days=1)
+    counted = 1
+    while counted < target:
+        current += timedelta(days=1)
+        if date_utils.is_business_day(current):
+            counted += 1
+    return current
+
+def stepping_max(start: date, days: int = 35) -> date:
+    current = start + timedelta(days=days)
+    while not date_utils.is_business_day(current):
+        current -= timedelta(days=1)
+    return current
+
+def check(first: int, last: int) -> int:
+    errors = 0
+    for year, expected in KNOWN_HOLIDAYS.items():
+        got = sorted(d.isoformat() for d in date_utils.holidays(year))
+        if got != expected:
+            print(f"❌ {year}: {got} != {expected}")
+            errors += 1
+    day = date(first, 1, 1)
+    while day.year <= last:
+        for target in (3, 5):
+            if date_utils.calculate_forward_date(day, target) != stepping_forward(day, target):
+                print(f"❌ {day} +{target} hábiles")
+                errors += 1
+        if date_utils.calculate_max_submission_date(day) != stepping_max(day):
+            print(f"❌ {day} límite 35 días")
+            errors += 1
+        day += timedelta(days=1)
+    return errors
+
+def timed(fn, days) -> float:
+    t0 = time.perf_counter()
+    for day in days:
+        fn(day)
+    return (time.perf_counter() - t0) / len(days) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", default="2026-2035", help="Rango de años (ej: 2026-2035)")
+    args = parser.parse_args()
+    first, last = (int(y) for y in args.years.split("-"))
+
+    errors = check(first, last)
+    print(f"validación {first}-{last}: {'OK' if not errors else f'{errors} diferencias'}")
+    if errors:
+        sys.exit(1)
+
+    days = [date(first, 1, 1) + timedelta(days=i) for i in range((date(last + 1, 1, 1) - date(first, 1, 1)).days)]
+    rows = (
+        ("día por día", lambda d: (stepping_forward(d, 3), stepping_forward(d, 5), stepping_max(d))),
+        ("ordinales", lambda d: (date_utils.calculate_forward_date(d, 3), date_utils.calculate_forward_date(d, 5),
+                                 date_utils.calculate_max_submission_date(d))),
+        ("memoizado", date_utils.workspace_dates_for),
+    )
+    print(f"{'cálculo':<14} {'µs por fecha':>13}")
+    for label, fn in rows:
+        if label == "memoizado":
+            # Caso real: muchas requests por día ET, una sola fecha
+            today = days[len(days) // 2]
+            fn(today)
+            us = timed(fn, [today] * len(days))
+        else:
+            us = timed(fn, days)
+        print(f"{label:<14} {us:>13.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: POST /logs/ con un commit por nota vs group commit (log_writer).
+Lanza --clients tareas concurrentes que guardan --notes notas cada una y mide
+filas/seg y latencia por nota (p50/p95) en los dos modos.
+
+Uso (desde backend/, con DATABASE_URL apuntando a un Postgres de pruebas):
+    python -m benchmarks.bench_group_commit --clients 50 --notes 40
+Las filas quedan commiteadas (es lo que se mide): se borran al final.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+import pytz
+from sqlalchemy import delete
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.crud import crud_log
+from app.models import models
+from app.schemas import schemas
+from app.services.log_writer import GroupCommitWriter
+
+AGENT = "bench_group_commit"
+
+def make_item(i: int) -> schemas.LogCreate:
+    return schemas.LogCreate(
+        customer=f"Customer {i}", cordoba_id=str(100000 + i), result="Completed",
+        comments=f"Nota de prueba {i}", affiliate="Affiliate", info_until="Stage 1", client_language="EN",
+    )
+
+async def save_direct(user_id: int, item: schemas.LogCreate) -> None:
+    """Un commit por nota, como create_log sin group commit."""
+    row = crud_log.build_log_row(item, AGENT, user_id, datetime.now(pytz.utc))
+    async with AsyncSessionLocal() as db:
+        await db.run_sync(crud_log.insert_log_rows, [row])
+        await db.commit()
+
+async def run(label: str, save, user_id: int, clients: int, notes: int) -> None:
+    latencies = []
+
+    async def client(c: int):
+        for n in range(notes):
+            t0 = time.perf_counter()
+            await save(user_id, make_item(c * notes + n))
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in range(clients)))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    total = clients * notes
+    print(f"{label:<16} {total / elapsed:>8,.0f} filas/s   "
+          f"p50 {latencies[len(latencies) // 2]:6.1f} ms   p95 {latencies[int(len(latencies) * 0.95)]:6.1f} ms")
+
+async def main_async(args):
+    async with AsyncSessionLocal() as db:
+        user = models.User(username=AGENT, name="Bench", password="x", role="Agent")
+        db.add(user)
+        await db.commit()
+        user_id = user.id
+
+    writer = GroupCommitWriter(max_rows=args.max_rows, max_wait_ms=args.max_wait_ms)
+
+    async def save_grouped(uid: int, item: schemas.LogCreate) -> None:
+        await writer.submit(crud_log.build_log_row(item, AGENT, uid, datetime.now(pytz.utc)))
+
+    try:
+        await run("commit por nota", save_direct, user_id, args.clients, args.notes)
+        await run("group commit", save_grouped, user_id, args.clients, args.notes)
+        await writer.stop()
+        stats = writer.stats()
+        print(f"lotes: {stats['flushes']}   tamaño medio {stats['flush_size_avg']}   "
+              f"commit p95 {stats['commit_p95_ms']} ms")
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(models.Log).where(models.Log.user_id == user_id))
+            await db.execute(delete(models.AgentDailyStat).where(models.AgentDailyStat.user_id == user_id))
+            await db.execute(delete(models.User).where(models.User.id == user_id))
+            await db.commit()
+        await async_engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50, help="Agentes guardando en paralelo")
+    parser.add_argument("--notes", type=int, default=40, help="Notas por agente")
+    parser.add_argument("--max-rows", type=int, default=100)
+    parser.add_argument("--max-wait-ms", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: carga de notas fila por fila (como POST /logs/) vs en lote
+(crud_log.create_audit_logs_bulk, usado por POST /logs/batch), en filas/seg.
+Usa el engine async (asyncpg) igual que las rutas.
+
+Uso (desde backend/, con DATABASE_URL apuntando a un Postgres de pruebas):
+    python -m benchmarks.bench_log_batch --batch 1000 --batches 20
+Todo corre dentro de una transacción que se revierte al final.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+import pytz
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.crud import crud_log, crud_stats
+from app.models import models
+from app.schemas import schemas
+
+def make_items(n: int, offset: int = 0) -> list:
+    return [
+        schemas.LogCreate(
+            customer=f"Customer {offset + i}", cordoba_id=str(100000 + offset + i),
+            result="Completed" if i % 3 == 0 else "Not Completed",
+            comments=f"Cliente pagó con tarjeta 4111111111111111 nota {i}",
+            affiliate=f"Affiliate {i % 12}", info_until=f"Stage {i % 7}", client_language="EN",
+        )
+        for i in range(n)
+    ]
+
+def insert_one(db, log_in: schemas.LogCreate, user: models.User) -> None:
+    """Lo mismo que hace POST /logs/ por cada nota (sin el commit)."""
+    log = models.Log(
+        user_id=user.id, agent=user.username, customer=log_in.customer,
+        cordoba_id=log_in.cordoba_id, result=log_in.result,
+        comments=crud_log.redact_comments(log_in.comments), affiliate=log_in.affiliate,
+        info_until=log_in.info_until, client_language=log_in.client_language,
+        transfer_status=log_in.transfer_status, created_at=datetime.now(pytz.utc),
+    )
+    db.add(log)
+    crud_stats.record_log(db, log)
+
+async def main_async(args):
+    async with AsyncSessionLocal() as db:
+        try:
+            user = models.User(username="bench_batch", name="Bench", password="x", role="Agent")
+            db.add(user)
+            await db.flush()
+
+            single = make_items(args.single)
+            t0 = time.perf_counter()
+            for item in single:
+                await db.run_sync(insert_one, item, user)
+                await db.flush()
+            elapsed = time.perf_counter() - t0
+            print(f"fila por fila  {args.single / elapsed:>10,.0f} filas/s   ({args.single} filas)")
+
+            total = args.batch * args.batches
+            batches = [make_items(args.batch, offset=i * args.batch) for i in range(args.batches)]
+            t0 = time.perf_counter()
+            for items in batches:
+                await db.run_sync(crud_log.create_audit_logs_bulk, items, user.username, user.id)
+            elapsed = time.perf_counter() - t0
+            print(f"en lote        {total / elapsed:>10,.0f} filas/s   ({args.batches} lotes de {args.batch})")
+
+            count = len((await db.execute(select(models.Log.id).where(models.Log.user_id == user.id))).all())
+            assert count == args.single + total, "No se insertaron todas las filas"
+        finally:
+            await db.rollback()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--batches", type=int, default=20)
+    parser.add_argument("--single", type=int, default=1000, help="Filas para el modo fila por fila")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: paginación de Logs con cursor keyset (crud_log.browse_logs) vs OFFSET.
+Mide la latencia de la página 1, 10, 100 y 1.000 (--limit filas por página)
+sin filtros y filtrando por resultado.
+
+Uso (desde backend/, con DATABASE_URL apuntando a un Postgres de pruebas):
+    python -m benchmarks.bench_log_browse --rows 1000000 --limit 50
+Los datos sintéticos se insertan dentro de una transacción que se revierte al final.
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.core.database import engine
+from app.crud import crud_log
+from app.models import models
+from app.schemas import schemas
+
+PAGES = (1, 10, 100, 1000)
+
+def seed(db: Session, rows: int, days: int) -> None:
+    db.execute(text("""
+        INSERT INTO "Logs" (created_at, agent, customer, cordoba_id, result, affiliate, info_until, client_language)
+        SELECT now() - make_interval(secs => (g * 7) % (:days * 86400)),
+               'bench_' || (g % 50), 'Customer ' || g, (100000 + g)::text,
+               CASE WHEN g % 3 = 0 THEN 'Completed' ELSE 'Not Completed' END,
+               'Affiliate ' || (g % 12), 'Stage ' || (g % 7), 'EN'
+        FROM generate_series(1, :rows) AS g
+    """), {"rows": rows, "days": days})
+    db.execute(text('ANALYZE "Logs"'))
+
+def offset_page(db: Session, filters: schemas.LogBrowseFilters, page: int) -> list:
+    log = models.Log
+    query = select(log).order_by(log.created_at.desc(), log.id.desc())
+    if filters.result:
+        query = query.where(log.result == filters.result)
+    return db.scalars(query.offset((page - 1) * filters.limit).limit(filters.limit)).all()
+
+def keyset_cursors(db: Session, filters: schemas.LogBrowseFilters) -> dict:
+    """Recorre las páginas una vez para obtener el cursor de entrada de cada página medida."""
+    cursors, cursor = {1: None}, None
+    for page in range(2, max(PAGES) + 1):
+        cursor = crud_log.browse_logs(db, filters.model_copy(update={"cursor": cursor})).next_cursor
+        if cursor is None:
+            break
+        cursors[page] = cursor
+    return cursors
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=60, help="Días que abarcan los datos sintéticos")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        trans = conn.begin()
+        db = Session(bind=conn)
+        try:
+            t0 = time.perf_counter()
+            seed(db, args.rows, args.days)
+            print(f"seed: {args.rows:,} filas en {time.perf_counter() - t0:.1f} s")
+            print(f"{'filtro':<12} {'página':>7} {'keyset ms':>10} {'OFFSET ms':>10}")
+            for label, result in (("ninguno", None), ("resultado", "Completed")):
+                filters = schemas.LogBrowseFilters(result=result, limit=args.limit)
+                cursors = keyset_cursors(db, filters)
+                for page in PAGES:
+                    if page not in cursors:
+                        continue
+                    paged = filters.model_copy(update={"cursor": cursors[page]})
+                    keyset_ms = timed(lambda: crud_log.browse_logs(db, paged), args.repeat)
+                    offset_ms = timed(lambda: offset_page(db, filters, page), args.repeat)
+                    print(f"{label:<12} {page:>7} {keyset_ms:>10.2f} {offset_ms:>10.2f}")
+        finally:
+            db.close()
+            trans.rollback()
+
+if __name__ == "__main__":
+    main()
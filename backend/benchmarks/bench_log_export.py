@@ -0,0 +1,74 @@
+"""
+Benchmark: exportación cruda de Logs (CSV / NDJSON, con y sin gzip) en filas/seg.
+Mide log_export.iter_export completo: cursor del servidor + serialización + gzip.
+
+Uso (desde backend/, con DATABASE_URL apuntando a un Postgres de pruebas):
+    python -m benchmarks.bench_log_export --rows 2000000
+Los datos sintéticos se insertan dentro de una transacción que se revierte al final.
+"""
+import argparse
+import resource
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.database import engine
+from app.schemas import schemas
+from app.services import log_export
+
+def seed(db: Session, rows: int, days: int) -> None:
+    # generate_series: millones de filas en segundos, sin pasar por Python
+    db.execute(text("""
+        INSERT INTO "Logs" (created_at, agent, customer, cordoba_id, result, comments,
+                            affiliate, info_until, client_language, transfer_status)
+        SELECT now() - make_interval(secs => (g % (:days * 86400))),
+               'bench_' || (g % 50), 'Customer ' || g, (100000 + g)::text,
+               CASE WHEN g % 3 = 0 THEN 'Completed' ELSE 'Not Completed' END,
+               'Comentario de prueba con "comillas", comas y acentos: ñandú ' || g,
+               'Affiliate ' || (g % 12), 'Stage ' || (g % 7),
+               CASE WHEN g % 4 = 0 THEN 'ES' ELSE 'EN' END, NULL
+        FROM generate_series(1, :rows) AS g
+    """), {"rows": rows, "days": days})
+
+def run(db: Session, filters, fmt: str, gzip: bool, rows: int) -> None:
+    t0 = time.perf_counter()
+    size = 0
+    for part in log_export.iter_export(db, filters, fmt, gzip=gzip):
+        size += len(part)
+    elapsed = time.perf_counter() - t0
+    label = f"{fmt}{'+gzip' if gzip else ''}"
+    print(f"{label:<12} {rows / elapsed:>12,.0f} filas/s   {elapsed:6.1f} s   {size / 2**20:8.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--days", type=int, default=90, help="Días que abarcan los datos sintéticos")
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        trans = conn.begin()
+        db = Session(bind=conn)
+        try:
+            t0 = time.perf_counter()
+            seed(db, args.rows, args.days)
+            print(f"seed: {args.rows:,} filas en {time.perf_counter() - t0:.1f} s")
+
+            today = date.today()
+            filters = schemas.LogExportFilters(
+                start_date=today - timedelta(days=args.days + 1), end_date=today + timedelta(days=1),
+                target_agent="TODOS (Global)",
+            )
+            total = db.execute(text('SELECT count(*) FROM "Logs" WHERE created_at >= :s'),
+                               {"s": filters.start_date}).scalar()
+            for fmt in (log_export.FORMAT_CSV, log_export.FORMAT_NDJSON):
+                for gzip in (False, True):
+                    run(db, filters, fmt, gzip, total)
+            print(f"RSS máximo del proceso: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+        finally:
+            db.close()
+            trans.rollback()
+
+if __name__ == "__main__":
+    main()
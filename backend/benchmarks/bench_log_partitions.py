@@ -0,0 +1,125 @@
+"""
+Benchmark: latencia de las consultas por ventana de tiempo sobre Logs a medida
+que crece el histórico, tabla normal vs particionada por mes.
+Crea dos copias vacías de Logs (mismas columnas e índices), les agrega meses de
+historia por etapas y mide en cada etapa:
+  - reporte de un día (COUNT con rango de created_at, como report_filters)
+  - reporte de un mes de un agente
+  - resumen de un mes completo (GROUP BY agente/resultado, como el reporte Estratégico)
+  - historial del agente (ORDER BY created_at DESC LIMIT 15), sin límite de fecha
+    y con la ventana de 31 días que usa /logs/history
+
+Uso (desde backend/, con DATABASE_URL apuntando a un Postgres de pruebas):
+    python -m benchmarks.bench_log_partitions --rows-per-month 50000 --months 6,12,24,48
+Todo corre dentro de una transacción que se revierte al final.
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import pytz
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.database import engine
+from app.services import log_partitions
+
+PLAIN = "bench_logs_plain"
+PARTITIONED = "bench_logs_part"
+INDEXES = (("created_at",), ("agent", "created_at"), ("user_id", "created_at"))
+
+def create_tables(db: Session) -> None:
+    db.execute(text(f'CREATE TABLE "{PLAIN}" (LIKE "Logs" INCLUDING DEFAULTS)'))
+    db.execute(text(
+        f'CREATE TABLE "{PARTITIONED}" (LIKE "Logs" INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)'
+    ))
+    for table in (PLAIN, PARTITIONED):
+        for cols in INDEXES:
+            db.execute(text(f'CREATE INDEX ON "{table}" ({", ".join(cols)})'))
+
+def add_history(db: Session, first_month, last_month, rows_per_month: int) -> None:
+    """Agrega los meses [first_month, last_month) a las dos tablas."""
+    month = first_month
+    while month < last_month:
+        log_partitions.create_partition(db, month, parent=PARTITIONED)
+        for table in (PLAIN, PARTITIONED):
+            db.execute(text(f"""
+                INSERT INTO "{table}" (id, created_at, user_id, agent, customer, cordoba_id, result)
+                SELECT g, CAST(:start AS timestamptz) + (g % :rows) * (interval '27 days' / :rows),
+                       g % 50, 'bench_' || (g % 50), 'Customer ' || g, (100000 + g)::text,
+                       CASE WHEN g % 3 = 0 THEN 'Completed' ELSE 'Not Completed' END
+                FROM generate_series(1, :rows) AS g
+            """), {"start": f"{month.isoformat()} 00:00:00+00", "rows": rows_per_month})
+        month = log_partitions.add_months(month, 1)
+    for table in (PLAIN, PARTITIONED):
+        db.execute(text(f'ANALYZE "{table}"'))
+
+def timed(db: Session, sql: str, params: dict, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        db.execute(text(sql), params).all()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+def run_queries(db: Session, newest_month, repeat: int) -> dict:
+    day = datetime.combine(newest_month + timedelta(days=10), datetime.min.time()).replace(tzinfo=pytz.utc)
+    month_start = datetime.combine(newest_month, datetime.min.time()).replace(tzinfo=pytz.utc)
+    queries = {
+        "reporte 1 día": (
+            'SELECT count(*) FROM "{t}" WHERE created_at >= :s AND created_at < :e',
+            {"s": day, "e": day + timedelta(days=1)},
+        ),
+        "reporte 1 mes/agente": (
+            'SELECT count(*) FROM "{t}" WHERE created_at >= :s AND created_at < :e AND agent = :a',
+            {"s": month_start, "e": month_start + timedelta(days=31), "a": "bench_7"},
+        ),
+        "resumen 1 mes": (
+            'SELECT agent, result, count(*) FROM "{t}" WHERE created_at >= :s AND created_at < :e GROUP BY 1, 2',
+            {"s": month_start, "e": month_start + timedelta(days=31)},
+        ),
+        "historial sin límite": (
+            'SELECT * FROM "{t}" WHERE agent = :a ORDER BY created_at DESC LIMIT 15',
+            {"a": "bench_7"},
+        ),
+        "historial 31 días": (
+            'SELECT * FROM "{t}" WHERE agent = :a AND created_at >= :s ORDER BY created_at DESC LIMIT 15',
+            {"a": "bench_7", "s": day - timedelta(days=31)},
+        ),
+    }
+    return {
+        name: (timed(db, sql.format(t=PLAIN), params, repeat), timed(db, sql.format(t=PARTITIONED), params, repeat))
+        for name, (sql, params) in queries.items()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows-per-month", type=int, default=50_000)
+    parser.add_argument("--months", default="6,12,24,48", help="Meses de historia en cada etapa")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    stages = sorted(int(m) for m in args.months.split(","))
+
+    newest = log_partitions.month_start(datetime.now(pytz.utc))
+    with engine.connect() as conn:
+        trans = conn.begin()
+        db = Session(bind=conn)
+        try:
+            create_tables(db)
+            loaded = 0
+            print(f"{'meses':>5}  {'consulta':<22} {'normal ms':>10} {'particionada ms':>16}")
+            for months in stages:
+                # La historia crece hacia atrás: el mes más nuevo es siempre el actual
+                first = log_partitions.add_months(newest, -(months - 1))
+                stop = log_partitions.add_months(newest, -(loaded - 1)) if loaded else log_partitions.add_months(newest, 1)
+                add_history(db, first, stop, args.rows_per_month)
+                loaded = months
+                for name, (plain_ms, part_ms) in run_queries(db, newest, args.repeat).items():
+                    print(f"{months:>5}  {name:<22} {plain_ms:>10.2f} {part_ms:>16.2f}")
+        finally:
+            db.close()
+            trans.rollback()
+
+if __name__ == "__main__":
+    main()
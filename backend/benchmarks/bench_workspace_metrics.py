@@ -0,0 +1,116 @@
+"""
+Benchmark: KPIs del dashboard (/workspace/information).
+Compara la implementación anterior (3 x calculate_metrics = 6 COUNT sobre Logs)
+contra metrics.get_performance (1 consulta SUM(...) FILTER sobre Agent_Daily_Stats).
+
+Uso (desde backend/, con DATABASE_URL apuntando a un Postgres de pruebas):
+    python -m benchmarks.bench_workspace_metrics --rows 200000 --repeat 50
+Los datos sintéticos se insertan dentro de una transacción que se revierte al final.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import pytz
+from sqlalchemy import event, insert, not_
+from sqlalchemy.orm import Session
+
+from app.core.database import engine
+from app.crud import crud_stats
+from app.models import models
+from app.services import metrics
+
+def legacy_calculate_metrics(db: Session, user_id: int, start_date_utc: datetime):
+    """Implementación previa de workspace.calculate_metrics (2 COUNT por periodo)."""
+    total = db.query(models.Log).filter(
+        models.Log.user_id == user_id,
+        models.Log.created_at >= start_date_utc
+    ).count()
+    completed = db.query(models.Log).filter(
+        models.Log.user_id == user_id,
+        models.Log.created_at >= start_date_utc,
+        models.Log.result.ilike("%Completed%"),
+        not_(models.Log.result.ilike("%Not%"))
+    ).count()
+    return metrics.build_metrics_set(total, completed)
+
+def legacy_performance(db: Session, user_id: int):
+    starts = metrics.get_period_starts_utc()
+    return [legacy_calculate_metrics(db, user_id, starts[p]) for p in ("today", "week", "month")]
+
+def seed(db: Session, rows: int, agents: int) -> int:
+    user_ids = []
+    for i in range(agents):
+        u = models.User(username=f"bench_{i}", name=f"Bench {i}", password="x", role="Agent")
+        db.add(u)
+        db.flush()
+        user_ids.append(u.id)
+
+    now = datetime.now(pytz.utc)
+    rnd = random.Random(42)
+    batch = []
+    for n in range(rows):
+        uid = rnd.choice(user_ids)
+        batch.append({
+            "user_id": uid, "agent": f"bench_{user_ids.index(uid)}",
+            "created_at": now - timedelta(minutes=rnd.randint(0, 60 * 24 * 90)),
+            "result": rnd.choice(["Completed", "Not Completed", "Callback"]),
+            "cordoba_id": str(n), "customer": "x", "affiliate": "x",
+            "info_until": "x", "client_language": "EN",
+        })
+        if len(batch) == 10000:
+            db.execute(insert(models.Log), batch)
+            batch = []
+    if batch:
+        db.execute(insert(models.Log), batch)
+    db.connection().exec_driver_sql('ANALYZE "Logs"')
+    return user_ids[0]
+
+def measure(label, fn, repeat, counter):
+    timings = []
+    counter["n"] = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    trips = counter["n"] / repeat
+    print(f"{label:<28} round trips/req: {trips:>4.1f}   "
+          f"p50: {statistics.median(timings):7.2f} ms   "
+          f"p95: {sorted(timings)[int(len(timings) * 0.95) - 1]:7.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--agents", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    counter = {"n": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(*_):
+        counter["n"] += 1
+
+    with engine.connect() as conn:
+        trans = conn.begin()
+        db = Session(bind=conn)
+        try:
+            print(f"Sembrando {args.rows} logs para {args.agents} agentes...")
+            user_id = seed(db, args.rows, args.agents)
+            crud_stats.backfill(db)
+
+            # Ambos caminos deben devolver exactamente los mismos números
+            old = legacy_performance(db, user_id)
+            new = metrics.get_performance(db, user_id)
+            assert old == [new.today, new.this_week, new.this_month], (old, new)
+
+            measure("antes (6 x COUNT)", lambda: legacy_performance(db, user_id), args.repeat, counter)
+            measure("después (1 x rollup)", lambda: metrics.get_performance(db, user_id), args.repeat, counter)
+        finally:
+            db.close()
+            trans.rollback()
+
+if __name__ == "__main__":
+    main()
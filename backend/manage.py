@@ -0,0 +1,135 @@
+"""
+Comandos de mantenimiento (se ejecutan aparte del servidor, desde backend/).
+
+    python manage.py check-indexes [--db]
+    python manage.py backfill-stats [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+    python manage.py ensure-partitions [--ahead N]
+    python manage.py partition-logs
+    python manage.py archive-logs [--dry-run | --init-volume]
+"""
+import argparse
+import sys
+from datetime import date
+
+def check_indexes(args):
+    from app.models import hot_queries
+    return hot_queries.main(use_database=args.db)
+
+def backfill_stats(args):
+    from app.core.database import SessionLocal
+    from app.crud import crud_stats
+    from app.services import log_archive
+    # Los días archivados ya no están en Logs: recalcularlos borraría su rollup
+    first_hot = log_archive.first_hot_date()
+    if first_hot and (args.start is None or args.start < first_hot):
+        print(f"ℹ️  Días anteriores a {first_hot} están archivados: se reconstruye desde {first_hot}.")
+        args.start = first_hot
+    db = SessionLocal()
+    try:
+        rows = crud_stats.backfill(db, start=args.start, end=args.end)
+    finally:
+        db.close()
+    print(f"✅ Agent_Daily_Stats reconstruido: {rows} filas.")
+    return 0
+
+def ensure_partitions(args):
+    from app.core.config import settings
+    from app.core.database import SessionLocal
+    from app.services import log_partitions
+    ahead = settings.LOG_PARTITION_MONTHS_AHEAD if args.ahead is None else args.ahead
+    db = SessionLocal()
+    try:
+        if not log_partitions.is_partitioned(db):
+            print("❌ Logs no está particionada (correr `python manage.py partition-logs`).")
+            return 1
+        created = log_partitions.ensure_partitions(db, ahead)
+        db.commit()
+        for part in log_partitions.list_partitions(db):
+            print(f"  {part['name']:<18} {part['estimated_rows']:>12,} filas aprox.  {part['bounds']}")
+    finally:
+        db.close()
+    print(f"✅ Particiones creadas: {', '.join(created) if created else 'ninguna (ya existían)'}")
+    return 0
+
+def partition_logs(args):
+    from app.core.config import settings
+    from app.core.database import SessionLocal
+    from app.services import log_partitions
+    db = SessionLocal()
+    try:
+        if log_partitions.is_partitioned(db):
+            print("✅ Logs ya está particionada.")
+            return 0
+        rows = log_partitions.partition_existing(db, settings.LOG_PARTITION_MONTHS_AHEAD)
+        db.commit()
+    except RuntimeError as e:
+        db.rollback()
+        print(f"❌ {e}")
+        return 1
+    finally:
+        db.close()
+    print(f"✅ Logs particionada: {rows:,} filas copiadas.")
+    return 0
+
+def archive_logs(args):
+    from app.core.database import SessionLocal
+    from app.services import log_archive
+    if args.init_volume:
+        print(f"✅ Volumen de archivo marcado: {log_archive.init_volume()}")
+        return 0
+    db = SessionLocal()
+    try:
+        months = log_archive.archivable_months(db)
+        if not months:
+            print("✅ No hay meses para archivar.")
+            return 0
+        for month in months:
+            key = log_archive.month_key(month)
+            if args.dry_run:
+                print(f"  {key}: se archivaría")
+                continue
+            entry = log_archive.archive_month(db, month)
+            print(f"  {key}: {entry['rows']:,} filas → {entry['file']} ({entry['bytes'] / 2**20:.1f} MB)")
+    except log_archive.ArchiveError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        db.close()
+    print(f"✅ {len(months)} meses {'para archivar' if args.dry_run else 'archivados'} en {log_archive.manifest.directory}")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Cordoba Pro - mantenimiento")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("check-indexes", help="Falla si una consulta caliente no tiene índice")
+    p.add_argument("--db", action="store_true", help="Validar contra la BD real")
+    p.set_defaults(func=check_indexes)
+
+    p = sub.add_parser("backfill-stats", help="Reconstruye el rollup diario desde Logs")
+    p.add_argument("--from", dest="start", type=date.fromisoformat, default=None)
+    p.add_argument("--to", dest="end", type=date.fromisoformat, default=None)
+    p.set_defaults(func=backfill_stats)
+
+    p = sub.add_parser("ensure-partitions", help="Crea por adelantado las particiones mensuales de Logs")
+    p.add_argument("--ahead", type=int, default=None, help="Meses futuros (default: LOG_PARTITION_MONTHS_AHEAD)")
+    p.set_defaults(func=ensure_partitions)
+
+    p = sub.add_parser("partition-logs",
+                       help="Reconstruye Logs particionada por mes (bloquea Logs: ventana de mantenimiento)")
+    p.set_defaults(func=partition_logs)
+
+    p = sub.add_parser("archive-logs", help="Mueve los meses viejos de Logs al archivo frío (Parquet)")
+    p.add_argument("--dry-run", action="store_true", help="Solo listar los meses")
+    p.add_argument("--init-volume", action="store_true",
+                   help="Marcar LOG_ARCHIVE_DIR como volumen persistente (una vez, con el volumen montado)")
+    p.set_defaults(func=archive_logs)
+
+    args = parser.parse_args()
+    # Backfill, particionado y archivo recorren meses enteros: sin el statement_timeout de la API
+    from app.core.database import set_statement_timeout
+    set_statement_timeout(0)
+    sys.exit(args.func(args))
+
+if __name__ == "__main__":
+    main()
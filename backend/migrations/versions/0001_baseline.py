@@ -0,0 +1,99 @@
+"""Esquema base (equivalente al antiguo Base.metadata.create_all)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _missing(table: str) -> bool:
+    # Las BD existentes ya tienen estas tablas (creadas por create_all): no las tocamos
+    return not sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade() -> None:
+    if _missing("Users"):
+        op.create_table(
+            "Users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("username", sa.String(), nullable=False),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("password", sa.String(), nullable=False),
+            sa.Column("role", sa.String()),
+            sa.Column("active", sa.Boolean()),
+        )
+        op.create_index("ix_Users_id", "Users", ["id"])
+        op.create_index("ix_Users_username", "Users", ["username"], unique=True)
+
+    if _missing("Logs"):
+        op.create_table(
+            "Logs",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("created_at", sa.DateTime(timezone=True)),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("Users.id")),
+            sa.Column("agent", sa.String()),
+            sa.Column("customer", sa.String()),
+            sa.Column("cordoba_id", sa.String()),
+            sa.Column("result", sa.String()),
+            sa.Column("comments", sa.Text()),
+            sa.Column("affiliate", sa.String()),
+            sa.Column("info_until", sa.String()),
+            sa.Column("client_language", sa.String()),
+            sa.Column("transfer_status", sa.String()),
+        )
+        op.create_index("ix_Logs_id", "Logs", ["id"])
+        op.create_index("ix_Logs_cordoba_id", "Logs", ["cordoba_id"])
+
+    if _missing("Creditors"):
+        op.create_table(
+            "Creditors",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("abreviation", sa.String()),
+        )
+        op.create_index("ix_Creditors_id", "Creditors", ["id"])
+        op.create_index("ix_Creditors_abreviation", "Creditors", ["abreviation"])
+
+    if _missing("Search_Misses"):
+        op.create_table(
+            "Search_Misses",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("abreviation", sa.String()),
+            sa.Column("cordoba_id", sa.String()),
+            sa.Column("created_at", sa.DateTime()),
+        )
+        op.create_index("ix_Search_Misses_id", "Search_Misses", ["id"])
+
+    if _missing("Updates"):
+        op.create_table(
+            "Updates",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("date", sa.String()),
+            sa.Column("title", sa.String()),
+            sa.Column("message", sa.Text()),
+            sa.Column("category", sa.String()),
+            sa.Column("active", sa.Boolean()),
+        )
+        op.create_index("ix_Updates_id", "Updates", ["id"])
+
+    if _missing("Updates_Reads"):
+        op.create_table(
+            "Updates_Reads",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("update_id", sa.Integer(), sa.ForeignKey("Updates.id")),
+            sa.Column("username", sa.String()),
+            sa.Column("read_at", sa.DateTime()),
+        )
+        op.create_index("ix_Updates_Reads_id", "Updates_Reads", ["id"])
+
+
+def downgrade() -> None:
+    for table in ("Updates_Reads", "Updates", "Search_Misses", "Creditors", "Logs", "Users"):
+        op.drop_table(table)
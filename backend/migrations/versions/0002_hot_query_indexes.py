@@ -0,0 +1,46 @@
+"""Índices para las consultas calientes (KPIs, historial, reportes, búsqueda)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+COMPLETED_PREDICATE = "result ILIKE '%Completed%' AND result NOT ILIKE '%Not%'"
+
+
+def upgrade() -> None:
+    is_pg = op.get_bind().dialect.name == "postgresql"
+    # CONCURRENTLY evita bloquear las escrituras en Logs mientras se construyen
+    # los índices; en Postgres debe ejecutarse fuera de la transacción.
+    with op.get_context().autocommit_block():
+        op.create_index("ix_logs_user_created", "Logs", ["user_id", "created_at"],
+                        if_not_exists=True, postgresql_concurrently=True)
+        op.create_index("ix_logs_user_created_completed", "Logs", ["user_id", "created_at"],
+                        postgresql_where=sa.text(COMPLETED_PREDICATE),
+                        if_not_exists=True, postgresql_concurrently=True)
+        op.create_index("ix_logs_agent_created", "Logs", ["agent", "created_at"],
+                        if_not_exists=True, postgresql_concurrently=True)
+        op.create_index("ix_logs_created_at", "Logs", ["created_at"],
+                        if_not_exists=True, postgresql_concurrently=True)
+
+        if is_pg:
+            op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for col in ("name", "abreviation"):
+            op.create_index(f"ix_creditors_{col}_trgm", "Creditors", [col],
+                            postgresql_using="gin", postgresql_ops={col: "gin_trgm_ops"},
+                            if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    for name in ("ix_creditors_abreviation_trgm", "ix_creditors_name_trgm"):
+        op.drop_index(name, table_name="Creditors", if_exists=True)
+    for name in ("ix_logs_created_at", "ix_logs_agent_created",
+                 "ix_logs_user_created_completed", "ix_logs_user_created"):
+        op.drop_index(name, table_name="Logs", if_exists=True)
@@ -0,0 +1,44 @@
+"""Rollup diario por agente (Agent_Daily_Stats)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+Crea el rollup y lo llena desde Logs con el mismo INSERT ... SELECT que
+`python manage.py backfill-stats`: los KPIs, /admin/stats y el reporte
+Estratégico leen solo de acá, y el contenedor aplica las migraciones al
+arrancar (una tabla vacía mostraría todo en 0). Los logs sin user_id no
+entran al rollup.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.crud import crud_stats
+from app.models import models
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "Agent_Daily_Stats",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("Users.id"), nullable=False),
+        sa.Column("business_date", sa.Date(), nullable=False),
+        sa.Column("result_class", sa.String(), nullable=False),
+        sa.Column("affiliate", sa.String(), nullable=False, server_default=""),
+        sa.Column("client_language", sa.String(), nullable=False, server_default=""),
+        sa.Column("calls", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("user_id", "business_date", "result_class",
+                                "affiliate", "client_language"),
+    )
+    op.create_index("ix_agent_daily_stats_date", "Agent_Daily_Stats", ["business_date"])
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(crud_stats.rollup_insert([models.Log.user_id.isnot(None)]))
+
+
+def downgrade() -> None:
+    op.drop_index("ix_agent_daily_stats_date", table_name="Agent_Daily_Stats")
+    op.drop_table("Agent_Daily_Stats")
@@ -0,0 +1,41 @@
+"""Cola de reportes en segundo plano (Report_Jobs)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "Report_Jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("requested_by", sa.Integer(), sa.ForeignKey("Users.id")),
+        sa.Column("report_type", sa.String(), nullable=False),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=False),
+        sa.Column("target_agent", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False, server_default="queued"),
+        sa.Column("progress", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error", sa.Text()),
+        sa.Column("file_path", sa.String()),
+        sa.Column("file_size", sa.BigInteger()),
+        sa.Column("created_at", sa.DateTime(timezone=True)),
+        sa.Column("started_at", sa.DateTime(timezone=True)),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_Report_Jobs_id", "Report_Jobs", ["id"])
+    op.create_index("ix_report_jobs_created_at", "Report_Jobs", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_report_jobs_created_at", table_name="Report_Jobs")
+    op.drop_index("ix_Report_Jobs_id", table_name="Report_Jobs")
+    op.drop_table("Report_Jobs")
@@ -0,0 +1,132 @@
+"""Logs particionada por mes (PARTITION BY RANGE created_at)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+Reconstruye Logs como tabla particionada y copia el histórico
+(log_partitions.partition_existing): bloquea Logs mientras corre. Verifica
+cantidad de filas, suma de ids y máximo id antes de borrar la tabla anterior;
+si algo no coincide, falla y la transacción se revierte.
+Después, programar `python manage.py ensure-partitions` (ej: diario, en cron).
+
+El contenedor aplica las migraciones al arrancar. Con Logs vacía (instalación
+nueva) particiona acá. Con datos no la bloquea sin que nadie lo sepa: avisa y
+sigue sin particionar (la app funciona igual) y la reconstrucción se hace
+aparte, en una ventana de mantenimiento:
+    docker compose stop backend
+    docker compose run --rm backend python manage.py partition-logs
+    docker compose up -d backend
+(o `alembic -x maintenance=1 upgrade head` si 0005 todavía no se aplicó).
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.core.config import settings
+from app.services import log_partitions
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+COLUMNS = log_partitions.LOG_COLUMNS
+COMPLETED_PREDICATE = "result ILIKE '%Completed%' AND result NOT ILIKE '%Not%'"
+INDEXES = (
+    ("ix_Logs_id", ["id"], None),
+    ("ix_Logs_cordoba_id", ["cordoba_id"], None),
+    ("ix_logs_user_created", ["user_id", "created_at"], None),
+    ("ix_logs_user_created_completed", ["user_id", "created_at"], COMPLETED_PREDICATE),
+    ("ix_logs_agent_created", ["agent", "created_at"], None),
+    ("ix_logs_created_at", ["created_at"], None),
+)
+
+
+def _volume(conn, table: str):
+    return tuple(conn.execute(sa.text(
+        f'SELECT count(*), COALESCE(sum(id::bigint), 0), max(id) FROM "{table}"'
+    )).one())
+
+
+def _swap_out_legacy(conn) -> None:
+    """Renombra la tabla actual y sus índices para liberar los nombres."""
+    op.execute('LOCK TABLE "Logs" IN ACCESS EXCLUSIVE MODE')
+    op.execute('ALTER TABLE "Logs" RENAME TO "Logs_legacy"')
+    names = conn.execute(sa.text(
+        "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = 'Logs_legacy'"
+    )).scalars().all()
+    for name in names:
+        op.execute(f'ALTER INDEX "{name}" RENAME TO "{name}_legacy"')
+
+
+def _create_constraints() -> None:
+    """FK e índices con los nombres originales (ya liberados al borrar la tabla anterior)."""
+    op.create_foreign_key("Logs_user_id_fkey", "Logs", "Users", ["user_id"], ["id"])
+    for name, columns, where in INDEXES:
+        op.create_index(name, "Logs", columns,
+                        postgresql_where=sa.text(where) if where else None)
+
+
+def _check_volume(before, after) -> None:
+    if before != after:
+        raise RuntimeError(
+            f"Logs: el volumen no coincide (antes filas/suma/max id={before}, después={after})"
+        )
+    print(f"✅ Logs: {before[0]} filas copiadas (max id {before[2]})")
+
+
+def _maintenance_window(conn) -> bool:
+    """Con Logs no vacía, solo reconstruye con `-x maintenance=1`; si no, avisa y sigue."""
+    if context.get_x_argument(as_dictionary=True).get("maintenance") == "1":
+        return True
+    if not conn.execute(sa.text('SELECT EXISTS (SELECT 1 FROM "Logs")')).scalar():
+        return True
+    print(
+        "⚠️ 0005: Logs tiene datos y copiarla bloquea la tabla; queda sin particionar. "
+        "Particionarla en una ventana de mantenimiento con `python manage.py partition-logs`."
+    )
+    return False
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql" or log_partitions.is_partitioned(conn):
+        return
+    if not _maintenance_window(conn):
+        return
+    rows = log_partitions.partition_existing(conn, settings.LOG_PARTITION_MONTHS_AHEAD)
+    print(f"✅ Logs: {rows} filas copiadas a la tabla particionada")
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    # Si upgrade se salteó (Logs con datos) la tabla sigue sin particionar
+    if conn.dialect.name != "postgresql" or not log_partitions.is_partitioned(conn):
+        return
+
+    before = _volume(conn, "Logs")
+    _swap_out_legacy(conn)
+    op.execute("""
+        CREATE TABLE "Logs" (
+            id integer PRIMARY KEY DEFAULT nextval('"Logs_id_seq"'),
+            created_at timestamp with time zone,
+            user_id integer,
+            agent varchar,
+            customer varchar,
+            cordoba_id varchar,
+            result varchar,
+            comments text,
+            affiliate varchar,
+            info_until varchar,
+            client_language varchar,
+            transfer_status varchar
+        )
+    """)
+    op.execute(f'INSERT INTO "Logs" ({COLUMNS}) SELECT {COLUMNS} FROM "Logs_legacy"')
+    _check_volume(before, _volume(conn, "Logs"))
+
+    op.execute('ALTER SEQUENCE "Logs_id_seq" OWNED BY "Logs".id')
+    # Borra la tabla particionada junto con todas sus particiones
+    op.execute('DROP TABLE "Logs_legacy"')
+    _create_constraints()
+    op.execute('ANALYZE "Logs"')
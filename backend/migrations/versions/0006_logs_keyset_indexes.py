@@ -0,0 +1,69 @@
+"""Índices compuestos (filtro, created_at, id) para la paginación keyset de Logs
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+Reemplazan a ix_logs_created_at e ix_logs_agent_created (son prefijos de los
+nuevos). En una tabla particionada no existe CREATE INDEX CONCURRENTLY: se crea
+el índice vacío ON ONLY "Logs", se construye CONCURRENTLY en cada partición y
+se adjunta; así no se bloquean las escrituras en Logs.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+NEW_INDEXES = (
+    ("ix_logs_created_id", ("created_at", "id")),
+    ("ix_logs_agent_created_id", ("agent", "created_at", "id")),
+    ("ix_logs_result_created_id", ("result", "created_at", "id")),
+    ("ix_logs_affiliate_created_id", ("affiliate", "created_at", "id")),
+)
+OLD_INDEXES = (
+    ("ix_logs_created_at", ("created_at",)),
+    ("ix_logs_agent_created", ("agent", "created_at")),
+)
+
+
+def _partitions(conn) -> list:
+    return conn.execute(sa.text("""
+        SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass('"Logs"') ORDER BY c.relname
+    """)).scalars().all()
+
+
+def _create_index(conn, name: str, columns) -> None:
+    cols = ", ".join(columns)
+    partitions = _partitions(conn)
+    if not partitions:
+        op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "Logs" ({cols})')
+        return
+    op.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON ONLY "Logs" ({cols})')
+    for partition in partitions:
+        # "Logs_2026_10" -> "ix_logs_created_id_2026_10"
+        child = f"{name}_{partition[len('Logs_'):]}"
+        op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{child}" ON "{partition}" ({cols})')
+        op.execute(f'ALTER INDEX "{name}" ATTACH PARTITION "{child}"')
+
+
+def _swap(create, drop) -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        for name, columns in create:
+            _create_index(conn, name, columns)
+        for name, _ in drop:
+            op.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+def upgrade() -> None:
+    _swap(NEW_INDEXES, OLD_INDEXES)
+
+
+def downgrade() -> None:
+    _swap(OLD_INDEXES, NEW_INDEXES)
@@ -0,0 +1,22 @@
+"""Índice (username, update_id) en Updates_Reads para el estado de lectura de /updates/
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index("ix_updates_reads_user_update", "Updates_Reads", ["username", "update_id"],
+                        if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_updates_reads_user_update", table_name="Updates_Reads", if_exists=True)
@@ -0,0 +1,54 @@
+"""Updates_Reads por user_id con índice único (user_id, update_id)
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+
+Los recibos pasan de username a user_id (se completa con Users). Antes de
+crear el índice único se borran los duplicados (queda la primera lectura) y
+los recibos sin usuario o sin noticia, que ya no se podían mostrar.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+INDEX = "ix_updates_reads_user_update"
+FK = "Updates_Reads_user_id_fkey"
+
+
+def upgrade() -> None:
+    op.add_column("Updates_Reads", sa.Column("user_id", sa.Integer()))
+    op.execute("""
+        UPDATE "Updates_Reads" r SET user_id = u.id
+        FROM "Users" u WHERE u.username = r.username
+    """)
+    op.execute('DELETE FROM "Updates_Reads" WHERE user_id IS NULL OR update_id IS NULL')
+    # Duplicados: queda el recibo más viejo (id menor)
+    op.execute("""
+        DELETE FROM "Updates_Reads" r USING "Updates_Reads" first
+        WHERE r.user_id = first.user_id AND r.update_id = first.update_id AND r.id > first.id
+    """)
+    op.alter_column("Updates_Reads", "user_id", nullable=False)
+    op.alter_column("Updates_Reads", "update_id", nullable=False)
+    op.create_foreign_key(FK, "Updates_Reads", "Users", ["user_id"], ["id"])
+
+    op.drop_index(INDEX, table_name="Updates_Reads", if_exists=True)
+    op.create_index(INDEX, "Updates_Reads", ["user_id", "update_id"], unique=True)
+    op.drop_column("Updates_Reads", "username")
+
+
+def downgrade() -> None:
+    op.add_column("Updates_Reads", sa.Column("username", sa.String()))
+    op.execute("""
+        UPDATE "Updates_Reads" r SET username = u.username
+        FROM "Users" u WHERE u.id = r.user_id
+    """)
+    op.drop_index(INDEX, table_name="Updates_Reads")
+    op.create_index(INDEX, "Updates_Reads", ["username", "update_id"])
+    op.alter_column("Updates_Reads", "update_id", nullable=True)
+    op.drop_constraint(FK, "Updates_Reads", type_="foreignkey")
+    op.drop_column("Updates_Reads", "user_id")
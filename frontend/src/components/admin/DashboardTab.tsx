@@ -8,7 +8,51 @@ export const DashboardTab = () => {
 
   useEffect(() => {
     api.get('/admin/stats').then(res => setStats(res.data)).catch(console.error);
-    api.get('/admin/live-feed').then(res => setFeed(res.data)).catch(console.error);
+  }, []);
+
+  // Feed en vivo por SSE (fetch + stream: EventSource no permite el header Authorization)
+  useEffect(() => {
+    const controller = new AbortController();
+    let retry: ReturnType<typeof setTimeout>;
+
+    const connect = async () => {
+      try {
+        const token = JSON.parse(localStorage.getItem('cordoba-auth') || '{}')?.state?.token;
+        const res = await fetch(`${api.defaults.baseURL}/admin/live-feed/stream`, {
+          headers: { Authorization: `Bearer ${token}` },
+          signal: controller.signal,
+        });
+        if (!res.ok || !res.body) throw new Error(`live-feed ${res.status}`);
+
+        const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = '';
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += value;
+          const events = buffer.split('\n\n');
+          buffer = events.pop() || '';
+          for (const raw of events) {
+            const lines = raw.split('\n');
+            const data = lines.filter(l => l.startsWith('data:')).map(l => l.slice(5).trim()).join('\n');
+            if (!data) continue; // keep-alive
+            const payload = JSON.parse(data);
+            if (lines.includes('event: snapshot')) setFeed(payload);
+            else setFeed(prev => [payload, ...prev].slice(0, 10));
+          }
+        }
+      } catch (err) {
+        if (controller.signal.aborted) return;
+        console.error(err);
+      }
+      if (!controller.signal.aborted) retry = setTimeout(connect, 5000);
+    };
+
+    connect();
+    return () => {
+      controller.abort();
+      clearTimeout(retry);
+    };
   }, []);
 
   if (!stats) return <div className="p-12 text-center text-slate-400">Cargando métricas...</div>;
@@ -43,6 +43,15 @@ export default function Updates() {
     }
   };
 
+  const markAllAsRead = async () => {
+    setUpdates(prev => prev.map(u => ({ ...u, read: true })));
+    try {
+      await api.post('/updates/read-all');
+    } catch (error) {
+      console.error("Error marking all as read", error);
+    }
+  };
+
   // Filtrado
   const filteredUpdates = updates.filter(u => {
     // 1. Tab "All": Muestra todo
@@ -75,26 +84,37 @@ export default function Updates() {
           <p className="text-slate-500 mt-1">System announcements and operational news.</p>
         </div>
 
-        {/* Filtros Tipo Cápsula */}
-        <div className="bg-slate-100 p-1 rounded-xl flex items-center self-start md:self-auto">
-          {[
-            { id: 'ALL', label: 'All Updates' },
-            { id: 'CRITICAL', label: 'Critical' },
-            { id: 'INFO', label: 'General' },
-          ].map((tab) => (
+        <div className="flex items-center gap-3 self-start md:self-auto">
+          {updates.some(u => !u.read) && (
             <button
-              key={tab.id}
-              onClick={() => setFilter(tab.id as any)}
-              className={clsx(
-                "px-4 py-2 rounded-lg text-xs font-bold transition-all",
-                filter === tab.id 
-                  ? "bg-white text-slate-800 shadow-sm" 
-                  : "text-slate-500 hover:text-slate-700"
-              )}
+              onClick={markAllAsRead}
+              className="flex items-center gap-2 px-3 py-2 rounded-lg text-xs font-bold border bg-white border-slate-200 text-slate-500 hover:text-blue-600 hover:border-blue-200 hover:bg-blue-50 transition-all"
             >
-              {tab.label}
+              <Check size={14} /> Mark all as read
             </button>
-          ))}
+          )}
+
+          {/* Filtros Tipo Cápsula */}
+          <div className="bg-slate-100 p-1 rounded-xl flex items-center">
+            {[
+              { id: 'ALL', label: 'All Updates' },
+              { id: 'CRITICAL', label: 'Critical' },
+              { id: 'INFO', label: 'General' },
+            ].map((tab) => (
+              <button
+                key={tab.id}
+                onClick={() => setFilter(tab.id as any)}
+                className={clsx(
+                  "px-4 py-2 rounded-lg text-xs font-bold transition-all",
+                  filter === tab.id 
+                    ? "bg-white text-slate-800 shadow-sm" 
+                    : "text-slate-500 hover:text-slate-700"
+                )}
+              >
+                {tab.label}
+              </button>
+            ))}
+          </div>
         </div>
       </div>
 
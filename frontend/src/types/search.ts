@@ -10,7 +10,19 @@ export interface BatchFoundItem {
   name: string;  // El nombre oficial
 }
 
+export interface BatchSuggestion {
+  code: string;  // Código oficial sugerido
+  name: string;  // Nombre oficial
+  score: number; // Confianza 0..1
+}
+
+export interface BatchFuzzyItem {
+  input: string;
+  suggestions: BatchSuggestion[];
+}
+
 export interface BatchResponse {
   found: BatchFoundItem[];
   unknown: string[];
+  suggestions?: BatchFuzzyItem[];
 }
\ No newline at end of file